@@ -0,0 +1,77 @@
+import os
+import time
+import hashlib
+import logging
+from typing import Any, Callable, Dict, Optional
+from fastapi import HTTPException, status
+from cache import TTLCache
+from telemetry import cache_metrics
+from .models import UserResponse
+from .revocations import revocation_store
+
+logger = logging.getLogger("uvicorn.error")
+
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "4096"))
+AUTH_TOKEN_CACHE_TTL = float(os.getenv("AUTH_TOKEN_CACHE_TTL", "300"))
+AUTH_USER_CACHE_TTL = float(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+
+token_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_TOKEN_CACHE_TTL)
+user_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_USER_CACHE_TTL)
+cache_metrics.register("auth_tokens", token_cache)
+cache_metrics.register("auth_users", user_cache)
+
+# Each namespace verifies its own tokens (signature and expiry); logout only
+# revokes tokens one of them accepts.
+token_verifiers: Dict[str, Callable[[str], Dict[str, Any]]] = {}
+
+def register_token_verifier(namespace: str, verify: Callable[[str], Dict[str, Any]]):
+    token_verifiers[namespace] = verify
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def _seconds_until_expiry(payload: Dict[str, Any]) -> Optional[float]:
+    exp = payload.get("exp")
+    if exp is None:
+        return None
+    return float(exp) - time.time()
+
+def verify_token_cached(namespace: str, token: str) -> Dict[str, Any]:
+    digest = token_digest(token)
+    key = (namespace, digest)
+    payload = token_cache.get(key)
+    if payload is None:
+        payload = token_verifiers[namespace](token)
+        remaining = _seconds_until_expiry(payload)
+        ttl = AUTH_TOKEN_CACHE_TTL if remaining is None else min(AUTH_TOKEN_CACHE_TTL, remaining)
+        if ttl > 0:
+            token_cache.set(key, payload, ttl=ttl)
+    if revocation_store.is_revoked(digest, payload.get("exp")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked"
+        )
+    return payload
+
+def revoke_token(token: str):
+    digest = token_digest(token)
+    for namespace, verify in token_verifiers.items():
+        token_cache.invalidate((namespace, digest))
+        try:
+            payload = verify(token)
+        except Exception:
+            continue
+        try:
+            revocation_store.revoke(digest, payload.get("exp"))
+        except Exception as e:
+            logger.error(f"Failed to record token revocation: {e}")
+        return
+
+def get_cached_user(username: str) -> Optional[UserResponse]:
+    return user_cache.get(username)
+
+def cache_user(user: UserResponse):
+    user_cache.set(user.username, user)
+
+def invalidate_user(username: str):
+    user_cache.invalidate(username)
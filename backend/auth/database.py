@@ -1,14 +1,20 @@
 import os
+import asyncio
+import functools
 import boto3
 from boto3.dynamodb.conditions import Key
 from botocore.exceptions import ClientError
 from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import uuid
 from .encryption import encryption_service, password_service
 from .models import UserCreate, UserResponse
+from .cache import cache_user, invalidate_user
 from dotenv import load_dotenv
 
+AUTH_DB_WORKERS = int(os.getenv("AUTH_DB_WORKERS", "8"))
+
 class DynamoDBService:
     def __init__(self):
         load_dotenv()
@@ -22,11 +28,16 @@ class DynamoDBService:
         self.dynamodb = session.client('dynamodb', region_name=self.region)
         self.dynamodb_resource = session.resource('dynamodb', region_name=self.region)
         self.table = self.dynamodb_resource.Table(self.table_name)
+        # boto3 is blocking, so table calls run here instead of on the event loop.
+        self.executor = ThreadPoolExecutor(max_workers=AUTH_DB_WORKERS, thread_name_prefix="auth-db")
+
+    async def _run(self, fn, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
     
     async def create_user(self, user_data: UserCreate) -> UserResponse:
         try:
             user_id = str(uuid.uuid4())
-            hashed_password = password_service.hash_password(user_data.password)
+            hashed_password = await password_service.hash_password_async(user_data.password)
             encrypted_email = encryption_service.encrypt(user_data.email)
             
             user_item = {
@@ -39,11 +50,13 @@ class DynamoDBService:
                 'is_active': True
             }
             
-            response = self.table.put_item(
+            response = await self._run(
+                self.table.put_item,
                 Item=user_item,
                 ConditionExpression='attribute_not_exists(username)'
             )
             
+            invalidate_user(user_data.username)
             return UserResponse(
                 id=user_id,
                 username=user_data.username,
@@ -58,7 +71,7 @@ class DynamoDBService:
     
     async def authenticate_user(self, username: str, password: str) -> Optional[UserResponse]:
         try:
-            response = self.table.get_item(Key={'username': username})
+            response = await self._run(self.table.get_item, Key={'username': username})
             
             if 'Item' not in response:
                 return None
@@ -68,31 +81,34 @@ class DynamoDBService:
             if not user_item.get('is_active', True):
                 raise ValueError("Account is deactivated")
             
-            if not password_service.verify_password(password, user_item['encrypted_password']):
+            if not await password_service.verify_password_async(password, user_item['encrypted_password']):
                 return None
             
             decrypted_email = encryption_service.decrypt(user_item['encrypted_email'])
             last_login = datetime.utcnow().isoformat()
-            self.table.update_item(
+            await self._run(
+                self.table.update_item,
                 Key={'username': username},
                 UpdateExpression='SET last_login = :last_login',
                 ExpressionAttributeValues={':last_login': last_login}
             )
             
-            return UserResponse(
+            user = UserResponse(
                 id=user_item['id'],
                 username=user_item['username'],
                 email=decrypted_email,
                 role=user_item['role'],
                 last_login=last_login
             )
+            cache_user(user)
+            return user
             
         except Exception as e:
             return None
     
     async def get_user_by_username(self, username: str) -> Optional[UserResponse]:
         try:
-            response = self.table.get_item(Key={'username': username})
+            response = await self._run(self.table.get_item, Key={'username': username})
             
             if 'Item' not in response:
                 return None
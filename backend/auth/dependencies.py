@@ -3,9 +3,11 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
 from .jwt_handler import jwt_handler
 from .database import db_service
+from .cache import verify_token_cached, get_cached_user, cache_user, register_token_verifier
 from .models import UserResponse
 
 security = HTTPBearer(auto_error=False)
+register_token_verifier("auth", jwt_handler.verify_token)
 
 async def get_current_user(
     authorization: Optional[HTTPAuthorizationCredentials] = Depends(security),
@@ -24,7 +26,7 @@ async def get_current_user(
         )
     
     try:
-        payload = jwt_handler.verify_token(token)
+        payload = verify_token_cached("auth", token)
         username = payload.get("sub")
         
         if username is None:
@@ -33,12 +35,15 @@ async def get_current_user(
                 detail="Could not validate credentials"
             )
         
-        user = await db_service.get_user_by_username(username)
+        user = get_cached_user(username)
         if user is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found"
-            )
+            user = await db_service.get_user_by_username(username)
+            if user is None:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="User not found"
+                )
+            cache_user(user)
         
         return user
         
@@ -1,12 +1,19 @@
 import os
+import asyncio
 import hashlib
 import secrets
+from concurrent.futures import ThreadPoolExecutor
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from dotenv import load_dotenv
 import base64
 
+# PBKDF2 releases the GIL, so hashing runs in parallel on these threads while the
+# worker cap keeps a burst of logins from monopolising every core.
+PASSWORD_HASH_CONCURRENCY = int(os.getenv("PASSWORD_HASH_CONCURRENCY", str(min(4, os.cpu_count() or 1))))
+hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_CONCURRENCY, thread_name_prefix="password-hash")
+
 class EncryptionService:
     def __init__(self):
         load_dotenv()
@@ -50,5 +57,11 @@ class PasswordService:
         except ValueError:
             return False
 
+    async def hash_password_async(self, password: str) -> str:
+        return await asyncio.get_running_loop().run_in_executor(hash_executor, self.hash_password, password)
+
+    async def verify_password_async(self, password: str, hashed_password: str) -> bool:
+        return await asyncio.get_running_loop().run_in_executor(hash_executor, self.verify_password, password, hashed_password)
+
 encryption_service = EncryptionService()
 password_service = PasswordService()
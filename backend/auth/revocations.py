@@ -0,0 +1,46 @@
+import os
+import time
+import shutil
+import logging
+from typing import Optional
+
+logger = logging.getLogger("uvicorn.error")
+
+REVOCATION_DIR = os.getenv("REVOCATION_DIR", os.path.join(os.getenv("SNAPSHOT_DIR", "snapshots"), "revoked"))
+REVOCATION_BUCKET_SECONDS = 3600
+NEVER_EXPIRES = "never"
+
+class RevocationStore:
+    # Revoked token digests are empty files grouped into one directory per
+    # hour of token expiry, so every worker sharing the directory sees a
+    # logout and pruning only has to look at the bucket directories.
+    def __init__(self, directory: str = REVOCATION_DIR):
+        self.directory = directory
+
+    def _bucket(self, exp: Optional[float]) -> str:
+        return NEVER_EXPIRES if exp is None else str(int(exp) // REVOCATION_BUCKET_SECONDS)
+
+    def _path(self, digest: str, exp: Optional[float]) -> str:
+        return os.path.join(self.directory, self._bucket(exp), digest)
+
+    def revoke(self, digest: str, exp: Optional[float]):
+        path = self._path(digest, exp)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a"):
+            pass
+        self.prune()
+
+    def is_revoked(self, digest: str, exp: Optional[float]) -> bool:
+        return os.path.exists(self._path(digest, exp))
+
+    def prune(self):
+        current = int(time.time()) // REVOCATION_BUCKET_SECONDS
+        try:
+            buckets = os.listdir(self.directory)
+        except FileNotFoundError:
+            return
+        for bucket in buckets:
+            if bucket.isdigit() and int(bucket) < current:
+                shutil.rmtree(os.path.join(self.directory, bucket), ignore_errors=True)
+
+revocation_store = RevocationStore()
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException, status, Response, Depends, Cookie
 from fastapi.responses import JSONResponse
+from fastapi.security import HTTPAuthorizationCredentials
 from datetime import datetime
 from typing import Optional
 from .models import (
@@ -8,7 +9,8 @@ from .models import (
 )
 from .database import db_service
 from .jwt_handler import jwt_handler
-from .dependencies import get_current_user, get_current_admin_user
+from .dependencies import security, get_current_user, get_current_admin_user
+from .cache import revoke_token
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
@@ -62,7 +64,14 @@ async def login(user_credentials: UserLogin, response: Response):
         )
 
 @router.post("/logout", response_model=MessageResponse)
-async def logout(response: Response):
+async def logout(
+    response: Response,
+    authorization: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    session_token: Optional[str] = Cookie(None)
+):
+    for token in {authorization.credentials if authorization else None, session_token}:
+        if token:
+            revoke_token(token)
     response.delete_cookie(key="session_token")
     return MessageResponse(message="Logout successful")
 
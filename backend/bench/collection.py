@@ -0,0 +1,228 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+from bench.fake_aws import FakeAWS, SyntheticFleet
+
+# Engine settings compared by default; any subset can be picked with --strategies.
+STRATEGIES = {
+    "default": {},
+    "serial": {"max_alias_workers": 1, "max_cluster_workers": 1, "max_metrics_workers": 1},
+    "wide": {"max_alias_workers": 8, "max_cluster_workers": 16, "max_metrics_workers": 16},
+}
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the ECS/CloudWatch collector against a synthetic fleet")
+    parser.add_argument("--aliases", type=int, default=3)
+    parser.add_argument("--clusters", type=int, default=20, help="clusters per alias")
+    parser.add_argument("--services", type=int, default=25, help="services per cluster")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds added to every AWS call")
+    parser.add_argument("--latency-jitter", type=float, default=0.01, help="extra uniform random latency, in seconds")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="probability that a call is throttled")
+    parser.add_argument("--api-tps", type=float, default=None, help="simulated per-account, per-API rate limit")
+    parser.add_argument("--unlimited-rates", action="store_true", help="disable the request governor's client-side rate limits")
+    parser.add_argument("--strategies", default=",".join(STRATEGIES))
+    parser.add_argument("--cycles", type=int, default=2, help="collection cycles per strategy; the first one is cold")
+    parser.add_argument("--details", type=int, default=20, help="service-details requests per strategy")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced cycle used to measure peak memory")
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--baseline", help="compare against a previous --output file")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="allowed relative slowdown or memory growth")
+    return parser.parse_args(argv)
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+class CollectorBenchmark:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.fleet = SyntheticFleet(args.aliases, args.clusters, args.services, args.seed)
+        self.fake = FakeAWS(
+            self.fleet,
+            latency=args.latency,
+            latency_jitter=args.latency_jitter,
+            throttle_rate=args.throttle_rate,
+            api_tps=args.api_tps,
+            seed=args.seed
+        )
+        # main reads its settings at import time, so it is imported only once
+        # the environment has been prepared.
+        import main
+        from collector.clients import client_registry
+        from collector.engine import CollectionEngine
+        from collector.governor import governor
+        self.main = main
+        self.client_registry = client_registry
+        self.governor = governor
+        self.engine_class = CollectionEngine
+        client_registry.session_factory = self.fake.session
+        self.profiles = {alias: self.fleet.profile(alias) for alias in self.fleet.aliases}
+        main.profiles_config = dict(self.profiles)
+        self.service = main.collector_service
+        self.service.configure(self.profiles, {})
+
+    def reset(self):
+        from collector.timeseries import TimeSeriesStore
+        main = self.main
+        main.clusters_data.clear()
+        main.last_update_time.clear()
+        main.refresh_status.clear()
+        main.service_details_cache.clear()
+        main.timeseries_store = self.service.history = TimeSeriesStore()
+        self.service.task_definitions.clear()
+        self.client_registry.retain([])
+        self.governor.reset()
+        self.fake.reset_counters()
+
+    def _retries(self) -> int:
+        return sum(
+            counters.get("retries", 0)
+            for apis in self.governor.stats().values()
+            for counters in apis.values()
+        )
+
+    def run_cycle(self, engine) -> Dict[str, Any]:
+        self.fake.reset_counters()
+        self.governor.reset()
+        started = time.perf_counter()
+        engine.run_cycle(self.profiles, self.service.refresh)
+        wall = time.perf_counter() - started
+        return {
+            "wall_seconds": round(wall, 3),
+            "services": sum(len(v) for v in self.main.clusters_data.values()),
+            "aws_calls": dict(sorted(self.fake.calls.items())),
+            "total_calls": sum(self.fake.calls.values()),
+            "throttled": sum(self.fake.throttled.values()),
+            "retries": self._retries(),
+        }
+
+    def run_details(self) -> Dict[str, Any]:
+        rng = random.Random(self.args.seed)
+        clusters, services = self.fleet.clusters(), self.fleet.services()
+        latencies = []
+        self.fake.reset_counters()
+        for _ in range(self.args.details):
+            alias = rng.choice(self.fleet.aliases)
+            started = time.perf_counter()
+            self.main.fetch_service_details(alias, self.profiles[alias], rng.choice(clusters), rng.choice(services))
+            latencies.append((time.perf_counter() - started) * 1000)
+        requests = max(1, len(latencies))
+        return {
+            "requests": len(latencies),
+            "p50_ms": round(percentile(latencies, 50), 1),
+            "p95_ms": round(percentile(latencies, 95), 1),
+            "calls_per_request": round(sum(self.fake.calls.values()) / requests, 2),
+        }
+
+    def run_strategy(self, name: str) -> Dict[str, Any]:
+        engine = self.engine_class(**STRATEGIES[name])
+        self.service.engine = engine
+        try:
+            self.reset()
+            result = {"cycles": [self.run_cycle(engine) for _ in range(self.args.cycles)]}
+            if self.args.details:
+                result["service_details"] = self.run_details()
+            if not self.args.no_memory:
+                self.reset()
+                tracemalloc.start()
+                try:
+                    self.run_cycle(engine)
+                    result["peak_memory_mb"] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 2)
+                finally:
+                    tracemalloc.stop()
+            return result
+        finally:
+            for pool in (engine.alias_pool, engine.cluster_pool, engine.metrics_pool):
+                pool.shutdown(wait=True)
+
+    def run(self) -> Dict[str, Any]:
+        results = {
+            "fleet": self.fleet.describe(),
+            "aws": {
+                "latency": self.args.latency,
+                "latency_jitter": self.args.latency_jitter,
+                "throttle_rate": self.args.throttle_rate,
+                "api_tps": self.args.api_tps,
+                "unlimited_rates": self.args.unlimited_rates,
+            },
+            "strategies": {}
+        }
+        for name in self.args.strategies.split(","):
+            print(f"running strategy '{name}'...", file=sys.stderr)
+            results["strategies"][name] = self.run_strategy(name)
+        return results
+
+def print_report(results: Dict[str, Any]):
+    fleet = results["fleet"]
+    print(f"fleet: {fleet['aliases']} aliases x {fleet['clusters']} clusters x {fleet['services']} services")
+    print(f"{'strategy':<10} {'cycle':<6} {'wall s':>9} {'services':>9} {'calls':>8} {'throttled':>10} {'retries':>8} {'peak MB':>9}")
+    for name, result in results["strategies"].items():
+        for i, cycle in enumerate(result["cycles"]):
+            peak = result.get("peak_memory_mb", "") if i == 0 else ""
+            label = "cold" if i == 0 else f"warm{i}"
+            print(
+                f"{name:<10} {label:<6} {cycle['wall_seconds']:>9.3f} {cycle['services']:>9} {cycle['total_calls']:>8} "
+                f"{cycle['throttled']:>10} {cycle['retries']:>8} {peak:>9}"
+            )
+        details = result.get("service_details")
+        if details:
+            print(
+                f"{'':<10} details p50 {details['p50_ms']} ms, p95 {details['p95_ms']} ms, "
+                f"{details['calls_per_request']} calls/request"
+            )
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    regressions = []
+    if baseline.get("fleet") != results["fleet"] or baseline.get("aws") != results["aws"]:
+        print("warning: baseline was recorded with a different fleet or AWS profile", file=sys.stderr)
+    for name, result in results["strategies"].items():
+        previous = baseline.get("strategies", {}).get(name)
+        if previous is None:
+            continue
+        for i, (cycle, old) in enumerate(zip(result["cycles"], previous.get("cycles", []))):
+            label = f"{name}/cycle{i}"
+            change = cycle["wall_seconds"] / old["wall_seconds"] - 1 if old["wall_seconds"] else 0.0
+            print(f"{label:<20} wall {old['wall_seconds']:.3f}s -> {cycle['wall_seconds']:.3f}s ({change:+.1%}), "
+                  f"calls {old['total_calls']} -> {cycle['total_calls']}")
+            if change > max_regression:
+                regressions.append(f"{label}: wall time {change:+.1%}")
+            if cycle["total_calls"] > old["total_calls"]:
+                regressions.append(f"{label}: AWS calls {old['total_calls']} -> {cycle['total_calls']}")
+        if "peak_memory_mb" in result and previous.get("peak_memory_mb"):
+            change = result["peak_memory_mb"] / previous["peak_memory_mb"] - 1
+            print(f"{name + '/memory':<20} peak {previous['peak_memory_mb']} MB -> {result['peak_memory_mb']} MB ({change:+.1%})")
+            if change > max_regression:
+                regressions.append(f"{name}: peak memory {change:+.1%}")
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    os.environ.setdefault("ENCRYPTION_KEY", "bench")
+    os.environ["SNAPSHOT_DIR"] = tempfile.mkdtemp(prefix="heartbeat-bench-")
+    if args.unlimited_rates:
+        os.environ["AWS_API_RATES"] = json.dumps({"*": 1e9, "ecs": 1e9, "cloudwatch": 1e9, "application-auto-scaling": 1e9})
+    results = CollectorBenchmark(args).run()
+    print_report(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        if regressions:
+            print("regressions:\n  " + "\n  ".join(regressions), file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
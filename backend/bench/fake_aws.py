@@ -0,0 +1,439 @@
+import json
+import math
+import time
+import random
+import threading
+import zlib
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+import boto3
+from botocore.awsrequest import AWSResponse
+
+from collector.cloudwatch import to_epoch
+
+REGION = "us-east-1"
+ECS_PAGE_SIZE = 100
+DESCRIBE_SERVICES_LIMIT = 10
+DESCRIBE_TASKS_LIMIT = 100
+MAX_TASKS = 8
+
+def _stable_hash(*parts: Any) -> int:
+    return zlib.crc32("/".join(str(p) for p in parts).encode())
+
+def _iso(epoch: float) -> str:
+    return datetime.utcfromtimestamp(epoch).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+# Deterministic aliases x clusters x services fleet; nothing is materialised, so
+# very large fleets cost no memory on the fake side.
+class SyntheticFleet:
+    def __init__(self, aliases: int, clusters: int, services: int, seed: int = 0):
+        self.alias_count = aliases
+        self.cluster_count = clusters
+        self.service_count = services
+        self.seed = seed
+        self.created_at = time.time() - 30 * 86400
+
+    @property
+    def aliases(self) -> List[str]:
+        return [f"alias-{i:02d}" for i in range(self.alias_count)]
+
+    def profile(self, alias: str) -> str:
+        return f"bench-{alias}"
+
+    def account_id(self, profile_name: str) -> str:
+        return str(100000000000 + _stable_hash(self.seed, profile_name) % 899999999999)
+
+    def clusters(self) -> List[str]:
+        return [f"cluster-{i:04d}" for i in range(self.cluster_count)]
+
+    def services(self) -> List[str]:
+        return [f"service-{i:04d}" for i in range(self.service_count)]
+
+    def running_tasks(self, profile_name: str, cluster_name: str, service_name: str) -> int:
+        return _stable_hash(self.seed, profile_name, cluster_name, service_name) % (MAX_TASKS + 1)
+
+    def metric(self, profile_name: str, cluster_name: str, service_name: str, metric_name: str, timestamp: float) -> float:
+        h = _stable_hash(self.seed, profile_name, cluster_name, service_name, metric_name)
+        base = 10 + h % 70
+        phase = (h >> 8) % 360
+        return round(min(100.0, max(0.0, base + 15 * math.sin(timestamp / 7200 + phase))), 2)
+
+    def describe(self) -> Dict[str, int]:
+        return {
+            "aliases": self.alias_count,
+            "clusters": self.cluster_count,
+            "services": self.service_count,
+            "seed": self.seed,
+        }
+
+class _RateLimit:
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+# In-process stand-in for ECS, CloudWatch and Application Auto Scaling. Real
+# botocore clients are used end to end (serialization, the request governor's
+# hooks, response parsing); only the HTTP round trip is answered from the fleet.
+class FakeAWS:
+    def __init__(self, fleet: SyntheticFleet, latency: float = 0.0, latency_jitter: float = 0.0,
+                 throttle_rate: float = 0.0, api_tps: Optional[float] = None, seed: int = 0):
+        self.fleet = fleet
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.throttle_rate = throttle_rate
+        self.api_tps = api_tps
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._limits: Dict[Tuple[str, str], _RateLimit] = {}
+        self.calls = Counter()
+        self.throttled = Counter()
+        self._task_services: Dict[str, str] = {}
+        self._handlers = {
+            "ecs.ListClusters": self._list_clusters,
+            "ecs.ListServices": self._list_services,
+            "ecs.DescribeServices": self._describe_services,
+            "ecs.ListTasks": self._list_tasks,
+            "ecs.DescribeTasks": self._describe_tasks,
+            "ecs.DescribeTaskDefinition": self._describe_task_definition,
+            "application-auto-scaling.DescribeScalingActivities": self._describe_scaling_activities,
+            "application-auto-scaling.DescribeScalingPolicies": self._describe_scaling_policies,
+            "cloudwatch.GetMetricData": self._get_metric_data,
+            "cloudwatch.GetMetricStatistics": self._get_metric_statistics,
+        }
+
+    def session(self, profile_name: Optional[str] = None, region_name: Optional[str] = None) -> boto3.Session:
+        session = boto3.Session(
+            aws_access_key_id="bench",
+            aws_secret_access_key="bench",
+            region_name=region_name or REGION
+        )
+        session.events.register("before-parameter-build", self._capture_params)
+        # Registered last so the request governor's before-send hook still runs first.
+        session.events.register_last("before-send", lambda **kw: self._respond(profile_name, **kw))
+        return session
+
+    def reset_counters(self):
+        with self._lock:
+            self.calls.clear()
+            self.throttled.clear()
+
+    def _capture_params(self, params: Dict[str, Any], **kwargs):
+        self._local.params = dict(params)
+
+    def _sleep(self):
+        delay = self.latency
+        if self.latency_jitter:
+            with self._lock:
+                delay += self._random.uniform(0, self.latency_jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _should_throttle(self, profile_name: str, api: str) -> bool:
+        with self._lock:
+            if self.throttle_rate and self._random.random() < self.throttle_rate:
+                return True
+            if self.api_tps:
+                limit = self._limits.get((profile_name, api))
+                if limit is None:
+                    limit = self._limits[(profile_name, api)] = _RateLimit(self.api_tps)
+                return not limit.take()
+            return False
+
+    def _respond(self, profile_name: str, event_name: str = "", request=None, **kwargs):
+        api = ".".join(event_name.split(".")[1:3])
+        params = getattr(self._local, "params", {})
+        service = api.split(".", 1)[0]
+        with self._lock:
+            self.calls[api] += 1
+        self._sleep()
+        if self._should_throttle(profile_name, api):
+            with self._lock:
+                self.throttled[api] += 1
+            return self._error(service, "Throttling" if service == "cloudwatch" else "ThrottlingException", "Rate exceeded", request)
+        handler = self._handlers.get(api)
+        if handler is None:
+            return self._error(service, "UnsupportedOperation", f"{api} is not simulated", request)
+        try:
+            body = handler(profile_name, params)
+        except ValueError as e:
+            return self._error(service, "InvalidParameterException", str(e), request)
+        if service == "cloudwatch":
+            return self._response(request, 200, body.encode(), "text/xml")
+        return self._response(request, 200, json.dumps(body).encode(), "application/x-amz-json-1.1")
+
+    @staticmethod
+    def _response(request, status_code: int, body: bytes, content_type: str) -> AWSResponse:
+        class Raw:
+            def stream(self, **kwargs):
+                yield body
+        headers = {"Content-Type": content_type, "x-amzn-RequestId": "bench"}
+        return AWSResponse(request.url if request is not None else "", status_code, headers, Raw())
+
+    def _error(self, service: str, code: str, message: str, request) -> AWSResponse:
+        if service == "cloudwatch":
+            body = (
+                f"<ErrorResponse><Error><Type>Sender</Type><Code>{code}</Code>"
+                f"<Message>{escape(message)}</Message></Error><RequestId>bench</RequestId></ErrorResponse>"
+            )
+            return self._response(request, 400, body.encode(), "text/xml")
+        return self._response(request, 400, json.dumps({"__type": code, "message": message}).encode(), "application/x-amz-json-1.1")
+
+    # ECS
+
+    def _arn(self, profile_name: str, resource: str) -> str:
+        return f"arn:aws:ecs:{REGION}:{self.fleet.account_id(profile_name)}:{resource}"
+
+    @staticmethod
+    def _page(items: List[Any], params: Dict[str, Any]) -> Tuple[List[Any], Optional[str]]:
+        start = int(params.get("nextToken") or 0)
+        size = min(int(params.get("maxResults") or ECS_PAGE_SIZE), ECS_PAGE_SIZE)
+        end = start + size
+        return items[start:end], str(end) if end < len(items) else None
+
+    def _list_clusters(self, profile_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        names, token = self._page(self.fleet.clusters(), params)
+        body = {"clusterArns": [self._arn(profile_name, f"cluster/{name}") for name in names]}
+        if token:
+            body["nextToken"] = token
+        return body
+
+    def _list_services(self, profile_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        cluster_name = params["cluster"].split("/")[-1]
+        names, token = self._page(self.fleet.services(), params)
+        body = {"serviceArns": [self._arn(profile_name, f"service/{cluster_name}/{name}") for name in names]}
+        if token:
+            body["nextToken"] = token
+        return body
+
+    def _task_definition_arn(self, profile_name: str, service_name: str) -> str:
+        revision = 1 + _stable_hash(profile_name, service_name) % 40
+        return self._arn(profile_name, f"task-definition/{service_name}:{revision}")
+
+    def _service(self, profile_name: str, cluster_name: str, service_name: str) -> Dict[str, Any]:
+        running = self.fleet.running_tasks(profile_name, cluster_name, service_name)
+        created = self.fleet.created_at
+        task_definition = self._task_definition_arn(profile_name, service_name)
+        return {
+            "serviceArn": self._arn(profile_name, f"service/{cluster_name}/{service_name}"),
+            "serviceName": service_name,
+            "clusterArn": self._arn(profile_name, f"cluster/{cluster_name}"),
+            "status": "ACTIVE",
+            "desiredCount": running,
+            "runningCount": running,
+            "pendingCount": 0,
+            "launchType": "FARGATE",
+            "platformVersion": "1.4.0",
+            "taskDefinition": task_definition,
+            "createdAt": created,
+            "deployments": [{
+                "id": f"ecs-svc/{_stable_hash(cluster_name, service_name)}",
+                "status": "PRIMARY",
+                "taskDefinition": task_definition,
+                "desiredCount": running,
+                "runningCount": running,
+                "pendingCount": 0,
+                "createdAt": created,
+                "updatedAt": created + 600,
+                "rolloutState": "COMPLETED",
+            }],
+            "events": [
+                {
+                    "id": f"{service_name}-{i}",
+                    "createdAt": created + i * 3600,
+                    "message": f"(service {service_name}) has reached a steady state."
+                }
+                for i in range(10)
+            ],
+        }
+
+    def _describe_services(self, profile_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        services = params.get("services", [])
+        if len(services) > DESCRIBE_SERVICES_LIMIT:
+            raise ValueError(f"services can have at most {DESCRIBE_SERVICES_LIMIT} items")
+        cluster_name = params.get("cluster", "default").split("/")[-1]
+        return {
+            "services": [self._service(profile_name, cluster_name, s.split("/")[-1]) for s in services],
+            "failures": []
+        }
+
+    def _task_arns(self, profile_name: str, cluster_name: str, service_name: str) -> List[str]:
+        running = self.fleet.running_tasks(profile_name, cluster_name, service_name)
+        arns = [
+            self._arn(profile_name, f"task/{cluster_name}/{_stable_hash(service_name, i):08x}{i:024x}")
+            for i in range(running)
+        ]
+        # describe_tasks only gets ARNs but has to report each task's service.
+        for arn in arns:
+            self._task_services[arn] = service_name
+        return arns
+
+    def _list_tasks(self, profile_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        cluster_name = params.get("cluster", "default").split("/")[-1]
+        arns, token = self._page(self._task_arns(profile_name, cluster_name, params.get("serviceName", "")), params)
+        body = {"taskArns": arns}
+        if token:
+            body["nextToken"] = token
+        return body
+
+    def _describe_tasks(self, profile_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        tasks = params.get("tasks", [])
+        if len(tasks) > DESCRIBE_TASKS_LIMIT:
+            raise ValueError(f"tasks can have at most {DESCRIBE_TASKS_LIMIT} items")
+        started = time.time() - 86400
+        return {
+            "tasks": [
+                {
+                    "taskArn": arn,
+                    "clusterArn": self._arn(profile_name, f"cluster/{arn.split('/')[-2]}"),
+                    "taskDefinitionArn": self._task_definition_arn(profile_name, self._task_services.get(arn, "unknown")),
+                    "group": f"service:{self._task_services.get(arn, 'unknown')}",
+                    "lastStatus": "RUNNING",
+                    "desiredStatus": "RUNNING",
+                    "healthStatus": "HEALTHY",
+                    "launchType": "FARGATE",
+                    "cpu": "256",
+                    "memory": "512",
+                    "availabilityZone": f"{REGION}{'abc'[i % 3]}",
+                    "createdAt": started,
+                    "startedAt": started + 30,
+                    "containers": [{"name": "app", "lastStatus": "RUNNING", "healthStatus": "HEALTHY"}],
+                }
+                for i, arn in enumerate(tasks)
+            ],
+            "failures": []
+        }
+
+    def _describe_task_definition(self, profile_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        arn = params["taskDefinition"]
+        family, _, revision = arn.split("/")[-1].partition(":")
+        return {
+            "taskDefinition": {
+                "taskDefinitionArn": arn,
+                "family": family,
+                "revision": int(revision or 1),
+                "status": "ACTIVE",
+                "networkMode": "awsvpc",
+                "requiresCompatibilities": ["FARGATE"],
+                "cpu": "256",
+                "memory": "512",
+                "containerDefinitions": [
+                    {
+                        "name": "app",
+                        "image": f"123456789012.dkr.ecr.{REGION}.amazonaws.com/{family}:latest",
+                        "cpu": 256,
+                        "memory": 512,
+                        "essential": True,
+                        "portMappings": [{"containerPort": 8080, "hostPort": 8080, "protocol": "tcp"}],
+                        "environment": [{"name": f"SETTING_{i}", "value": "x" * 32} for i in range(20)],
+                    }
+                ],
+            }
+        }
+
+    # Application Auto Scaling
+
+    def _describe_scaling_activities(self, profile_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        resource_id = params.get("ResourceId", "")
+        now = time.time()
+        return {
+            "ScalingActivities": [
+                {
+                    "ActivityId": f"{_stable_hash(resource_id, i):08x}",
+                    "ServiceNamespace": "ecs",
+                    "ResourceId": resource_id,
+                    "ScalableDimension": "ecs:service:DesiredCount",
+                    "Description": "Setting desired count to 4.",
+                    "Cause": "monitor alarm TargetTracking-AlarmHigh in state ALARM triggered policy cpu-target",
+                    "StartTime": now - (i + 1) * 7200,
+                    "EndTime": now - (i + 1) * 7200 + 60,
+                    "StatusCode": "Successful",
+                }
+                for i in range(5)
+            ]
+        }
+
+    def _describe_scaling_policies(self, profile_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        resource_id = params.get("ResourceId", "")
+        return {
+            "ScalingPolicies": [{
+                "PolicyARN": f"arn:aws:autoscaling:{REGION}:{self.fleet.account_id(profile_name)}:scalingPolicy:{resource_id}",
+                "PolicyName": "cpu-target",
+                "ServiceNamespace": "ecs",
+                "ResourceId": resource_id,
+                "ScalableDimension": "ecs:service:DesiredCount",
+                "PolicyType": "TargetTrackingScaling",
+                "TargetTrackingScalingPolicyConfiguration": {
+                    "TargetValue": 70.0,
+                    "PredefinedMetricSpecification": {"PredefinedMetricType": "ECSServiceAverageCPUUtilization"},
+                },
+                "CreationTime": self.fleet.created_at,
+            }]
+        }
+
+    # CloudWatch (query protocol, XML responses)
+
+    def _points(self, profile_name: str, dimensions: List[Dict[str, str]], metric_name: str,
+                period: int, start_time: datetime, end_time: datetime) -> List[Tuple[float, float]]:
+        values = {d["Name"]: d["Value"] for d in dimensions}
+        cluster_name, service_name = values.get("ClusterName", ""), values.get("ServiceName", "")
+        if not self.fleet.running_tasks(profile_name, cluster_name, service_name):
+            return []
+        start, end = to_epoch(start_time), to_epoch(end_time)
+        first = math.ceil(start / period) * period
+        return [
+            (ts, self.fleet.metric(profile_name, cluster_name, service_name, metric_name, ts))
+            for ts in range(int(first), int(end), period)
+        ]
+
+    def _get_metric_data(self, profile_name: str, params: Dict[str, Any]) -> str:
+        results = []
+        for query in params.get("MetricDataQueries", []):
+            stat = query["MetricStat"]
+            points = self._points(
+                profile_name, stat["Metric"].get("Dimensions", []), stat["Metric"]["MetricName"],
+                stat["Period"], params["StartTime"], params["EndTime"]
+            )
+            if params.get("ScanBy") != "TimestampAscending":
+                points.reverse()
+            timestamps = "".join(f"<member>{_iso(ts)}</member>" for ts, _ in points)
+            values = "".join(f"<member>{value}</member>" for _, value in points)
+            results.append(
+                f"<member><Id>{escape(query['Id'])}</Id><Label>{escape(stat['Metric']['MetricName'])}</Label>"
+                f"<Timestamps>{timestamps}</Timestamps><Values>{values}</Values>"
+                f"<StatusCode>Complete</StatusCode></member>"
+            )
+        return (
+            '<GetMetricDataResponse xmlns="http://monitoring.amazonaws.com/doc/2010-08-01/">'
+            f"<GetMetricDataResult><MetricDataResults>{''.join(results)}</MetricDataResults>"
+            "<Messages/></GetMetricDataResult>"
+            "<ResponseMetadata><RequestId>bench</RequestId></ResponseMetadata></GetMetricDataResponse>"
+        )
+
+    def _get_metric_statistics(self, profile_name: str, params: Dict[str, Any]) -> str:
+        points = self._points(
+            profile_name, params.get("Dimensions", []), params["MetricName"],
+            params["Period"], params["StartTime"], params["EndTime"]
+        )
+        datapoints = "".join(
+            f"<member><Timestamp>{_iso(ts)}</Timestamp><Maximum>{value}</Maximum><Unit>Percent</Unit></member>"
+            for ts, value in points
+        )
+        return (
+            '<GetMetricStatisticsResponse xmlns="http://monitoring.amazonaws.com/doc/2010-08-01/">'
+            f"<GetMetricStatisticsResult><Label>{escape(params['MetricName'])}</Label>"
+            f"<Datapoints>{datapoints}</Datapoints></GetMetricStatisticsResult>"
+            "<ResponseMetadata><RequestId>bench</RequestId></ResponseMetadata></GetMetricStatisticsResponse>"
+        )
@@ -0,0 +1,107 @@
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List
+
+# Bootstrap for bench/load_test.py: the real FastAPI app with pre-populated
+# cluster data, AWS answered by bench.fake_aws and an in-memory users table.
+# Every uvicorn worker imports this module and builds the same state.
+os.environ.setdefault("ENCRYPTION_KEY", "bench")
+os.environ.setdefault("JWT_SECRET", "bench-secret")
+os.environ.setdefault("JWT_ALGORITHM", "HS256")
+os.environ.setdefault("SNAPSHOT_DIR", tempfile.mkdtemp(prefix="heartbeat-load-"))
+
+from bench.fake_aws import FakeAWS, SyntheticFleet
+from collector.cloudwatch import HISTORY_PERIOD, HISTORY_POINTS
+from collector.clients import client_registry
+from auth.database import db_service
+from auth.encryption import encryption_service, password_service
+import main
+
+BENCH_USERNAME = os.getenv("BENCH_USERNAME", "bench-admin")
+BENCH_PASSWORD = os.getenv("BENCH_PASSWORD", "bench-password")
+
+fleet = SyntheticFleet(
+    int(os.getenv("BENCH_ALIASES", "3")),
+    int(os.getenv("BENCH_CLUSTERS", "20")),
+    int(os.getenv("BENCH_SERVICES", "50")),
+    int(os.getenv("BENCH_SEED", "0"))
+)
+fake_aws = FakeAWS(
+    fleet,
+    latency=float(os.getenv("BENCH_AWS_LATENCY", "0.03")),
+    latency_jitter=float(os.getenv("BENCH_AWS_LATENCY_JITTER", "0.02"))
+)
+
+class MemoryTable:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._items: Dict[str, Dict[str, Any]] = {}
+
+    def get_item(self, Key: Dict[str, str]) -> Dict[str, Any]:
+        with self._lock:
+            item = self._items.get(Key["username"])
+            return {"Item": dict(item)} if item is not None else {}
+
+    def put_item(self, Item: Dict[str, Any], ConditionExpression: str = None) -> Dict[str, Any]:
+        with self._lock:
+            if ConditionExpression and Item["username"] in self._items:
+                raise db_service.dynamodb.exceptions.ConditionalCheckFailedException(
+                    {"Error": {"Code": "ConditionalCheckFailedException", "Message": "exists"}}, "PutItem"
+                )
+            self._items[Item["username"]] = dict(Item)
+        return {}
+
+    def update_item(self, Key: Dict[str, str], UpdateExpression: str, ExpressionAttributeValues: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            item = self._items.get(Key["username"])
+            if item is not None:
+                item["last_login"] = ExpressionAttributeValues[":last_login"]
+        return {}
+
+def synthetic_services(alias: str, now: float) -> List[Dict[str, Any]]:
+    profile_name = fleet.profile(alias)
+    updated_at = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(now))
+    history_times = [now - (HISTORY_POINTS - i) * HISTORY_PERIOD for i in range(HISTORY_POINTS)]
+    services = []
+    for cluster_name in fleet.clusters():
+        for service_name in fleet.services():
+            def series(metric_name):
+                return [fleet.metric(profile_name, cluster_name, service_name, metric_name, ts) for ts in history_times]
+            services.append({
+                "account_alias": alias,
+                "cluster_name": cluster_name,
+                "service_name": service_name,
+                "running_tasks": fleet.running_tasks(profile_name, cluster_name, service_name),
+                "current_cpu": fleet.metric(profile_name, cluster_name, service_name, "CPUUtilization", now),
+                "current_memory": fleet.metric(profile_name, cluster_name, service_name, "MemoryUtilization", now),
+                "historical_cpu": series("CPUUtilization"),
+                "historical_memory": series("MemoryUtilization"),
+                "last_updated": updated_at
+            })
+    return services
+
+def bootstrap():
+    client_registry.session_factory = fake_aws.session
+    db_service.table = MemoryTable()
+    db_service.table.put_item({
+        "id": "bench-user",
+        "username": BENCH_USERNAME,
+        "encrypted_email": encryption_service.encrypt("bench@example.com"),
+        "encrypted_password": password_service.hash_password(BENCH_PASSWORD),
+        "role": "admin",
+        "created_at": "2024-01-01T00:00:00",
+        "is_active": True
+    })
+    main.profiles_config = {alias: fleet.profile(alias) for alias in fleet.aliases}
+    main.collector_service.configure(main.profiles_config, {})
+    now = time.time()
+    for alias in fleet.aliases:
+        main.collector_service.publish(alias, synthetic_services(alias, now))
+
+# The scheduler and config reloader would start collecting in the background
+# and skew the measurements, so the app's startup hooks are replaced.
+main.app.router.on_startup.clear()
+main.app.router.on_startup.append(bootstrap)
+app = main.app
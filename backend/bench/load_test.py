@@ -0,0 +1,332 @@
+import os
+import sys
+import json
+import time
+import random
+import signal
+import argparse
+import threading
+import subprocess
+import http.client
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import jwt
+
+from bench.fake_aws import SyntheticFleet
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+Request = Tuple[str, str, str, Optional[bytes], Dict[str, str]]
+
+class ClientContext:
+    def __init__(self, fleet: SyntheticFleet, token: str, username: str, password: str, rng: random.Random):
+        self.fleet = fleet
+        self.rng = rng
+        self.username = username
+        self.password = password
+        self.auth = {"Authorization": f"Bearer {token}", "Accept-Encoding": "gzip"}
+        self.etags: Dict[str, str] = {}
+
+    def alias(self) -> str:
+        return self.rng.choice(self.fleet.aliases)
+
+    def get(self, label: str, path: str, conditional: bool = False) -> Request:
+        headers = dict(self.auth)
+        if conditional and path in self.etags:
+            headers["If-None-Match"] = self.etags[path]
+        return label, "GET", path, None, headers
+
+def all_clusters(ctx: ClientContext) -> Request:
+    return ctx.get("/clusters", "/clusters", conditional=True)
+
+def alias_clusters(ctx: ClientContext) -> Request:
+    return ctx.get("/clusters?alias", f"/clusters?alias={ctx.alias()}", conditional=True)
+
+def filtered_clusters(ctx: ClientContext) -> Request:
+    prefix = ctx.rng.choice(ctx.fleet.clusters())[:-1]
+    return ctx.get("/clusters?query", f"/clusters?alias={ctx.alias()}&cluster_prefix={prefix}&sort=-cpu&limit=100")
+
+def aliases(ctx: ClientContext) -> Request:
+    return ctx.get("/aliases", "/aliases")
+
+def refresh_status(ctx: ClientContext) -> Request:
+    return ctx.get("/refresh-status", f"/refresh-status?alias={ctx.alias()}")
+
+def hotspots(ctx: ClientContext) -> Request:
+    return ctx.get("/hotspots", f"/hotspots?metric={ctx.rng.choice(['cpu', 'memory'])}&by=current&limit=20")
+
+def service_details(ctx: ClientContext) -> Request:
+    cluster_name = ctx.rng.choice(ctx.fleet.clusters())
+    service_name = ctx.rng.choice(ctx.fleet.services())
+    return ctx.get("/service-details", f"/service-details?alias={ctx.alias()}&cluster_name={cluster_name}&service_name={service_name}")
+
+def login(ctx: ClientContext) -> Request:
+    body = json.dumps({"username": ctx.username, "password": ctx.password}).encode()
+    return "/auth/login", "POST", "/auth/login", body, {"Content-Type": "application/json"}
+
+def me(ctx: ClientContext) -> Request:
+    return ctx.get("/auth/me", "/auth/me")
+
+# Weighted request mixes; a client runs one profile for the whole test.
+PROFILES: Dict[str, List[Tuple[int, Callable[[ClientContext], Request]]]] = {
+    "dashboard": [(6, all_clusters), (3, alias_clusters), (2, aliases), (2, refresh_status), (1, hotspots)],
+    "explorer": [(4, filtered_clusters), (2, service_details), (1, alias_clusters), (1, hotspots)],
+    "auth": [(1, login), (4, me)],
+}
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load-test the HeartBeat API with concurrent dashboard clients")
+    parser.add_argument("--clients", default="dashboard=200,explorer=20,auth=5",
+                        help=f"clients per profile, e.g. dashboard=200,explorer=20; profiles: {', '.join(PROFILES)}")
+    parser.add_argument("--duration", type=float, default=30, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds of load before measuring")
+    parser.add_argument("--think-time", type=float, default=1.0, help="max random pause between a client's requests")
+    parser.add_argument("--client-processes", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--url", help="test an already running server instead of starting bench.load_app")
+    parser.add_argument("--aliases", type=int, default=3)
+    parser.add_argument("--clusters", type=int, default=20)
+    parser.add_argument("--services", type=int, default=50)
+    parser.add_argument("--aws-latency", type=float, default=0.03)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results as JSON")
+    return parser.parse_args(argv)
+
+def parse_clients(spec: str) -> Dict[str, int]:
+    clients = {}
+    for part in filter(None, spec.split(",")):
+        name, _, count = part.partition("=")
+        if name not in PROFILES:
+            raise SystemExit(f"unknown profile '{name}'")
+        clients[name] = int(count or 1)
+    return clients
+
+def run_client(host: str, port: int, profile: str, ctx: ClientContext, measure_from: float, deadline: float,
+               think_time: float, samples: List[Tuple[str, float, int, float]]):
+    weights, requests = zip(*PROFILES[profile])
+    conn = http.client.HTTPConnection(host, port, timeout=60)
+    time.sleep(ctx.rng.uniform(0, min(think_time, 1.0)))
+    while time.time() < deadline:
+        label, method, path, body, headers = ctx.rng.choices(requests, weights)[0](ctx)
+        sent = time.time()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            status = response.status
+            etag = response.getheader("ETag")
+            if etag:
+                ctx.etags[path] = etag
+        except Exception:
+            status = 0
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=60)
+        finished = time.time()
+        if sent >= measure_from:
+            samples.append((label, (finished - sent) * 1000, status, finished))
+        if think_time:
+            time.sleep(ctx.rng.uniform(0, think_time))
+    conn.close()
+
+def run_client_process(config: Dict[str, Any]) -> List[Tuple[str, float, int, float]]:
+    fleet = SyntheticFleet(config["aliases"], config["clusters"], config["services"], config["seed"])
+    samples: List[Tuple[str, float, int, float]] = []
+    threads = []
+    for i, profile in enumerate(config["profiles"]):
+        ctx = ClientContext(fleet, config["token"], config["username"], config["password"], random.Random(config["seed"] * 100003 + config["offset"] + i))
+        thread = threading.Thread(
+            target=run_client,
+            args=(config["host"], config["port"], profile, ctx, config["measure_from"], config["deadline"], config["think_time"], samples),
+            daemon=True
+        )
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    return samples
+
+def child_pids(pid: int) -> List[int]:
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(entry))
+    return children
+
+def cpu_seconds(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    except OSError:
+        return None
+
+def rss_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        return None
+    return None
+
+def worker_pids(server: subprocess.Popen, workers: int) -> List[int]:
+    if workers <= 1:
+        return [server.pid]
+    # uvicorn's supervisor spawns the workers; skip multiprocessing's resource tracker.
+    pids = []
+    for pid in child_pids(server.pid):
+        try:
+            with open(f"/proc/{pid}/cmdline") as f:
+                cmdline = f.read()
+        except OSError:
+            continue
+        if "resource_tracker" not in cmdline:
+            pids.append(pid)
+    return pids
+
+def start_server(args: argparse.Namespace) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "BENCH_ALIASES": str(args.aliases),
+        "BENCH_CLUSTERS": str(args.clusters),
+        "BENCH_SERVICES": str(args.services),
+        "BENCH_SEED": str(args.seed),
+        "BENCH_AWS_LATENCY": str(args.aws_latency),
+    }
+    command = [
+        sys.executable, "-m", "uvicorn", "bench.load_app:app",
+        "--host", "127.0.0.1", "--port", str(args.port),
+        "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"
+    ]
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=env, start_new_session=True)
+
+def wait_until_ready(host: str, port: int, token: str, timeout: float = 120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=5)
+            conn.request("GET", "/aliases", headers={"Authorization": f"Bearer {token}"})
+            response = conn.getresponse()
+            body = response.read()
+            conn.close()
+            if response.status == 200 and json.loads(body):
+                return
+        except (OSError, http.client.HTTPException, ValueError):
+            pass
+        time.sleep(0.5)
+    raise SystemExit("server did not become ready")
+
+def summarize(samples: List[Tuple[str, float, int, float]], duration: float) -> Dict[str, Dict[str, Any]]:
+    by_label = defaultdict(list)
+    for label, latency, status, _ in samples:
+        by_label[label].append((latency, status))
+    by_label["all"] = [(latency, status) for _, latency, status, _ in samples]
+    summary = {}
+    for label, entries in sorted(by_label.items()):
+        latencies = sorted(latency for latency, _ in entries)
+        def pct(p):
+            return round(latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))], 1) if latencies else 0.0
+        summary[label] = {
+            "requests": len(entries),
+            "throughput_rps": round(len(entries) / duration, 1),
+            "errors": sum(1 for _, status in entries if status == 0 or status >= 500),
+            "p50_ms": pct(50),
+            "p95_ms": pct(95),
+            "p99_ms": pct(99),
+            "max_ms": round(latencies[-1], 1) if latencies else 0.0,
+        }
+    return summary
+
+def print_report(results: Dict[str, Any]):
+    print(f"{'endpoint':<20} {'requests':>9} {'rps':>8} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for label, row in results["endpoints"].items():
+        print(f"{label:<20} {row['requests']:>9} {row['throughput_rps']:>8} {row['errors']:>7} "
+              f"{row['p50_ms']:>8} {row['p95_ms']:>8} {row['p99_ms']:>8} {row['max_ms']:>8}")
+    for worker in results.get("workers", []):
+        print(f"worker {worker['pid']}: {worker['cpu_percent']}% CPU, {worker['rss_mb']} MB RSS")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    clients = parse_clients(args.clients)
+    secret = os.environ.setdefault("JWT_SECRET", "bench-secret")
+    username = os.getenv("BENCH_USERNAME", "bench-admin")
+    password = os.getenv("BENCH_PASSWORD", "bench-password")
+    token = jwt.encode(
+        {"sub": username, "user_id": "bench-user", "role": "admin", "exp": int(time.time()) + 3600 * 12},
+        secret,
+        algorithm=os.getenv("JWT_ALGORITHM", "HS256")
+    )
+    server = None
+    host, port = "127.0.0.1", args.port
+    if args.url:
+        host, _, port = args.url.split("://")[-1].partition(":")
+        port = int(port or 80)
+    else:
+        server = start_server(args)
+    try:
+        wait_until_ready(host, port, token)
+        pids = worker_pids(server, args.workers) if server else []
+        profiles = [name for name, count in clients.items() for _ in range(count)]
+        random.Random(args.seed).shuffle(profiles)
+        processes = max(1, min(args.client_processes, len(profiles)))
+        started = time.time()
+        measure_from = started + args.warmup
+        deadline = measure_from + args.duration
+        configs = [
+            {
+                "host": host, "port": port, "token": token, "username": username, "password": password,
+                "aliases": args.aliases, "clusters": args.clusters, "services": args.services, "seed": args.seed,
+                "profiles": profiles[i::processes], "offset": i * len(profiles),
+                "measure_from": measure_from, "deadline": deadline, "think_time": args.think_time,
+            }
+            for i in range(processes)
+        ]
+        print(f"{len(profiles)} clients in {processes} processes, {args.warmup}s warm-up, {args.duration}s measured", file=sys.stderr)
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = [pool.submit(run_client_process, config) for config in configs]
+            time.sleep(max(0.0, measure_from - time.time()))
+            cpu_before = {pid: cpu_seconds(pid) for pid in pids}
+            measured_at = time.time()
+            time.sleep(max(0.0, deadline - time.time()))
+            elapsed = time.time() - measured_at
+            workers = []
+            for pid in pids:
+                before, after = cpu_before.get(pid), cpu_seconds(pid)
+                if before is not None and after is not None:
+                    workers.append({"pid": pid, "cpu_percent": round((after - before) / elapsed * 100, 1), "rss_mb": rss_mb(pid)})
+            samples = [sample for future in futures for sample in future.result()]
+        results = {
+            "config": {
+                "clients": clients, "duration": args.duration, "think_time": args.think_time, "workers": args.workers,
+                "fleet": {"aliases": args.aliases, "clusters": args.clusters, "services": args.services},
+                "aws_latency": args.aws_latency,
+            },
+            "endpoints": summarize(samples, args.duration),
+            "workers": workers,
+        }
+        print_report(results)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+        return 0
+    finally:
+        if server is not None:
+            os.killpg(server.pid, signal.SIGTERM)
+            try:
+                server.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                os.killpg(server.pid, signal.SIGKILL)
+
+if __name__ == "__main__":
+    sys.exit(main())
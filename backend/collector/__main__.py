@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import logging
+import argparse
+import threading
+from typing import List, Optional
+
+from dotenv import load_dotenv
+from prometheus_client import start_http_server
+
+from .service import CollectorService, read_config
+
+logger = logging.getLogger("uvicorn.error")
+
+CONFIG_RELOAD_INTERVAL = int(os.getenv("CONFIG_RELOAD_INTERVAL", "60"))
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m collector", description="Collect ECS/CloudWatch data into the snapshot directory")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--aliases", help="comma-separated subset of the configured aliases")
+    parser.add_argument("--once", action="store_true", help="collect every alias once and exit")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on this port")
+    parser.add_argument("--log-level", default="INFO")
+    return parser.parse_args(argv)
+
+def configure(service: CollectorService, args: argparse.Namespace):
+    profiles, settings = read_config(args.config)
+    if args.aliases:
+        selected = set(args.aliases.split(","))
+        profiles = {alias: profile for alias, profile in profiles.items() if alias in selected}
+    service.configure(profiles, settings)
+
+def run_once(service: CollectorService, args: argparse.Namespace) -> int:
+    if not service.shared.try_acquire_leadership():
+        logger.error(f"Another collector holds {service.shared.directory}/collector.lock")
+        return 1
+    configure(service, args)
+    # Restoring the last snapshots keeps CloudWatch fetches incremental.
+    service.load_snapshots()
+    service.engine.run_cycle(service.profiles, service.refresh)
+    failed = [alias for alias in service.profiles if service.refresh_status.get(alias, {}).get("status") != "Refresh completed"]
+    for alias in failed:
+        logger.error(f"Alias '{alias}': {service.refresh_status.get(alias, {}).get('status', 'not collected')}")
+    return 1 if failed else 0
+
+def run_forever(service: CollectorService, args: argparse.Namespace):
+    configure(service, args)
+    service.load_snapshots()
+
+    def reload_config():
+        while True:
+            time.sleep(CONFIG_RELOAD_INTERVAL)
+            try:
+                configure(service, args)
+            except Exception as e:
+                logger.error(f"Failed to reload {args.config}: {e}")
+
+    threading.Thread(target=reload_config, daemon=True).start()
+    if service.shared.try_acquire_leadership():
+        logger.info(f"Collecting {len(service.profiles)} aliases into {service.store.directory}")
+    else:
+        logger.info("Another collector is running on this host; waiting for its lock")
+    service.coordinate()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    load_dotenv()
+    args = parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(levelname)s %(message)s")
+    if args.metrics_port:
+        start_http_server(args.metrics_port)
+    service = CollectorService()
+    if args.once:
+        return run_once(service, args)
+    run_forever(service, args)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+import os
+import time
+import threading
+import logging
+from typing import Callable, Iterable, Optional
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from .governor import governor
+
+logger = logging.getLogger("uvicorn.error")
+
+MAX_POOL_CONNECTIONS = int(os.getenv("AWS_MAX_POOL_CONNECTIONS", "50"))
+SESSION_MAX_AGE = int(os.getenv("AWS_SESSION_MAX_AGE", "3300"))
+
+CREDENTIAL_ERROR_CODES = {
+    "ExpiredToken",
+    "ExpiredTokenException",
+    "InvalidClientTokenId",
+    "RequestExpired",
+    "UnrecognizedClientException",
+}
+
+def is_credential_error(error: Exception) -> bool:
+    if isinstance(error, ClientError):
+        return error.response.get("Error", {}).get("Code") in CREDENTIAL_ERROR_CODES
+    return False
+
+class ClientRegistry:
+    def __init__(self, max_pool_connections: int = MAX_POOL_CONNECTIONS, session_max_age: int = SESSION_MAX_AGE, session_factory: Callable[..., boto3.Session] = boto3.Session):
+        self.session_max_age = session_max_age
+        self.session_factory = session_factory
+        # Retries are driven by the request governor, so botocore makes a single attempt.
+        self.config = Config(
+            max_pool_connections=max_pool_connections,
+            retries={"mode": "standard", "total_max_attempts": 1}
+        )
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._clients = {}
+
+    def _evict_locked(self, session_key):
+        self._sessions.pop(session_key, None)
+        for client_key in [k for k in self._clients if k[:2] == session_key]:
+            del self._clients[client_key]
+
+    def _session_locked(self, profile_name: str, region_name: Optional[str]):
+        session_key = (profile_name, region_name)
+        entry = self._sessions.get(session_key)
+        if entry and time.monotonic() - entry[1] < self.session_max_age:
+            return entry[0]
+        if entry:
+            self._evict_locked(session_key)
+        session = self.session_factory(profile_name=profile_name, region_name=region_name)
+        self._sessions[session_key] = (session, time.monotonic())
+        return session
+
+    def client(self, profile_name: str, service_name: str, region_name: Optional[str] = None):
+        with self._lock:
+            session = self._session_locked(profile_name, region_name)
+            client_key = (profile_name, region_name, service_name)
+            client = self._clients.get(client_key)
+            if client is None:
+                client = session.client(service_name, config=self.config)
+                governor.attach(client, profile_name)
+                self._clients[client_key] = client
+            return client
+
+    def refresh(self, profile_name: str):
+        with self._lock:
+            for session_key in [k for k in self._sessions if k[0] == profile_name]:
+                self._evict_locked(session_key)
+
+    def retain(self, profile_names: Iterable[str]):
+        keep = set(profile_names)
+        with self._lock:
+            for session_key in [k for k in self._sessions if k[0] not in keep]:
+                logger.info(f"Evicting AWS clients for removed profile '{session_key[0]}'")
+                self._evict_locked(session_key)
+
+client_registry = ClientRegistry()
@@ -0,0 +1,142 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MAX_QUERIES_PER_REQUEST = 500
+CURRENT_PERIOD = 300
+CURRENT_MAX_AGE = timedelta(minutes=10)
+HISTORY_PERIOD = 1800
+HISTORY_WINDOW = timedelta(hours=6)
+HISTORY_POINTS = 12
+
+METRICS = (
+    ("cpu", "CPUUtilization"),
+    ("memory", "MemoryUtilization"),
+)
+
+ServiceKey = Tuple[str, str]
+EPOCH = datetime(1970, 1, 1)
+
+def pad_history(values: List[float], points: int = HISTORY_POINTS) -> List[float]:
+    return values[-points:] if len(values) >= points else values + [0] * (points - len(values))
+
+def _naive_utc(ts: datetime) -> datetime:
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+def to_epoch(ts: datetime) -> float:
+    return (_naive_utc(ts) - EPOCH).total_seconds()
+
+def align_time(ts: datetime, period: int) -> datetime:
+    epoch = int(to_epoch(ts))
+    return datetime.utcfromtimestamp(epoch - epoch % period)
+
+def metric_query(query_id: str, cluster_name: str, service_name: str, metric_name: str, period: int) -> Dict:
+    return {
+        "Id": query_id,
+        "MetricStat": {
+            "Metric": {
+                "Namespace": "AWS/ECS",
+                "MetricName": metric_name,
+                "Dimensions": [
+                    {"Name": "ClusterName", "Value": cluster_name},
+                    {"Name": "ServiceName", "Value": service_name}
+                ]
+            },
+            "Period": period,
+            "Stat": "Maximum"
+        },
+        "ReturnData": True
+    }
+
+def build_queries(services: Iterable[Tuple[str, str, bool]]) -> Tuple[List[Dict], Dict[str, Tuple[ServiceKey, str, str]]]:
+    queries = []
+    index = {}
+    for i, (cluster_name, service_name, include_history) in enumerate(services):
+        key = (cluster_name, service_name)
+        for metric_key, metric_name in METRICS:
+            query_id = f"s{i}_{metric_key}_now"
+            queries.append(metric_query(query_id, cluster_name, service_name, metric_name, CURRENT_PERIOD))
+            index[query_id] = (key, metric_key, "current")
+            if include_history:
+                query_id = f"s{i}_{metric_key}_hist"
+                queries.append(metric_query(query_id, cluster_name, service_name, metric_name, HISTORY_PERIOD))
+                index[query_id] = (key, metric_key, "historical")
+    return queries, index
+
+def _chunk_queries(queries: List[Dict], size: int = MAX_QUERIES_PER_REQUEST) -> Iterable[List[Dict]]:
+    for i in range(0, len(queries), size):
+        yield queries[i:i + size]
+
+def get_metric_data(cloudwatch, queries: List[Dict], start_time: datetime, end_time: datetime) -> Dict[str, List[Tuple[datetime, float]]]:
+    series = {}
+    for chunk in _chunk_queries(queries):
+        kwargs = {
+            "MetricDataQueries": chunk,
+            "StartTime": start_time,
+            "EndTime": end_time,
+            "ScanBy": "TimestampAscending"
+        }
+        while True:
+            response = cloudwatch.get_metric_data(**kwargs)
+            for result in response.get("MetricDataResults", []):
+                points = series.setdefault(result["Id"], [])
+                points.extend(zip(result.get("Timestamps", []), result.get("Values", [])))
+            next_token = response.get("NextToken")
+            if not next_token:
+                break
+            kwargs["NextToken"] = next_token
+    for points in series.values():
+        points.sort(key=lambda p: p[0])
+    return series
+
+def _empty_metrics(include_history: bool) -> Dict:
+    return {
+        "current_cpu": 0,
+        "current_memory": 0,
+        "historical_cpu": pad_history([]) if include_history else [],
+        "historical_memory": pad_history([]) if include_history else []
+    }
+
+def _split_by_start(services: List[Tuple[str, str, bool]], end_time: datetime, history) -> Dict[datetime, List[Tuple[str, str, bool]]]:
+    # Services without usable local history are backfilled over the full
+    # window; everything else only needs the datapoints since its last bucket.
+    backfill = []
+    incremental = []
+    incremental_start = end_time - CURRENT_MAX_AGE
+    for service in services:
+        cluster_name, service_name, include_history = service
+        if include_history:
+            start = history.start_for((cluster_name, service_name), end_time) if history else None
+            if start is None:
+                backfill.append(service)
+                continue
+            incremental_start = min(incremental_start, start)
+        incremental.append(service)
+    groups = {}
+    if backfill:
+        groups[align_time(end_time - HISTORY_WINDOW, HISTORY_PERIOD)] = backfill
+    if incremental:
+        groups.setdefault(align_time(incremental_start, HISTORY_PERIOD), []).extend(incremental)
+    return groups
+
+def fetch_service_metrics(cloudwatch, services: Iterable[Tuple[str, str, bool]], end_time: Optional[datetime] = None, history=None) -> Dict[ServiceKey, Dict]:
+    services = list(services)
+    if end_time is None:
+        end_time = datetime.utcnow()
+    results = {(c, s): _empty_metrics(h) for c, s, h in services}
+    oldest_current = end_time - CURRENT_MAX_AGE
+    for start_time, group in _split_by_start(services, end_time, history).items():
+        queries, index = build_queries(group)
+        series = get_metric_data(cloudwatch, queries, start_time, end_time)
+        for query_id, (key, metric_key, kind) in index.items():
+            points = series.get(query_id, [])
+            if kind == "current":
+                recent = [value for ts, value in points if _naive_utc(ts) >= oldest_current]
+                results[key][f"current_{metric_key}"] = recent[-1] if recent else 0
+            elif history is not None:
+                history.record(key, metric_key, points)
+                results[key][f"historical_{metric_key}"] = pad_history(history.values(key, metric_key, end_time))
+            else:
+                results[key][f"historical_{metric_key}"] = pad_history([value for _, value in points])
+    return results
@@ -0,0 +1,84 @@
+import os
+import json
+import fcntl
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from .snapshot import SNAPSHOT_DIR, write_atomic
+
+logger = logging.getLogger("uvicorn.error")
+
+SHARED_POLL_INTERVAL = float(os.getenv("SHARED_POLL_INTERVAL", "1"))
+
+class SharedState:
+    # One collector per host: every process sharing the snapshot directory
+    # competes for an flock on collector.lock and only the holder collects.
+    # The others follow the snapshots it writes, read its per-alias status
+    # files and ask it for refreshes by dropping trigger files.
+    def __init__(self, directory: str = SNAPSHOT_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._lock_file = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._lock_file is not None
+
+    def try_acquire_leadership(self) -> bool:
+        with self._lock:
+            if self._lock_file is not None:
+                return True
+            os.makedirs(self.directory, exist_ok=True)
+            lock_file = open(os.path.join(self.directory, "collector.lock"), "a+")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                return False
+            lock_file.seek(0)
+            lock_file.truncate()
+            lock_file.write(f"{os.getpid()}\n")
+            lock_file.flush()
+            self._lock_file = lock_file
+            return True
+
+    def _status_path(self, alias: str) -> str:
+        return os.path.join(self.directory, "status", f"{alias}.json")
+
+    def _trigger_dir(self) -> str:
+        return os.path.join(self.directory, "triggers")
+
+    def write_status(self, alias: str, status: Dict[str, Any]):
+        write_atomic(self._status_path(alias), json.dumps(status).encode(), durable=False)
+
+    def read_status(self, alias: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._status_path(alias)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable status for alias '{alias}': {e}")
+            return None
+
+    def request_refresh(self, alias: str):
+        os.makedirs(self._trigger_dir(), exist_ok=True)
+        with open(os.path.join(self._trigger_dir(), alias), "a"):
+            pass
+
+    def take_refresh_requests(self) -> List[str]:
+        try:
+            aliases = os.listdir(self._trigger_dir())
+        except FileNotFoundError:
+            return []
+        taken = []
+        for alias in aliases:
+            try:
+                os.unlink(os.path.join(self._trigger_dir(), alias))
+            except FileNotFoundError:
+                continue
+            taken.append(alias)
+        return taken
+
+shared_state = SharedState()
@@ -0,0 +1,113 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .cloudwatch import METRICS, MAX_QUERIES_PER_REQUEST, fetch_service_metrics
+
+logger = logging.getLogger("uvicorn.error")
+
+DESCRIBE_SERVICES_BATCH = 10
+DESCRIBE_TASKS_BATCH = 100
+LIST_SERVICES_PAGE_SIZE = 100
+LIST_TASKS_PAGE_SIZE = 100
+HISTORY_MIN_RUNNING_TASKS = 2
+SERVICES_PER_METRICS_BATCH = MAX_QUERIES_PER_REQUEST // (2 * len(METRICS))
+
+def iter_cluster_names(ecs_client) -> Iterator[str]:
+    paginator = ecs_client.get_paginator('list_clusters')
+    for page in paginator.paginate():
+        for cluster_arn in page.get('clusterArns', []):
+            yield cluster_arn.split('/')[-1]
+
+def iter_service_batches(ecs_client, cluster_name: str, batch_size: int = DESCRIBE_SERVICES_BATCH) -> Iterator[List[Dict]]:
+    paginator = ecs_client.get_paginator('list_services')
+    pages = paginator.paginate(
+        cluster=cluster_name,
+        PaginationConfig={'PageSize': LIST_SERVICES_PAGE_SIZE}
+    )
+    for page in pages:
+        service_arns = page.get('serviceArns', [])
+        for i in range(0, len(service_arns), batch_size):
+            response = ecs_client.describe_services(
+                cluster=cluster_name,
+                services=service_arns[i:i + batch_size]
+            )
+            yield response.get('services', [])
+
+def list_task_arns(ecs_client, cluster_name: str, service_name: str, limit: int, cursor: Optional[str] = None) -> Tuple[List[str], Optional[str]]:
+    # The ECS nextToken doubles as the cursor, so a page never re-lists earlier tasks.
+    task_arns = []
+    next_token = cursor
+    while len(task_arns) < limit:
+        params = {
+            'cluster': cluster_name,
+            'serviceName': service_name,
+            'maxResults': min(LIST_TASKS_PAGE_SIZE, limit - len(task_arns))
+        }
+        if next_token:
+            params['nextToken'] = next_token
+        response = ecs_client.list_tasks(**params)
+        task_arns.extend(response.get('taskArns', []))
+        next_token = response.get('nextToken')
+        if not next_token:
+            break
+    return task_arns, next_token
+
+def describe_tasks(ecs_client, cluster_name: str, task_arns: List[str], batch_size: int = DESCRIBE_TASKS_BATCH) -> List[Dict]:
+    tasks = []
+    for i in range(0, len(task_arns), batch_size):
+        response = ecs_client.describe_tasks(
+            cluster=cluster_name,
+            tasks=task_arns[i:i + batch_size]
+        )
+        tasks.extend(response.get('tasks', []))
+    return tasks
+
+def is_deploying(service: Dict) -> bool:
+    deployments = service.get('deployments') or []
+    return len(deployments) > 1 or any(d.get('rolloutState') == 'IN_PROGRESS' for d in deployments)
+
+class MetricsPipeline:
+    def __init__(self, cloudwatch, pool: ThreadPoolExecutor, end_time: datetime, history=None, batch_size: int = SERVICES_PER_METRICS_BATCH):
+        self.cloudwatch = cloudwatch
+        self.pool = pool
+        self.end_time = end_time
+        self.history = history
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._services = []
+        self._pending = []
+        self._futures = []
+
+    def add(self, cluster_name: str, services: List[Dict]):
+        with self._lock:
+            for service in services:
+                running_tasks = service.get('runningCount', 0)
+                self._services.append((cluster_name, service.get('serviceName'), running_tasks, is_deploying(service)))
+                self._pending.append((cluster_name, service.get('serviceName'), running_tasks >= HISTORY_MIN_RUNNING_TASKS))
+                if len(self._pending) >= self.batch_size:
+                    self._flush_locked()
+
+    def _flush_locked(self):
+        if self._pending:
+            future = self.pool.submit(fetch_service_metrics, self.cloudwatch, self._pending, self.end_time, self.history)
+            self._futures.append((future, self._pending))
+            self._pending = []
+
+    def collect(self) -> List[Tuple[str, str, int, bool, Optional[Dict]]]:
+        with self._lock:
+            self._flush_locked()
+            futures = list(self._futures)
+            services = sorted(self._services)
+        metrics = {}
+        for future, batch in futures:
+            try:
+                metrics.update(future.result())
+            except Exception as e:
+                logger.error(f"Metrics request for {len(batch)} services failed: {e}")
+        return [
+            (cluster_name, service_name, running_tasks, deploying, metrics.get((cluster_name, service_name)))
+            for cluster_name, service_name, running_tasks, deploying in services
+        ]
@@ -0,0 +1,57 @@
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from typing import Any, Callable, Dict, Iterable, Iterator
+
+logger = logging.getLogger("uvicorn.error")
+
+MAX_ALIAS_WORKERS = int(os.getenv("COLLECTOR_MAX_ALIASES", "4"))
+MAX_CLUSTER_WORKERS = int(os.getenv("COLLECTOR_MAX_CLUSTERS_PER_ALIAS", "8"))
+MAX_METRICS_WORKERS = int(os.getenv("COLLECTOR_MAX_METRICS_REQUESTS", "8"))
+
+class CollectionEngine:
+    def __init__(self, max_alias_workers: int = MAX_ALIAS_WORKERS, max_cluster_workers: int = MAX_CLUSTER_WORKERS, max_metrics_workers: int = MAX_METRICS_WORKERS):
+        self.max_alias_workers = max(1, max_alias_workers)
+        self.max_cluster_workers = max(1, max_cluster_workers)
+        self.alias_pool = ThreadPoolExecutor(
+            max_workers=self.max_alias_workers,
+            thread_name_prefix="collector-alias"
+        )
+        self.cluster_pool = ThreadPoolExecutor(
+            max_workers=self.max_alias_workers * self.max_cluster_workers,
+            thread_name_prefix="collector-cluster"
+        )
+        self.metrics_pool = ThreadPoolExecutor(
+            max_workers=max(1, max_metrics_workers),
+            thread_name_prefix="collector-metrics"
+        )
+
+    def map_clusters(self, fn: Callable[[Any], Any], items: Iterable[Any]) -> Iterator[Any]:
+        # Keeps at most max_cluster_workers calls in flight for one alias and
+        # yields results in completion order.
+        items = iter(items)
+        pending = set()
+        for item in items:
+            pending.add(self.cluster_pool.submit(fn, item))
+            if len(pending) >= self.max_cluster_workers:
+                break
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for item in items:
+                    pending.add(self.cluster_pool.submit(fn, item))
+                    break
+                yield future.result()
+
+    def run_cycle(self, aliases: Dict[str, str], refresh: Callable[[str, str], None]):
+        futures = {
+            self.alias_pool.submit(refresh, alias, profile_name): alias
+            for alias, profile_name in aliases.items()
+        }
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Collection failed for alias '{futures[future]}': {e}")
+
+collection_engine = CollectionEngine()
@@ -0,0 +1,198 @@
+import os
+import json
+import time
+import random
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+
+from telemetry import AWS_CALLS, AWS_CALL_LATENCY, AWS_ERRORS, AWS_RETRIES, AWS_THROTTLES
+
+AWS_MAX_ATTEMPTS = int(os.getenv("AWS_MAX_ATTEMPTS", "5"))
+AWS_BACKOFF_BASE = float(os.getenv("AWS_BACKOFF_BASE", "0.2"))
+AWS_BACKOFF_CAP = float(os.getenv("AWS_BACKOFF_CAP", "20"))
+AWS_INTERACTIVE_BACKOFF_CAP = float(os.getenv("AWS_INTERACTIVE_BACKOFF_CAP", "2"))
+
+# Requests per second per (profile, API); keys are "<service>.<Operation>",
+# "<service>" or "*" and can be overridden with AWS_API_RATES (JSON).
+DEFAULT_API_RATES = {
+    "ecs": 20,
+    "cloudwatch": 20,
+    "application-auto-scaling": 5,
+    "*": 10,
+}
+API_RATES = {**DEFAULT_API_RATES, **json.loads(os.getenv("AWS_API_RATES", "{}"))}
+BURST_SECONDS = float(os.getenv("AWS_API_BURST_SECONDS", "2"))
+
+THROTTLE_CODES = {
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "RequestThrottledException",
+    "TooManyRequestsException",
+    "RequestLimitExceeded",
+    "RequestThrottled",
+    "SlowDown",
+    "PriorRequestNotComplete",
+}
+TRANSIENT_STATUS_CODES = {500, 502, 503, 504}
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+request_priority = contextvars.ContextVar("request_priority", default=BACKGROUND)
+
+EXPORTED_COUNTERS = {
+    "calls": AWS_CALLS,
+    "throttles": AWS_THROTTLES,
+    "retries": AWS_RETRIES,
+    "errors": AWS_ERRORS,
+}
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.interactive_waiting = 0
+        self._cond = threading.Condition()
+
+    def _refill_locked(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, interactive: bool = False):
+        # Interactive callers always go first: background callers only take a
+        # token when no interactive caller is waiting for this bucket.
+        with self._cond:
+            if interactive:
+                self.interactive_waiting += 1
+            try:
+                while True:
+                    self._refill_locked()
+                    if self.tokens >= 1 and (interactive or not self.interactive_waiting):
+                        self.tokens -= 1
+                        return
+                    shortfall = max(0.0, 1 - self.tokens)
+                    self._cond.wait(timeout=max(shortfall / self.rate, 0.01))
+            finally:
+                if interactive:
+                    self.interactive_waiting -= 1
+                    self._cond.notify_all()
+
+    def on_throttle(self):
+        with self._cond:
+            self.rate = max(self.max_rate * 0.1, self.rate * 0.5)
+
+    def on_success(self):
+        if self.rate < self.max_rate:
+            with self._cond:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+class RequestGovernor:
+    def __init__(self, max_attempts: int = AWS_MAX_ATTEMPTS):
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._counters: Dict[Tuple[str, str], Dict[str, int]] = {}
+        # botocore sends one attempt at a time per thread, so the attempt start
+        # recorded in before-send is still current when needs-retry fires.
+        self._attempt = threading.local()
+
+    def _rate_for(self, api: str) -> float:
+        service = api.split(".", 1)[0]
+        return float(API_RATES.get(api, API_RATES.get(service, API_RATES["*"])))
+
+    def _bucket(self, key: Tuple[str, str]) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                rate = self._rate_for(key[1])
+                bucket = TokenBucket(rate, rate * BURST_SECONDS)
+                self._buckets[key] = bucket
+            return bucket
+
+    def _count(self, key: Tuple[str, str], counter: str):
+        with self._lock:
+            counters = self._counters.setdefault(key, {"calls": 0, "throttles": 0, "retries": 0, "errors": 0})
+            counters[counter] += 1
+        EXPORTED_COUNTERS[counter].labels(*key).inc()
+
+    @staticmethod
+    def _api(event_name: str) -> str:
+        # before-send.<service-id>.<Operation>
+        parts = event_name.split(".")
+        return ".".join(parts[1:3])
+
+    def _before_send(self, profile_name: str, event_name: str = "", **kwargs):
+        key = (profile_name, self._api(event_name))
+        self._bucket(key).acquire(interactive=request_priority.get() == INTERACTIVE)
+        self._count(key, "calls")
+        self._attempt.started = time.monotonic()
+
+    def _needs_retry(self, profile_name: str, event_name: str = "", response=None, attempts: int = 1, caught_exception=None, **kwargs) -> Optional[float]:
+        key = (profile_name, self._api(event_name))
+        bucket = self._bucket(key)
+        started = getattr(self._attempt, "started", None)
+        if started is not None:
+            AWS_CALL_LATENCY.labels(key[1]).observe(time.monotonic() - started)
+            self._attempt.started = None
+        throttled = False
+        retryable = caught_exception is not None
+        status_code = None
+        if response is not None:
+            http_response, parsed = response
+            status_code = http_response.status_code
+            code = (parsed or {}).get("Error", {}).get("Code")
+            throttled = code in THROTTLE_CODES or status_code == 429
+            retryable = throttled or status_code in TRANSIENT_STATUS_CODES
+        if throttled:
+            bucket.on_throttle()
+            self._count(key, "throttles")
+        elif not retryable:
+            if status_code is not None and status_code >= 400:
+                self._count(key, "errors")
+            else:
+                bucket.on_success()
+            return None
+        if attempts >= self.max_attempts:
+            self._count(key, "errors")
+            return None
+        self._count(key, "retries")
+        cap = AWS_INTERACTIVE_BACKOFF_CAP if request_priority.get() == INTERACTIVE else AWS_BACKOFF_CAP
+        return random.uniform(0, min(cap, AWS_BACKOFF_BASE * 2 ** attempts))
+
+    def attach(self, client, profile_name: str):
+        events = client.meta.events
+        events.register("before-send", lambda **kw: self._before_send(profile_name, **kw))
+        events.register("needs-retry", lambda **kw: self._needs_retry(profile_name, **kw))
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+            self._counters.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        with self._lock:
+            result = {}
+            for (profile_name, api), counters in self._counters.items():
+                bucket = self._buckets.get((profile_name, api))
+                result.setdefault(profile_name, {})[api] = {
+                    **counters,
+                    "rate_limit": round(bucket.rate, 2) if bucket else None
+                }
+            return result
+
+@contextmanager
+def interactive():
+    token = request_priority.set(INTERACTIVE)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+governor = RequestGovernor()
@@ -0,0 +1,95 @@
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Sequence, Tuple
+
+from cache import TTLCache
+from telemetry import cache_metrics
+from .cloudwatch import METRICS, get_metric_data, metric_query, to_epoch
+
+RANGE_PERIODS = (60, 300, 900, 1800, 3600, 10800, 21600, 86400)
+# CloudWatch keeps 1-minute datapoints for 15 days, 5-minute ones for 63 days
+# and hourly ones for 455 days.
+RANGE_RETENTION = ((timedelta(days=15), 60), (timedelta(days=63), 300), (timedelta(days=455), 3600))
+RANGE_MAX_WINDOW = timedelta(days=455)
+RANGE_MAX_RAW_POINTS = int(os.getenv("RANGE_MAX_RAW_POINTS", "1500"))
+RANGE_CHUNK_POINTS = 240
+RANGE_CACHE_SIZE = int(os.getenv("RANGE_CACHE_SIZE", "4096"))
+RANGE_RECENT_TTL = float(os.getenv("RANGE_RECENT_TTL", "60"))
+# Datapoints can arrive a few minutes late; younger chunks are not final.
+RANGE_SETTLE_SECONDS = 900
+
+ServiceKey = Tuple[str, str]
+Series = Dict[str, List[Tuple[float, float]]]
+
+def choose_period(start_time: datetime, end_time: datetime, now: datetime) -> int:
+    age = now - start_time
+    minimum = next((period for limit, period in RANGE_RETENTION if age <= limit), RANGE_PERIODS[-1])
+    span = (end_time - start_time).total_seconds()
+    for period in RANGE_PERIODS:
+        if period >= minimum and span / period <= RANGE_MAX_RAW_POINTS:
+            return period
+    return RANGE_PERIODS[-1]
+
+class RangeStore:
+    # CloudWatch series cut into period-aligned chunks of RANGE_CHUNK_POINTS.
+    # Settled chunks never change and stay until evicted; the chunk that is
+    # still filling up expires after RANGE_RECENT_TTL. A range request only
+    # fetches the chunks it is missing, in one GetMetricData pass.
+    def __init__(self, maxsize: int = RANGE_CACHE_SIZE, recent_ttl: float = RANGE_RECENT_TTL):
+        self.recent_ttl = recent_ttl
+        self._chunks = TTLCache(maxsize=maxsize, ttl=None)
+
+    def series(self, cloudwatch, alias: str, services: Sequence[ServiceKey], start_time: datetime, end_time: datetime, period: int) -> Dict[ServiceKey, Series]:
+        span = period * RANGE_CHUNK_POINTS
+        start, end = to_epoch(start_time), to_epoch(end_time)
+        chunk_starts = list(range(int(start // span) * span, int(end), span))
+        chunks = {}
+        missing = {}
+        for key in services:
+            for chunk_start in chunk_starts:
+                chunk = self._chunks.get((alias, key, period, chunk_start))
+                if chunk is None:
+                    missing.setdefault(key, []).append(chunk_start)
+                else:
+                    chunks[(key, chunk_start)] = chunk
+        if missing:
+            chunks.update(self._fetch(cloudwatch, alias, missing, period, span))
+        results = {}
+        for key in services:
+            series = {metric_key: [] for metric_key, _ in METRICS}
+            for chunk_start in chunk_starts:
+                for metric_key, points in chunks.get((key, chunk_start), {}).items():
+                    series[metric_key].extend(p for p in points if start <= p[0] <= end)
+            results[key] = series
+        return results
+
+    def _fetch(self, cloudwatch, alias: str, missing: Dict[ServiceKey, List[int]], period: int, span: int) -> Dict[Tuple[ServiceKey, int], Series]:
+        first = min(min(starts) for starts in missing.values())
+        last = max(max(starts) for starts in missing.values()) + span
+        queries = []
+        index = {}
+        for i, (cluster_name, service_name) in enumerate(missing):
+            for metric_key, metric_name in METRICS:
+                query_id = f"r{i}_{metric_key}"
+                queries.append(metric_query(query_id, cluster_name, service_name, metric_name, period))
+                index[query_id] = ((cluster_name, service_name), metric_key)
+        fetched = get_metric_data(cloudwatch, queries, datetime.utcfromtimestamp(first), datetime.utcfromtimestamp(last))
+        chunks = {}
+        for key, starts in missing.items():
+            for chunk_start in starts:
+                chunks[(key, chunk_start)] = {metric_key: [] for metric_key, _ in METRICS}
+        for query_id, (key, metric_key) in index.items():
+            for ts, value in fetched.get(query_id, []):
+                epoch = to_epoch(ts)
+                chunk = chunks.get((key, int(epoch // span) * span))
+                if chunk is not None:
+                    chunk[metric_key].append((epoch, value))
+        settled = time.time() - RANGE_SETTLE_SECONDS
+        for (key, chunk_start), chunk in chunks.items():
+            ttl = None if chunk_start + span <= settled else self.recent_ttl
+            self._chunks.set((alias, key, period, chunk_start), chunk, ttl=ttl)
+        return chunks
+
+range_store = RangeStore()
+cache_metrics.register("history_ranges", range_store._chunks)
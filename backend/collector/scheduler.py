@@ -0,0 +1,140 @@
+import os
+import time
+import random
+import logging
+import threading
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger("uvicorn.error")
+
+REFRESH_INTERVAL = float(os.getenv("REFRESH_INTERVAL", "600"))
+REFRESH_MIN_INTERVAL = float(os.getenv("REFRESH_MIN_INTERVAL", "120"))
+REFRESH_MAX_INTERVAL = float(os.getenv("REFRESH_MAX_INTERVAL", "1800"))
+REFRESH_JITTER = float(os.getenv("REFRESH_JITTER", "0.1"))
+HOT_UTILIZATION = float(os.getenv("HOT_UTILIZATION", "80"))
+
+SPEEDUP_FACTOR = 0.5
+BACKOFF_FACTOR = 1.5
+
+def assess_activity(previous: Iterable[Dict[str, Any]], current: Iterable[Dict[str, Any]]) -> str:
+    # "hot": something is running close to its limits, "changing": services
+    # were deployed, scaled, added or removed, "idle": nothing moved.
+    before = {(s["cluster_name"], s["service_name"]): s.get("running_tasks") for s in previous}
+    after = {}
+    hot = False
+    deploying = False
+    for service in current:
+        after[(service["cluster_name"], service["service_name"])] = service.get("running_tasks")
+        if max(service.get("current_cpu") or 0, service.get("current_memory") or 0) >= HOT_UTILIZATION:
+            hot = True
+        if service.get("deploying"):
+            deploying = True
+    if hot:
+        return "hot"
+    if deploying or before != after:
+        return "changing"
+    return "idle"
+
+class AliasSchedule:
+    def __init__(self, settings: Dict[str, Any]):
+        self.running = False
+        self.interval = None
+        self.update(settings)
+        # Spread the first refreshes too, so aliases do not all start together.
+        self.next_due = time.monotonic() + random.uniform(0, REFRESH_JITTER) * self.interval
+
+    def update(self, settings: Dict[str, Any]):
+        self.base_interval = float(settings.get("interval", REFRESH_INTERVAL))
+        self.min_interval = float(settings.get("min_interval", min(REFRESH_MIN_INTERVAL, self.base_interval)))
+        self.max_interval = float(settings.get("max_interval", max(REFRESH_MAX_INTERVAL, self.base_interval)))
+        if self.interval is None:
+            self.interval = self.base_interval
+        self.interval = min(max(self.interval, self.min_interval), self.max_interval)
+
+    def adapt(self, activity: Optional[str]):
+        if activity in ("hot", "changing"):
+            self.interval = max(self.min_interval, min(self.interval, self.base_interval) * SPEEDUP_FACTOR)
+        elif activity == "idle":
+            self.interval = min(self.max_interval, max(self.interval, self.base_interval) * BACKOFF_FACTOR)
+        else:
+            self.interval = self.base_interval
+
+    def schedule_next(self, now: float):
+        jitter = random.uniform(-REFRESH_JITTER, REFRESH_JITTER) * self.interval
+        self.next_due = now + self.interval + jitter
+
+class RefreshScheduler:
+    def __init__(self, executor: Executor, refresh: Callable[[str, str], Any]):
+        self.executor = executor
+        self.refresh = refresh
+        self._cond = threading.Condition()
+        self._schedules: Dict[str, AliasSchedule] = {}
+        self._profiles: Dict[str, str] = {}
+        self._activity: Dict[str, str] = {}
+
+    def configure(self, profiles: Dict[str, str], settings: Dict[str, Dict[str, Any]]):
+        with self._cond:
+            for alias in list(self._schedules):
+                if alias not in profiles:
+                    del self._schedules[alias]
+            for alias in profiles:
+                alias_settings = settings.get(alias, {})
+                if alias in self._schedules:
+                    self._schedules[alias].update(alias_settings)
+                else:
+                    self._schedules[alias] = AliasSchedule(alias_settings)
+            self._profiles = dict(profiles)
+            self._cond.notify_all()
+
+    def record_activity(self, alias: str, activity: str):
+        with self._cond:
+            self._activity[alias] = activity
+
+    def trigger(self, alias: str) -> bool:
+        with self._cond:
+            schedule = self._schedules.get(alias)
+            if schedule is None or schedule.running:
+                return False
+            schedule.next_due = time.monotonic()
+            self._cond.notify_all()
+            return True
+
+    def is_running(self, alias: str) -> bool:
+        with self._cond:
+            schedule = self._schedules.get(alias)
+            return bool(schedule and schedule.running)
+
+    def next_refresh_in(self, alias: str) -> Optional[float]:
+        with self._cond:
+            schedule = self._schedules.get(alias)
+            if schedule is None or schedule.running:
+                return None
+            return max(0.0, schedule.next_due - time.monotonic())
+
+    def _run(self, alias: str, profile_name: str):
+        try:
+            self.refresh(alias, profile_name)
+        except Exception as e:
+            logger.error(f"Scheduled refresh failed for alias '{alias}': {e}")
+        finally:
+            with self._cond:
+                schedule = self._schedules.get(alias)
+                if schedule is not None:
+                    schedule.running = False
+                    schedule.adapt(self._activity.pop(alias, None))
+                    schedule.schedule_next(time.monotonic())
+                self._cond.notify_all()
+
+    def run_forever(self):
+        while True:
+            with self._cond:
+                now = time.monotonic()
+                idle = [(alias, s) for alias, s in self._schedules.items() if not s.running]
+                due = [(alias, s) for alias, s in idle if s.next_due <= now]
+                for alias, schedule in due:
+                    schedule.running = True
+                    self.executor.submit(self._run, alias, self._profiles[alias])
+                if not due:
+                    wait = min((s.next_due - now for _, s in idle), default=None)
+                    self._cond.wait(timeout=wait)
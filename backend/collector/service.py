@@ -0,0 +1,356 @@
+import os
+import json
+import time
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from telemetry import (
+    CLUSTER_DISCOVERY_DURATION, COLLECTION_ERRORS, REFRESH_DURATION, REFRESHES,
+    MULTIPROCESS, SERVICES_COLLECTED, SERVICES_WITHOUT_METRICS, data_age
+)
+from .clients import client_registry, is_credential_error
+from .coordination import SHARED_POLL_INTERVAL, SharedState, shared_state
+from .discovery import MetricsPipeline, iter_cluster_names, iter_service_batches
+from .engine import CollectionEngine, collection_engine
+from .scheduler import RefreshScheduler, assess_activity
+from .snapshot import SnapshotStore, snapshot_store
+from .taskdefs import TaskDefinitionCache, taskdef_cache
+from .timeseries import TimeSeriesStore, timeseries_store
+
+logger = logging.getLogger("uvicorn.error")
+
+DEFAULT_CONFIG = {"dev": "dev-profile", "prod": "prod-profile"}
+EMPTY_METRICS = {"current_cpu": 0, "current_memory": 0, "historical_cpu": [], "historical_memory": []}
+SLOW_CLUSTER_SECONDS = float(os.getenv("SLOW_CLUSTER_SECONDS", "30"))
+SLOW_CLUSTER_LOG_LIMIT = int(os.getenv("SLOW_CLUSTER_LOG_LIMIT", "5"))
+
+def read_config(path: str) -> Tuple[Dict[str, str], Dict[str, Dict[str, Any]]]:
+    try:
+        with open(path, "r") as f:
+            raw_config = json.load(f)
+    except Exception:
+        raw_config = DEFAULT_CONFIG
+    profiles = {}
+    settings = {}
+    for alias, entry in raw_config.items():
+        if isinstance(entry, dict):
+            profiles[alias] = entry.get("profile", alias)
+            settings[alias] = {k: v for k, v in entry.items() if k != "profile"}
+        else:
+            profiles[alias] = entry
+    return profiles, settings
+
+def log_slow_clusters(alias: str, durations: Dict[str, float]):
+    slow = sorted(
+        ((duration, cluster_name) for cluster_name, duration in durations.items() if duration >= SLOW_CLUSTER_SECONDS),
+        reverse=True
+    )
+    if slow:
+        listed = ", ".join(f"{cluster_name} {duration:.1f}s" for duration, cluster_name in slow[:SLOW_CLUSTER_LOG_LIMIT])
+        logger.warning(f"Slow service discovery in alias '{alias}' ({len(slow)} clusters over {SLOW_CLUSTER_SECONDS:g}s): {listed}")
+
+PublishListener = Callable[[str, List[Dict[str, Any]], List[Dict[str, Any]], str], None]
+StatusListener = Callable[[str, Dict[str, Any]], None]
+RemoveListener = Callable[[str, List[Dict[str, Any]]], None]
+
+class CollectorService:
+    # Owns everything needed to collect an alias and persist it, with no
+    # dependency on the API. The API embeds one; `python -m collector` runs
+    # one on its own and the API only follows the snapshots it writes.
+    def __init__(self, engine: CollectionEngine = collection_engine, store: SnapshotStore = snapshot_store,
+                 history: TimeSeriesStore = timeseries_store, shared: SharedState = shared_state,
+                 task_definitions: TaskDefinitionCache = taskdef_cache):
+        self.engine = engine
+        self.store = store
+        self.history = history
+        self.shared = shared
+        self.task_definitions = task_definitions
+        self.profiles: Dict[str, str] = {}
+        self.settings: Dict[str, Dict[str, Any]] = {}
+        self.services: Dict[str, List[Dict[str, Any]]] = {}
+        self.last_update_time: Dict[str, str] = {}
+        self.refresh_status: Dict[str, Dict[str, Any]] = {}
+        self.stale = set()
+        self.publish_listeners: List[PublishListener] = []
+        self.status_listeners: List[StatusListener] = []
+        self.remove_listeners: List[RemoveListener] = []
+        self.scheduler = RefreshScheduler(engine.alias_pool, self.refresh)
+        self._lock = threading.Lock()
+        self._snapshot_versions = {}
+        self._shared_statuses = {}
+        self._leader_next_refresh = {}
+        self._scheduler_started = False
+
+    def configure(self, profiles: Dict[str, str], settings: Dict[str, Dict[str, Any]]):
+        self.profiles = dict(profiles)
+        self.settings = settings
+        client_registry.retain(self.profiles.values())
+        self.scheduler.configure(self.profiles, settings)
+        for alias in (set(self.services) | set(self.refresh_status)) - set(self.profiles):
+            self.forget(alias)
+
+    def forget(self, alias: str):
+        # The dicts are shared with the API, so they are pruned in place.
+        previous = self.services.pop(alias, [])
+        self.last_update_time.pop(alias, None)
+        self.refresh_status.pop(alias, None)
+        self.stale.discard(alias)
+        for state in (self._snapshot_versions, self._shared_statuses, self._leader_next_refresh):
+            state.pop(alias, None)
+        self.history.retain(alias, [])
+        data_age.forget(alias)
+        # prometheus_client cannot remove label sets from the multiprocess files.
+        if not MULTIPROCESS:
+            for gauge in (SERVICES_COLLECTED, SERVICES_WITHOUT_METRICS):
+                try:
+                    gauge.remove(alias)
+                except KeyError:
+                    pass
+        for listener in self.remove_listeners:
+            try:
+                listener(alias, previous)
+            except Exception as e:
+                logger.error(f"Remove listener failed for alias '{alias}': {e}")
+        logger.info(f"Dropped alias '{alias}' after it was removed from the config")
+
+    def _notify_publish(self, alias: str, previous: List[Dict[str, Any]], services: List[Dict[str, Any]], updated_at: str):
+        for listener in self.publish_listeners:
+            try:
+                listener(alias, previous, services, updated_at)
+            except Exception as e:
+                logger.error(f"Publish listener failed for alias '{alias}': {e}")
+
+    def fetch(self, alias: str, profile_name: str) -> List[Dict[str, Any]]:
+        try:
+            ecs_client = client_registry.client(profile_name, 'ecs')
+            cloudwatch = client_registry.client(profile_name, 'cloudwatch')
+            current_time = datetime.utcnow()
+            history = self.history.view(alias)
+            pipeline = MetricsPipeline(cloudwatch, self.engine.metrics_pool, current_time, history)
+            failed_clusters = set()
+            discovery_durations = {}
+
+            def discover_cluster(cluster_name):
+                started = time.monotonic()
+                try:
+                    for services in iter_service_batches(ecs_client, cluster_name):
+                        pipeline.add(cluster_name, services)
+                    return True
+                except Exception as e:
+                    if is_credential_error(e):
+                        client_registry.refresh(profile_name)
+                    COLLECTION_ERRORS.labels(alias, "discovery").inc()
+                    failed_clusters.add(cluster_name)
+                    logger.error(f"Service discovery failed for cluster '{cluster_name}' in alias '{alias}': {e}")
+                    return False
+                finally:
+                    duration = time.monotonic() - started
+                    CLUSTER_DISCOVERY_DURATION.labels(alias).observe(duration)
+                    discovery_durations[cluster_name] = duration
+
+            discovered = list(self.engine.map_clusters(discover_cluster, iter_cluster_names(ecs_client)))
+            log_slow_clusters(alias, discovery_durations)
+            if discovered and not any(discovered):
+                raise RuntimeError(f"service discovery failed for all {len(discovered)} clusters")
+            collected = pipeline.collect()
+            previous = {(s["cluster_name"], s["service_name"]): s for s in self.services.get(alias, [])}
+            # A cluster that failed discovery still exists: keep serving its last
+            # known services (and their history) until it can be listed again,
+            # except those the batches it returned before failing already cover.
+            collected_keys = {(cluster_name, service_name) for cluster_name, service_name, _, _, _ in collected}
+            carried = [s for key, s in previous.items() if key[0] in failed_clusters and key not in collected_keys]
+            history.retain(collected_keys | {(s["cluster_name"], s["service_name"]) for s in carried})
+            services_data = list(carried)
+            missing_metrics = 0
+            for cluster_name, service_name, running_tasks, deploying, service_metrics in collected:
+                if service_metrics is None:
+                    missing_metrics += 1
+                    # Keep the last known values rather than reporting 0% when CloudWatch failed.
+                    service_metrics = previous.get((cluster_name, service_name), EMPTY_METRICS)
+                services_data.append({
+                    "account_alias": alias,
+                    "cluster_name": cluster_name,
+                    "service_name": service_name,
+                    "running_tasks": running_tasks,
+                    "deploying": deploying,
+                    "current_cpu": service_metrics["current_cpu"],
+                    "current_memory": service_metrics["current_memory"],
+                    "historical_cpu": service_metrics["historical_cpu"],
+                    "historical_memory": service_metrics["historical_memory"],
+                    "last_updated": current_time.isoformat()
+                })
+            if missing_metrics:
+                COLLECTION_ERRORS.labels(alias, "metrics").inc()
+            SERVICES_COLLECTED.labels(alias).set(len(services_data))
+            SERVICES_WITHOUT_METRICS.labels(alias).set(missing_metrics)
+            return services_data
+        except Exception as e:
+            if is_credential_error(e):
+                client_registry.refresh(profile_name)
+            COLLECTION_ERRORS.labels(alias, "collection").inc()
+            # refresh() keeps the previous data and records the failure.
+            raise
+
+    def publish(self, alias: str, services_data: List[Dict[str, Any]]):
+        previous = self.services.get(alias, [])
+        updated_at = datetime.utcnow().isoformat()
+        self.services[alias] = services_data
+        self.last_update_time[alias] = updated_at
+        self.stale.discard(alias)
+        data_age.mark(alias, time.time())
+        self.scheduler.record_activity(alias, assess_activity(previous, services_data))
+        self._notify_publish(alias, previous, services_data, updated_at)
+
+    def save_snapshot(self, alias: str):
+        try:
+            self.store.save(
+                alias,
+                self.services.get(alias, []),
+                self.last_update_time.get(alias),
+                self.history.export(alias)
+            )
+        except Exception as e:
+            logger.error(f"Failed to persist snapshot for alias '{alias}': {e}")
+        self.task_definitions.save()
+
+    def refresh(self, alias: str, profile_name: str):
+        with self._lock:
+            if self.refresh_status.get(alias, {}).get("in_progress"):
+                return
+            status = self.refresh_status[alias] = {"in_progress": True, "status": "Refresh in progress"}
+        self.publish_status(alias)
+        started = time.monotonic()
+        try:
+            services_data = self.fetch(alias, profile_name)
+        except Exception as e:
+            status["status"] = f"Refresh failed: {e}"
+            REFRESHES.labels(alias, "failure").inc()
+            logger.error(f"Refresh failed for alias '{alias}': {e}")
+        else:
+            # An alias removed from the config while it was being collected
+            # stays removed. Only a completed collection may replace the
+            # snapshot on disk.
+            if alias in self.profiles:
+                self.publish(alias, services_data)
+                status["status"] = "Refresh completed"
+                self.save_snapshot(alias)
+                REFRESHES.labels(alias, "success").inc()
+        finally:
+            REFRESH_DURATION.labels(alias).observe(time.monotonic() - started)
+            status["in_progress"] = False
+            if alias in self.refresh_status:
+                self.publish_status(alias)
+
+    def restore(self, alias: str, snapshot: Dict[str, Any]):
+        previous = self.services.get(alias, [])
+        self.services[alias] = snapshot["services"]
+        self.last_update_time[alias] = snapshot["last_update_time"]
+        self.history.restore(alias, snapshot["history"])
+        try:
+            data_age.mark(alias, datetime.fromisoformat(snapshot["last_update_time"]).replace(tzinfo=timezone.utc).timestamp())
+        except (TypeError, ValueError):
+            pass
+        self._notify_publish(alias, previous, snapshot["services"], snapshot["last_update_time"])
+
+    def load_snapshots(self):
+        self.task_definitions.load()
+        for alias in self.profiles:
+            if alias in self.services:
+                continue
+            version = self.store.version(alias)
+            snapshot = self.store.load(alias)
+            if snapshot is None:
+                continue
+            self.restore(alias, snapshot)
+            self._snapshot_versions[alias] = version
+            self.stale.add(alias)
+            logger.info(f"Loaded snapshot for alias '{alias}' from {snapshot['last_update_time']}")
+
+    def share_status(self, alias: str):
+        status = self.refresh_status.get(alias, {"in_progress": False, "status": "Not started"})
+        next_refresh_in = self.scheduler.next_refresh_in(alias)
+        shared = {
+            **status,
+            "stale": alias in self.stale,
+            "last_update_time": self.last_update_time.get(alias),
+            "next_refresh_at": round(time.time() + next_refresh_in) if next_refresh_in is not None else None
+        }
+        if self._shared_statuses.get(alias) != shared:
+            self.shared.write_status(alias, shared)
+            self._shared_statuses[alias] = shared
+
+    def publish_status(self, alias: str):
+        status = self.refresh_status[alias]
+        for listener in self.status_listeners:
+            listener(alias, status)
+        if self.shared.is_leader:
+            try:
+                self.share_status(alias)
+            except Exception as e:
+                logger.error(f"Failed to share refresh status for alias '{alias}': {e}")
+
+    def lead(self):
+        if not self._scheduler_started:
+            threading.Thread(target=self.scheduler.run_forever, daemon=True).start()
+            self._scheduler_started = True
+        for alias in self.shared.take_refresh_requests():
+            if alias in self.profiles:
+                self.scheduler.trigger(alias)
+        for alias in list(self.profiles):
+            self.share_status(alias)
+
+    def follow(self):
+        # Followers serve whatever the host's collector last wrote.
+        for alias in list(self.profiles):
+            version = self.store.version(alias)
+            if version is not None and version != self._snapshot_versions.get(alias):
+                snapshot = self.store.load(alias)
+                if snapshot is not None:
+                    self.restore(alias, snapshot)
+                    self._snapshot_versions[alias] = version
+            shared = self.shared.read_status(alias)
+            if shared is None:
+                continue
+            if shared.get("stale"):
+                self.stale.add(alias)
+            else:
+                self.stale.discard(alias)
+            self._leader_next_refresh[alias] = shared.get("next_refresh_at")
+            status = {"in_progress": bool(shared.get("in_progress")), "status": shared.get("status", "Not started")}
+            if self.refresh_status.get(alias) != status:
+                self.refresh_status[alias] = status
+                for listener in self.status_listeners:
+                    listener(alias, status)
+
+    def coordinate(self, can_lead: bool = True, poll_interval: float = SHARED_POLL_INTERVAL):
+        # The process holding the host's collector lock runs the scheduler;
+        # every other process follows its snapshots and status files.
+        while True:
+            try:
+                if can_lead and not self.shared.is_leader and self.shared.try_acquire_leadership():
+                    logger.info(f"Process {os.getpid()} is now the collector for this host")
+                if self.shared.is_leader:
+                    self.lead()
+                else:
+                    self.follow()
+            except Exception as e:
+                logger.error(f"Collector coordination failed: {e}")
+            time.sleep(poll_interval)
+
+    def request_refresh(self, alias: str) -> bool:
+        if self.refresh_status.get(alias, {}).get("in_progress"):
+            return False
+        if self.shared.is_leader:
+            return self.scheduler.trigger(alias)
+        self.shared.request_refresh(alias)
+        return True
+
+    def next_refresh_in(self, alias: str) -> Optional[float]:
+        if self.shared.is_leader:
+            return self.scheduler.next_refresh_in(alias)
+        next_refresh_at = self._leader_next_refresh.get(alias)
+        if next_refresh_at is None or self.refresh_status.get(alias, {}).get("in_progress"):
+            return None
+        return max(0.0, next_refresh_at - time.time())
@@ -0,0 +1,68 @@
+import os
+import gzip
+import json
+import logging
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("uvicorn.error")
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "snapshots")
+SNAPSHOT_FORMAT = 1
+
+def write_atomic(path: str, data: bytes, durable: bool = True):
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+class SnapshotStore:
+    def __init__(self, directory: str = SNAPSHOT_DIR):
+        self.directory = directory
+
+    def path(self, alias: str) -> str:
+        return os.path.join(self.directory, f"{alias}.json.gz")
+
+    def version(self, alias: str) -> Optional[Tuple[int, int, int]]:
+        # Every save replaces the file, so inode and mtime identify a snapshot.
+        try:
+            st = os.stat(self.path(alias))
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def save(self, alias: str, services: List[Dict[str, Any]], updated_at: str, history: Optional[Dict[str, Any]] = None):
+        payload = {
+            "format": SNAPSHOT_FORMAT,
+            "alias": alias,
+            "last_update_time": updated_at,
+            "services": services,
+            "history": history or {}
+        }
+        data = gzip.compress(json.dumps(payload, separators=(",", ":")).encode(), compresslevel=1)
+        write_atomic(self.path(alias), data)
+
+    def load(self, alias: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path(alias), "rb") as f:
+                payload = json.loads(gzip.decompress(f.read()))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable snapshot for alias '{alias}': {e}")
+            return None
+        if payload.get("format") != SNAPSHOT_FORMAT or payload.get("alias") != alias:
+            return None
+        return payload
+
+snapshot_store = SnapshotStore()
@@ -0,0 +1,107 @@
+import os
+import gzip
+import json
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from cache import TTLCache
+from telemetry import cache_metrics
+from .snapshot import SNAPSHOT_DIR, write_atomic
+
+logger = logging.getLogger("uvicorn.error")
+
+TASK_DEFINITION_CACHE_SIZE = int(os.getenv("TASK_DEFINITION_CACHE_SIZE", "2048"))
+TASK_DEFINITION_CACHE_PERSIST = os.getenv("TASK_DEFINITION_CACHE_PERSIST", "true").lower() in ("1", "true", "yes")
+TASK_DEFINITION_CACHE_FORMAT = 1
+
+def is_revision_arn(task_definition: str) -> bool:
+    # A bare family (or family without revision) resolves to whatever is
+    # latest; only a full ARN with a revision is immutable.
+    if not task_definition.startswith("arn:"):
+        return False
+    _, _, revision = task_definition.split("/")[-1].partition(":")
+    return revision.isdigit()
+
+def parse_task_definition(task_definition: Dict[str, Any]) -> Dict[str, Any]:
+    containers = []
+    for container in task_definition.get('containerDefinitions', []):
+        if isinstance(container, dict):
+            containers.append({
+                "name": container.get('name', ''),
+                "image": container.get('image', ''),
+                "cpu": container.get('cpu', 0),
+                "memory": container.get('memory', 0),
+                "memory_reservation": container.get('memoryReservation', 0),
+                "essential": container.get('essential', False),
+                "portMappings": container.get('portMappings', [])
+            })
+    return {
+        "arn": task_definition.get('taskDefinitionArn', ''),
+        "family": task_definition.get('family', ''),
+        "revision": task_definition.get('revision', 0),
+        "cpu": task_definition.get('cpu', ''),
+        "memory": task_definition.get('memory', ''),
+        "network_mode": task_definition.get('networkMode', ''),
+        "containers": containers
+    }
+
+class TaskDefinitionCache:
+    # Parsed task definitions keyed by revision ARN. Revisions never change,
+    # so entries only leave the cache when it is full.
+    def __init__(self, maxsize: int = TASK_DEFINITION_CACHE_SIZE, path: Optional[str] = None):
+        self.path = path
+        self._cache = TTLCache(maxsize=maxsize, ttl=None)
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    def get(self, ecs_client, task_definition: str) -> Dict[str, Any]:
+        def load():
+            response = ecs_client.describe_task_definition(taskDefinition=task_definition)
+            return parse_task_definition(response['taskDefinition'])
+
+        if not is_revision_arn(task_definition):
+            return load()
+
+        def load_new():
+            parsed = load()
+            self._dirty = True
+            return parsed
+
+        return self._cache.get_or_load(task_definition, load_new)
+
+    def clear(self):
+        self._cache.clear()
+
+    def save(self):
+        if not self.path or not self._dirty:
+            return
+        with self._lock:
+            self._dirty = False
+            payload = {"format": TASK_DEFINITION_CACHE_FORMAT, "task_definitions": dict(self._cache.items())}
+            try:
+                write_atomic(self.path, gzip.compress(json.dumps(payload, separators=(",", ":")).encode(), compresslevel=1), durable=False)
+            except Exception as e:
+                self._dirty = True
+                logger.error(f"Failed to persist task definitions: {e}")
+
+    def load(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, "rb") as f:
+                payload = json.loads(gzip.decompress(f.read()))
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable task definition cache: {e}")
+            return
+        if payload.get("format") != TASK_DEFINITION_CACHE_FORMAT:
+            return
+        for arn, parsed in payload.get("task_definitions", {}).items():
+            self._cache.set(arn, parsed)
+
+taskdef_cache = TaskDefinitionCache(
+    path=os.path.join(SNAPSHOT_DIR, "task-definitions.json.gz") if TASK_DEFINITION_CACHE_PERSIST else None
+)
+cache_metrics.register("task_definitions", taskdef_cache._cache)
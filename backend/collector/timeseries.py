@@ -0,0 +1,147 @@
+import os
+import threading
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+from .cloudwatch import HISTORY_PERIOD, HISTORY_WINDOW, METRICS, align_time, to_epoch
+
+TIMESERIES_CAPACITY = int(os.getenv("TIMESERIES_CAPACITY", "48"))
+
+class RingBuffer:
+    __slots__ = ("capacity", "timestamps", "values", "start", "size")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.timestamps = array("d", bytes(8 * capacity))
+        self.values = array("d", bytes(8 * capacity))
+        self.start = 0
+        self.size = 0
+
+    def last_timestamp(self) -> Optional[float]:
+        if not self.size:
+            return None
+        return self.timestamps[(self.start + self.size - 1) % self.capacity]
+
+    def append(self, timestamp: float, value: float):
+        last = self.last_timestamp()
+        if last is not None and timestamp < last:
+            return
+        if last is not None and timestamp == last:
+            self.values[(self.start + self.size - 1) % self.capacity] = value
+            return
+        if self.size < self.capacity:
+            index = (self.start + self.size) % self.capacity
+            self.size += 1
+        else:
+            index = self.start
+            self.start = (self.start + 1) % self.capacity
+        self.timestamps[index] = timestamp
+        self.values[index] = value
+
+    def since(self, timestamp: float) -> List[float]:
+        result = []
+        for i in range(self.size):
+            index = (self.start + i) % self.capacity
+            if self.timestamps[index] >= timestamp:
+                result.append(self.values[index])
+        return result
+
+    def items(self) -> List[Tuple[float, float]]:
+        return [
+            (self.timestamps[(self.start + i) % self.capacity], self.values[(self.start + i) % self.capacity])
+            for i in range(self.size)
+        ]
+
+class AliasHistory:
+    def __init__(self, store: "TimeSeriesStore", alias: str):
+        self.store = store
+        self.alias = alias
+
+    def start_for(self, key: Tuple[str, str], end_time: datetime) -> Optional[datetime]:
+        return self.store.start_for((self.alias,) + key, end_time)
+
+    def record(self, key: Tuple[str, str], metric: str, points: Iterable[Tuple[datetime, float]]):
+        self.store.record((self.alias,) + key, metric, points)
+
+    def values(self, key: Tuple[str, str], metric: str, end_time: datetime) -> List[float]:
+        return self.store.values((self.alias,) + key, metric, end_time)
+
+    def retain(self, keys: Iterable[Tuple[str, str]]):
+        self.store.retain(self.alias, keys)
+
+class TimeSeriesStore:
+    def __init__(self, capacity: int = TIMESERIES_CAPACITY, period: int = HISTORY_PERIOD):
+        self.capacity = capacity
+        self.period = period
+        self._lock = threading.Lock()
+        self._series: Dict[Hashable, Dict[str, RingBuffer]] = {}
+
+    def view(self, alias: str) -> AliasHistory:
+        return AliasHistory(self, alias)
+
+    def start_for(self, key: Hashable, end_time: datetime) -> Optional[datetime]:
+        # Returns where an incremental fetch should resume, or None when the
+        # series has to be backfilled over the full history window.
+        with self._lock:
+            buffers = self._series.get(key)
+            if not buffers or any(buffers[m].size == 0 for m, _ in METRICS):
+                return None
+            last = min(buffers[m].last_timestamp() for m, _ in METRICS)
+        if last < to_epoch(end_time - HISTORY_WINDOW):
+            return None
+        return datetime.utcfromtimestamp(last)
+
+    def record(self, key: Hashable, metric: str, points: Iterable[Tuple[datetime, float]]):
+        with self._lock:
+            buffers = self._series.setdefault(key, {m: RingBuffer(self.capacity) for m, _ in METRICS})
+            buffer = buffers[metric]
+            for timestamp, value in points:
+                buffer.append(to_epoch(timestamp), value)
+
+    def values(self, key: Hashable, metric: str, end_time: datetime) -> List[float]:
+        since = to_epoch(align_time(end_time - HISTORY_WINDOW, self.period))
+        with self._lock:
+            buffers = self._series.get(key)
+            if not buffers:
+                return []
+            return buffers[metric].since(since)
+
+    def is_warm(self, key: Hashable, end_time: datetime, max_age: timedelta = timedelta(seconds=2 * HISTORY_PERIOD)) -> bool:
+        with self._lock:
+            buffers = self._series.get(key)
+            if not buffers:
+                return False
+            lasts = [buffers[m].last_timestamp() for m, _ in METRICS]
+        return all(last is not None and last >= to_epoch(end_time - max_age) for last in lasts)
+
+    def export(self, alias: str) -> Dict[str, Dict[str, Dict[str, List[Tuple[float, float]]]]]:
+        exported = {}
+        with self._lock:
+            for (key_alias, cluster_name, service_name), buffers in self._series.items():
+                if key_alias == alias:
+                    exported.setdefault(cluster_name, {})[service_name] = {
+                        metric: buffer.items() for metric, buffer in buffers.items()
+                    }
+        return exported
+
+    def restore(self, alias: str, exported: Dict[str, Dict[str, Dict[str, List[Tuple[float, float]]]]]):
+        with self._lock:
+            for cluster_name, services in exported.items():
+                for service_name, metrics in services.items():
+                    buffers = self._series.setdefault(
+                        (alias, cluster_name, service_name),
+                        {m: RingBuffer(self.capacity) for m, _ in METRICS}
+                    )
+                    for metric, points in metrics.items():
+                        if metric in buffers:
+                            for timestamp, value in points:
+                                buffers[metric].append(timestamp, value)
+
+    def retain(self, alias: str, keys: Iterable[Tuple[str, str]]):
+        keep = {(alias,) + tuple(key) for key in keys}
+        with self._lock:
+            for key in [k for k in self._series if k[0] == alias and k not in keep]:
+                del self._series[key]
+
+timeseries_store = TimeSeriesStore()
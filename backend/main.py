@@ -1,26 +1,44 @@
 import json
+import asyncio
+import contextvars
 import time
 import threading
 import os
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 from itertools import islice
-import boto3
 import uvicorn
-from fastapi import FastAPI, Depends, HTTPException, status, Cookie, Request
+from fastapi import FastAPI, Depends, HTTPException, status, Cookie, Request, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import jwt
+from botocore.exceptions import ClientError
 from jwt import PyJWTError, ExpiredSignatureError
 from dotenv import load_dotenv
 from auth.routes import router as auth_router
+from auth.cache import register_token_verifier, verify_token_cached
+from cache import TTLCache
+from collector.clients import client_registry, is_credential_error
+from collector.cloudwatch import fetch_service_metrics, pad_history
+from collector.discovery import DESCRIBE_SERVICES_BATCH, describe_tasks, list_task_arns
+from collector.governor import governor, interactive
+from collector.ranges import RANGE_MAX_WINDOW, choose_period, range_store
+from collector.service import CollectorService, read_config
+from collector.taskdefs import taskdef_cache
+from collector.timeseries import timeseries_store
+from serving.live import LIVE_KEEPALIVE_SECONDS, RESYNC, format_event, live_updates
+from serving.history import DOWNSAMPLE_METHODS, ROLLUP_AGGREGATES, downsample, parse_window, rollup
+from serving.hotspots import HOTSPOT_METHODS, HOTSPOT_METRICS, top_hotspots
+from serving.query import ClustersQuery, QueryError, query_etag, run_query
+from serving.views import accepts_gzip, cluster_views, etag_matches
+from telemetry import HTTP_REQUEST_DURATION, cache_metrics, render_metrics
 import logging
 
 app = FastAPI(title="ECS Monitoring API")
 app.include_router(auth_router)
-refresh_status = {}
 load_dotenv()
 logger = logging.getLogger("uvicorn.error")
 
@@ -46,10 +64,14 @@ class JWTBearer(HTTPBearer):
             raise HTTPException(status_code=401, detail="Missing credentials")
         return token
 
+register_token_verifier("api", lambda t: jwt.decode(t, JWT_SECRET, algorithms=[JWT_ALGORITHM]))
+
 def verify_jwt(token: str = Depends(JWTBearer())):
     try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        payload = verify_token_cached("api", token)
         return SessionData(**payload)
+    except HTTPException:
+        raise
     except ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token has expired")
     except PyJWTError as e:
@@ -66,22 +88,66 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        HTTP_REQUEST_DURATION.labels(request.method, path, str(status_code)).observe(time.perf_counter() - started)
+
 CONFIG_FILE = "config.json"
+CONFIG_RELOAD_INTERVAL = int(os.getenv("CONFIG_RELOAD_INTERVAL", "60"))
+COLLECTOR_MODE = os.getenv("COLLECTOR_MODE", "embedded")
 profiles_config = {}
-clusters_data = {}
-last_update_time = {}
+alias_settings = {}
+collector_service = CollectorService()
+clusters_data = collector_service.services
+last_update_time = collector_service.last_update_time
+refresh_status = collector_service.refresh_status
+stale_aliases = collector_service.stale
+service_details_cache = TTLCache(
+    maxsize=int(os.getenv("SERVICE_DETAILS_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("SERVICE_DETAILS_CACHE_TTL", "30"))
+)
+# Tasks included in /service-details; the rest are paged through /service-details/tasks
+SERVICE_DETAILS_TASK_PAGE = int(os.getenv("SERVICE_DETAILS_TASK_PAGE", "20"))
+SERVICE_TASKS_MAX_PAGE = 500
+BULK_DETAILS_MAX_SERVICES = int(os.getenv("BULK_DETAILS_MAX_SERVICES", "100"))
+details_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SERVICE_DETAILS_WORKERS", "32")),
+    thread_name_prefix="service-details"
+)
+cache_metrics.register("service_details", service_details_cache)
 
 class ClusterService(BaseModel):
     account_alias: str
     cluster_name: str
     service_name: str
     running_tasks: int
+    deploying: bool = False
     current_cpu: float
     current_memory: float
     historical_cpu: List[float] = []
     historical_memory: List[float] = []
     last_updated: str
 
+class Hotspot(BaseModel):
+    account_alias: str
+    cluster_name: str
+    service_name: str
+    running_tasks: int
+    current_cpu: float
+    current_memory: float
+    metric: str
+    method: str
+    score: float
+
 class HealthResponse(BaseModel):
     status: str
 
@@ -91,61 +157,69 @@ class ServiceDetailsResponse(BaseModel):
     current_tasks: Dict[str, Any]
     events: Dict[str, List[Dict[str, Any]]]
     configuration: Dict[str, Any]
+    timings: Dict[str, float] = {}
+
+class ServiceRef(BaseModel):
+    cluster_name: str
+    service_name: str
+
+class BulkServiceDetailsRequest(BaseModel):
+    alias: str
+    services: List[ServiceRef]
+
+class ServiceTasksResponse(BaseModel):
+    tasks: List[Dict[str, Any]]
+    task_definitions: Dict[str, Dict[str, Any]]
+    next_cursor: Optional[str] = None
+    timings: Dict[str, float] = {}
 
 def load_config():
-    global profiles_config
-    try:
-        with open(CONFIG_FILE, "r") as f:
-            profiles_config = json.load(f)
-    except Exception as e:
-        profiles_config = {"dev": "dev-profile", "prod": "prod-profile"}
+    global profiles_config, alias_settings
+    profiles_config, alias_settings = read_config(CONFIG_FILE)
+    collector_service.configure(profiles_config, alias_settings)
 
-def refresh_data_for_alias(alias: str, profile_name: str):
-    global clusters_data, last_update_time, refresh_status
-    refresh_status[alias] = {"in_progress": True, "status": "Refresh in progress"}
-    try:
-        services_data = fetch_ecs_data(alias, profile_name)
-        clusters_data[alias] = services_data
-        last_update_time[alias] = datetime.utcnow().isoformat()
-        refresh_status[alias]["status"] = "Refresh completed"
-    except Exception as e:
-        refresh_status[alias]["status"] = f"Refresh failed: {e}"
-    finally:
-        refresh_status[alias]["in_progress"] = False
+def publish_view(alias: str, previous: List[Dict[str, Any]], services_data: List[Dict[str, Any]], updated_at: str):
+    cluster_views.publish(alias, services_data, updated_at)
+    live_updates.publish_diff(alias, previous, services_data, updated_at)
+
+def remove_view(alias: str, previous: List[Dict[str, Any]]):
+    cluster_views.remove(alias)
+    live_updates.publish_diff(alias, previous, [], datetime.utcnow().isoformat())
+
+collector_service.publish_listeners.append(publish_view)
+collector_service.remove_listeners.append(remove_view)
+collector_service.status_listeners.append(live_updates.publish_status)
 
 def get_cloudwatch_metrics(cloudwatch, cluster_name, service_name, start_time, end_time, period=300):
-    try:
-        cpu_response = cloudwatch.get_metric_statistics(
-            Namespace="AWS/ECS",
-            MetricName="CPUUtilization",
-            Dimensions=[
-                {"Name": "ClusterName", "Value": cluster_name},
-                {"Name": "ServiceName", "Value": service_name}
-            ],
-            StartTime=start_time,
-            EndTime=end_time,
-            Period=period,
-            Statistics=["Maximum"]
-        )
-        memory_response = cloudwatch.get_metric_statistics(
-            Namespace="AWS/ECS",
-            MetricName="MemoryUtilization",
-            Dimensions=[
-                {"Name": "ClusterName", "Value": cluster_name},
-                {"Name": "ServiceName", "Value": service_name}
-            ],
-            StartTime=start_time,
-            EndTime=end_time,
-            Period=period,
-            Statistics=["Maximum"]
-        )
-        cpu_datapoints = sorted(cpu_response.get("Datapoints", []), key=lambda x: x["Timestamp"])
-        memory_datapoints = sorted(memory_response.get("Datapoints", []), key=lambda x: x["Timestamp"])
-        cpu_values = [dp.get("Maximum", 0) for dp in cpu_datapoints]
-        memory_values = [dp.get("Maximum", 0) for dp in memory_datapoints]
-        return cpu_values, memory_values
-    except Exception as e:
-        return [], []
+    cpu_response = cloudwatch.get_metric_statistics(
+        Namespace="AWS/ECS",
+        MetricName="CPUUtilization",
+        Dimensions=[
+            {"Name": "ClusterName", "Value": cluster_name},
+            {"Name": "ServiceName", "Value": service_name}
+        ],
+        StartTime=start_time,
+        EndTime=end_time,
+        Period=period,
+        Statistics=["Maximum"]
+    )
+    memory_response = cloudwatch.get_metric_statistics(
+        Namespace="AWS/ECS",
+        MetricName="MemoryUtilization",
+        Dimensions=[
+            {"Name": "ClusterName", "Value": cluster_name},
+            {"Name": "ServiceName", "Value": service_name}
+        ],
+        StartTime=start_time,
+        EndTime=end_time,
+        Period=period,
+        Statistics=["Maximum"]
+    )
+    cpu_datapoints = sorted(cpu_response.get("Datapoints", []), key=lambda x: x["Timestamp"])
+    memory_datapoints = sorted(memory_response.get("Datapoints", []), key=lambda x: x["Timestamp"])
+    cpu_values = [dp.get("Maximum", 0) for dp in cpu_datapoints]
+    memory_values = [dp.get("Maximum", 0) for dp in memory_datapoints]
+    return cpu_values, memory_values
 
 def safe_datetime_format(dt_value, default_time=None):
     if default_time is None:
@@ -164,362 +238,708 @@ def safe_get(obj, key, default=None):
         return obj.get(key, default)
     return default
 
+def submit_detail(fn, *args, **kwargs):
+    return details_pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+def timed_call(timings: Dict[str, float], name: str, fn, *args, **kwargs):
+    started = time.perf_counter()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+def list_service_tasks(ecs_client, cluster_name: str, service_name: str, limit: int, cursor: Optional[str], timings: Dict[str, float]):
+    task_arns, next_cursor = timed_call(
+        timings, "list_tasks", list_task_arns,
+        ecs_client, cluster_name, service_name, limit, cursor
+    )
+    if not task_arns:
+        return [], next_cursor
+    tasks = timed_call(timings, "describe_tasks", describe_tasks, ecs_client, cluster_name, task_arns)
+    return tasks, next_cursor
+
+def describe_task_definitions(ecs_client, arns: List[str], timings: Dict[str, float]) -> Dict[str, Dict[str, Any]]:
+    # Tasks of one service share one or two revisions; each is looked up once
+    # per response and usually answered by the revision cache.
+    started = time.perf_counter()
+    futures = {arn: submit_detail(taskdef_cache.get, ecs_client, arn) for arn in dict.fromkeys(arns) if arn}
+    try:
+        return {arn: future.result() for arn, future in futures.items()}
+    finally:
+        for future in futures.values():
+            future.cancel()
+        timings["describe_task_definition"] = round((time.perf_counter() - started) * 1000, 1)
+
+def format_task(task: Dict[str, Any], current_time: datetime) -> Dict[str, Any]:
+    task_arn = task.get('taskArn', '')
+    container_instance_arn = task.get('containerInstanceArn', '')
+    task_definition_arn = task.get('taskDefinitionArn', '')
+    family, _, revision = task_definition_arn.split('/')[-1].partition(':')
+    return {
+        "task_id": task_arn.split('/')[-1] if task_arn else '',
+        "health_status": task.get('healthStatus', 'UNKNOWN'),
+        "last_status": task.get('lastStatus', 'UNKNOWN'),
+        "started_at": safe_datetime_format(task.get('startedAt'), current_time),
+        "container_instance": container_instance_arn.split('/')[-1] if container_instance_arn else '',
+        "availability_zone": task.get('availabilityZone', ''),
+        "task_definition_arn": task_definition_arn,
+        # Containers live once in task_definitions, keyed by task_definition_arn.
+        "task_definition": {
+            "family": family,
+            "revision": int(revision) if revision.isdigit() else 0
+        }
+    }
+
+def fetch_service_tasks(profile_name: str, cluster_name: str, service_name: str, limit: int, cursor: Optional[str]):
+    try:
+        ecs_client = client_registry.client(profile_name, 'ecs')
+        current_time = datetime.utcnow()
+        timings = {}
+        started = time.perf_counter()
+        try:
+            tasks, next_cursor = list_service_tasks(ecs_client, cluster_name, service_name, limit, cursor, timings)
+        except ClientError as e:
+            if cursor and e.response.get("Error", {}).get("Code") == "InvalidParameterException":
+                raise HTTPException(status_code=400, detail="Invalid or expired cursor")
+            raise
+        tasks_info = [format_task(task, current_time) for task in tasks if isinstance(task, dict)]
+        task_definitions = describe_task_definitions(ecs_client, [task["task_definition_arn"] for task in tasks_info], timings)
+        timings["total"] = round((time.perf_counter() - started) * 1000, 1)
+        return {
+            "tasks": tasks_info,
+            "task_definitions": task_definitions,
+            "next_cursor": next_cursor,
+            "timings": timings
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        if is_credential_error(e):
+            client_registry.refresh(profile_name)
+        raise HTTPException(status_code=500, detail=f"Error fetching service tasks: {str(e)}")
+
+def list_scaling_policies(application_autoscaling, cluster_name: str, service_name: str, timings: Dict[str, float]):
+    try:
+        autoscaling_response = timed_call(
+            timings, "describe_scaling_policies", application_autoscaling.describe_scaling_policies,
+            ServiceNamespace='ecs',
+            ResourceId=f'service/{cluster_name}/{service_name}'
+        )
+        return autoscaling_response.get('ScalingPolicies', [])
+    except Exception as e:
+        return []
+
+def submit_service_extras(ecs_client, application_autoscaling, cluster_name: str, service_name: str, timings: Dict[str, float]):
+    # The per-service calls that describe_services cannot batch.
+    tasks_future = submit_detail(list_service_tasks, ecs_client, cluster_name, service_name, SERVICE_DETAILS_TASK_PAGE, None, timings)
+    scaling_future = submit_detail(
+        timed_call, timings, "describe_scaling_activities", application_autoscaling.describe_scaling_activities,
+        ServiceNamespace='ecs',
+        ResourceId=f"service/{cluster_name}/{service_name}",
+        ScalableDimension='ecs:service:DesiredCount',
+        IncludeNotScaledActivities=True
+    )
+    policies_future = submit_detail(list_scaling_policies, application_autoscaling, cluster_name, service_name, timings)
+    return tasks_future, scaling_future, policies_future
+
+def resolve_tasks(ecs_client, service: Dict[str, Any], task_details: List[Dict[str, Any]], current_time: datetime, timings: Dict[str, float]):
+    tasks_info = [format_task(task, current_time) for task in task_details if isinstance(task, dict)]
+    task_definitions = describe_task_definitions(
+        ecs_client,
+        [service.get('taskDefinition', '')] + [task["task_definition_arn"] for task in tasks_info],
+        timings
+    )
+    return tasks_info, task_definitions
+
 def fetch_service_details(alias: str, profile_name: str, cluster_name: str, service_name: str):
+    pending = []
     try:
-        session = boto3.Session(profile_name=profile_name)
-        ecs_client = session.client('ecs')
-        cloudwatch = session.client('cloudwatch')
-        application_autoscaling = session.client('application-autoscaling')
+        ecs_client = client_registry.client(profile_name, 'ecs')
+        cloudwatch = client_registry.client(profile_name, 'cloudwatch')
+        application_autoscaling = client_registry.client(profile_name, 'application-autoscaling')
         current_time = datetime.utcnow()
-        service_response = ecs_client.describe_services(
+        timings = {}
+        started = time.perf_counter()
+        six_hours_ago = current_time - timedelta(hours=6)
+        tasks_future, scaling_future, policies_future = submit_service_extras(
+            ecs_client, application_autoscaling, cluster_name, service_name, timings
+        )
+        pending = [tasks_future, scaling_future, policies_future]
+        history_key = (alias, cluster_name, service_name)
+        metrics_future = None
+        if not timeseries_store.is_warm(history_key, current_time):
+            metrics_future = submit_detail(
+                timed_call, timings, "cloudwatch_history", get_cloudwatch_metrics,
+                cloudwatch,
+                cluster_name,
+                service_name,
+                six_hours_ago,
+                current_time,
+                period=1800
+            )
+            pending.append(metrics_future)
+        service_response = timed_call(
+            timings, "describe_services", ecs_client.describe_services,
             cluster=cluster_name,
             services=[service_name]
         )
         if not service_response.get('services'):
             raise HTTPException(status_code=404, detail=f"Service {service_name} not found in cluster {cluster_name}")
         service = service_response['services'][0]
-        task_def_response = ecs_client.describe_task_definition(
-            taskDefinition=service['taskDefinition']
+        task_details, next_cursor = tasks_future.result()
+        tasks_info, task_definitions = resolve_tasks(ecs_client, service, task_details, current_time, timings)
+        scaling_history = scaling_future.result()
+        scaling_policies = policies_future.result()
+        if metrics_future is not None:
+            try:
+                historical_cpu, historical_memory = metrics_future.result()
+            except Exception as e:
+                # Reported as unavailable rather than as a flat 0% chart.
+                logger.warning(f"CloudWatch history failed for service '{service_name}' in cluster '{cluster_name}': {e}")
+                historical_cpu = historical_memory = None
+        else:
+            historical_cpu = timeseries_store.values(history_key, "cpu", current_time)
+            historical_memory = timeseries_store.values(history_key, "memory", current_time)
+        timings["total"] = round((time.perf_counter() - started) * 1000, 1)
+        details = build_service_details(
+            service, tasks_info, next_cursor, task_definitions,
+            scaling_history, scaling_policies, historical_cpu, historical_memory, current_time
         )
-        task_definition = task_def_response['taskDefinition']
-        tasks_response = ecs_client.list_tasks(
-            cluster=cluster_name,
-            serviceName=service_name
-        )
-        resource_id = f"service/{cluster_name}/{service_name}"
-        scaling_history = application_autoscaling.describe_scaling_activities(
-            ServiceNamespace='ecs',
-            ResourceId=resource_id,
-            ScalableDimension='ecs:service:DesiredCount',
-            IncludeNotScaledActivities=True
-        )
-        activities = scaling_history.get('ScalingActivities', [])
-        for activity in activities:
-            for key in ['StartTime', 'EndTime', 'ScheduledActionName']:
-                if key in activity and isinstance(activity[key], datetime):
-                    activity[key] = activity[key].isoformat()
-        six_hours_ago = current_time - timedelta(hours=6)
-        historical_cpu, historical_memory = get_cloudwatch_metrics(
-            cloudwatch,
-            cluster_name,
-            service_name,
-            six_hours_ago,
-            current_time,
-            period=1800
-        )
-        historical_cpu = historical_cpu[-12:] if len(historical_cpu) >= 12 else historical_cpu + [0] * (12 - len(historical_cpu))
-        historical_memory = historical_memory[-12:] if len(historical_memory) >= 12 else historical_memory + [0] * (12 - len(historical_memory))
-        task_details = []
-        if tasks_response.get('taskArns'):
-            tasks_detail_response = ecs_client.describe_tasks(
-                cluster=cluster_name,
-                tasks=tasks_response['taskArns']
-            )
-            task_details = tasks_detail_response.get('tasks', [])
-        service_events = service.get('events', [])[:10]
-        scaling_policies = []
-        try:
-            autoscaling_response = application_autoscaling.describe_scaling_policies(
-                ServiceNamespace='ecs',
-                ResourceId=f'service/{cluster_name}/{service_name}'
-            )
-            scaling_policies = autoscaling_response.get('ScalingPolicies', [])
-        except Exception as e:
-            pass
-        service_overview = {
-            "service_arn": service.get('serviceArn', ''),
-            "creation_date": safe_datetime_format(service.get('createdAt'), current_time),
-            "task_definition": service.get('taskDefinition', ''),
-            "desired_count": service.get('desiredCount', 0),
-            "launch_type": service.get('launchType', 'UNKNOWN'),
-            "platform_version": service.get('platformVersion', 'LATEST'),
-            "status": service.get('status', 'UNKNOWN'),
-            "historical_cpu": historical_cpu,
-            "historical_memory": historical_memory
-        }
-        deployments = service.get('deployments', [])
-        primary_deployment = next((d for d in deployments if isinstance(d, dict) and d.get('status') == 'PRIMARY'), {})
-        deployment_info = {
-            "current_deployment": {
-                "id": safe_get(primary_deployment, 'id', ''),
-                "status": safe_get(primary_deployment, 'status', ''),
-                "created_at": safe_datetime_format(safe_get(primary_deployment, 'createdAt'), current_time),
-                "updated_at": safe_datetime_format(safe_get(primary_deployment, 'updatedAt'), current_time),
-                "task_definition": safe_get(primary_deployment, 'taskDefinition', ''),
-                "rollout_progress": safe_get(safe_get(primary_deployment, 'rolloutState', {}), 'completedPercent', 0) if isinstance(safe_get(primary_deployment, 'rolloutState'), dict) else 0,
-                "running_count": safe_get(primary_deployment, 'runningCount', 0),
-                "desired_count": safe_get(primary_deployment, 'desiredCount', 0)
-            },
-            "deployment_history": []
-        }
-        for dep in deployments[:5]:
-            if isinstance(dep, dict):
-                deployment_info["deployment_history"].append({
-                    "id": dep.get('id', ''),
-                    "status": dep.get('status', ''),
-                    "task_definition": dep.get('taskDefinition', ''),
-                    "created_at": safe_datetime_format(dep.get('createdAt'), current_time),
-                    "completed_at": safe_datetime_format(dep.get('updatedAt'), current_time)
-                })
-        tasks_info = []
-        for task in task_details:
-            if isinstance(task, dict):
-                task_arn = task.get('taskArn', '')
-                task_id = task_arn.split('/')[-1] if task_arn else ''
-                container_instance_arn = task.get('containerInstanceArn', '')
-                container_instance = container_instance_arn.split('/')[-1] if container_instance_arn else ''
-                containers = []
-                container_definitions = task_definition.get('containerDefinitions', []) if isinstance(task_definition, dict) else []
-                for container in container_definitions:
-                    if isinstance(container, dict):
-                        containers.append({
-                            "name": container.get('name', ''),
-                            "image": container.get('image', ''),
-                            "cpu": container.get('cpu', 0),
-                            "memory": container.get('memory', 0),
-                            "essential": container.get('essential', False),
-                            "portMappings": container.get('portMappings', [])
-                        })
-                task_info = {
-                    "task_id": task_id,
-                    "health_status": task.get('healthStatus', 'UNKNOWN'),
-                    "started_at": safe_datetime_format(task.get('startedAt'), current_time),
-                    "container_instance": container_instance,
-                    "availability_zone": task.get('availabilityZone', ''),
-                    "task_definition": {
-                        "family": task_definition.get('family', '') if isinstance(task_definition, dict) else '',
-                        "revision": task_definition.get('revision', 0) if isinstance(task_definition, dict) else 0,
-                        "containers": containers
-                    }
-                }
-                tasks_info.append(task_info)
-        current_tasks = {
-            "running_count": service.get('runningCount', 0),
-            "desired_count": service.get('desiredCount', 0),
-            "tasks": tasks_info
-        }
-        formatted_events = []
-        for event in service_events:
-            if isinstance(event, dict):
-                formatted_events.append({
-                    "type": "INFO",
-                    "message": event.get('message', ''),
-                    "timestamp": safe_datetime_format(event.get('createdAt'), current_time)
-                })
-        formatted_activities = []
-        for activity in activities:
-            if isinstance(activity, dict):
-                reason = activity.get('NotScaledReasons',[])
-                code = reason[0].get('Code') if reason else None
-                formatted_activities.append({
-                    "activity_id" : activity.get('ActivityId',''),
-                    "start_time" : activity.get("StartTime",''),
-                    "description" : activity.get("Description",''),
-                    "status_code" : activity.get("StatusCode",''),
-                    "cause" : activity.get("Cause",''),
-                    "reason" : code 
-                })
-        events = {
-            "service_events": formatted_events,
-            "scaling_events": formatted_activities
-        }
-        load_balancers = service.get('loadBalancers', [])
-        load_balancer_config = {}
-        if load_balancers and isinstance(load_balancers, list) and len(load_balancers) > 0:
-            lb = load_balancers[0]
-            if isinstance(lb, dict):
-                load_balancer_config = {
-                    "type": "NETWORK",
-                    "target_group_arn": lb.get('targetGroupArn', ''),
-                    "config": lb
-                }
-        auto_scaling_policies = []
-        for policy in scaling_policies:
-            if isinstance(policy, dict):
-                target_tracking_config = policy.get('TargetTrackingScalingPolicyConfiguration', {})
-                target_value = 0
-                if isinstance(target_tracking_config, dict):
-                    target_value = target_tracking_config.get('TargetValue', 0)
-                auto_scaling_policies.append({
-                    "name": policy.get('PolicyName', ''),
-                    "type": policy.get('PolicyType', ''),
-                    "target_value": target_value
-                })
-        auto_scaling_config = {
-            "min_capacity": 1,
-            "max_capacity": 10,
-            "status": "ENABLED" if scaling_policies else "DISABLED",
-            "policies": auto_scaling_policies
-        }
-        network_config = {}
-        service_network_config = service.get('networkConfiguration', {})
-        if isinstance(service_network_config, dict):
-            awsvpc_config = service_network_config.get('awsvpcConfiguration', {})
-            if isinstance(awsvpc_config, dict):
-                network_config = awsvpc_config
-        configuration = {
-            "service_definition": {
-                "serviceName": service.get('serviceName', ''),
-                "taskDefinition": service.get('taskDefinition', ''),
-                "desiredCount": service.get('desiredCount', 0),
-                "launchType": service.get('launchType', ''),
-                "platformVersion": service.get('platformVersion', 'LATEST'),
-                "deploymentConfiguration": service.get('deploymentConfiguration', {})
-            },
-            "load_balancer": load_balancer_config,
-            "auto_scaling": auto_scaling_config,
-            "network": {
-                "network_mode": "awsvpc" if network_config else "bridge",
-                "assign_public_ip": network_config.get('assignPublicIp', 'DISABLED') == 'ENABLED' if network_config else False,
-                "subnets": network_config.get('subnets', []) if network_config else [],
-                "security_groups": network_config.get('securityGroups', []) if network_config else []
-            }
-        }
-        return {
-            "service_overview": service_overview,
-            "deployment_info": deployment_info,
-            "current_tasks": current_tasks,
-            "events": events,
-            "configuration": configuration
-        }
+        details["timings"] = timings
+        return details
     except HTTPException:
         raise
     except Exception as e:
+        if is_credential_error(e):
+            client_registry.refresh(profile_name)
         raise HTTPException(status_code=500, detail=f"Error fetching service details: {str(e)}")
+    finally:
+        for future in pending:
+            future.cancel()
+
+def build_service_details(service: Dict[str, Any], tasks_info: List[Dict[str, Any]], next_cursor: Optional[str],
+                          task_definitions: Dict[str, Dict[str, Any]], scaling_history: Dict[str, Any], scaling_policies: List[Dict[str, Any]],
+                          historical_cpu: Optional[List[float]], historical_memory: Optional[List[float]], current_time: datetime) -> Dict[str, Any]:
+    activities = scaling_history.get('ScalingActivities', [])
+    for activity in activities:
+        for key in ['StartTime', 'EndTime', 'ScheduledActionName']:
+            if key in activity and isinstance(activity[key], datetime):
+                activity[key] = activity[key].isoformat()
+    # None means CloudWatch could not be read: send empty series instead of zeros.
+    metrics_available = historical_cpu is not None and historical_memory is not None
+    historical_cpu = pad_history(historical_cpu) if metrics_available else []
+    historical_memory = pad_history(historical_memory) if metrics_available else []
+    service_events = service.get('events', [])[:10]
+    service_overview = {
+        "service_arn": service.get('serviceArn', ''),
+        "creation_date": safe_datetime_format(service.get('createdAt'), current_time),
+        "task_definition": service.get('taskDefinition', ''),
+        "desired_count": service.get('desiredCount', 0),
+        "launch_type": service.get('launchType', 'UNKNOWN'),
+        "platform_version": service.get('platformVersion', 'LATEST'),
+        "status": service.get('status', 'UNKNOWN'),
+        "historical_cpu": historical_cpu,
+        "historical_memory": historical_memory,
+        "metrics_available": metrics_available
+    }
+    deployments = service.get('deployments', [])
+    primary_deployment = next((d for d in deployments if isinstance(d, dict) and d.get('status') == 'PRIMARY'), {})
+    deployment_info = {
+        "current_deployment": {
+            "id": safe_get(primary_deployment, 'id', ''),
+            "status": safe_get(primary_deployment, 'status', ''),
+            "created_at": safe_datetime_format(safe_get(primary_deployment, 'createdAt'), current_time),
+            "updated_at": safe_datetime_format(safe_get(primary_deployment, 'updatedAt'), current_time),
+            "task_definition": safe_get(primary_deployment, 'taskDefinition', ''),
+            "rollout_progress": safe_get(safe_get(primary_deployment, 'rolloutState', {}), 'completedPercent', 0) if isinstance(safe_get(primary_deployment, 'rolloutState'), dict) else 0,
+            "running_count": safe_get(primary_deployment, 'runningCount', 0),
+            "desired_count": safe_get(primary_deployment, 'desiredCount', 0)
+        },
+        "deployment_history": []
+    }
+    for dep in deployments[:5]:
+        if isinstance(dep, dict):
+            deployment_info["deployment_history"].append({
+                "id": dep.get('id', ''),
+                "status": dep.get('status', ''),
+                "task_definition": dep.get('taskDefinition', ''),
+                "created_at": safe_datetime_format(dep.get('createdAt'), current_time),
+                "completed_at": safe_datetime_format(dep.get('updatedAt'), current_time)
+            })
+    current_tasks = {
+        "running_count": service.get('runningCount', 0),
+        "desired_count": service.get('desiredCount', 0),
+        "pending_count": service.get('pendingCount', 0),
+        "task_definitions": task_definitions,
+        "tasks": tasks_info,
+        "next_cursor": next_cursor
+    }
+    formatted_events = []
+    for event in service_events:
+        if isinstance(event, dict):
+            formatted_events.append({
+                "type": "INFO",
+                "message": event.get('message', ''),
+                "timestamp": safe_datetime_format(event.get('createdAt'), current_time)
+            })
+    formatted_activities = []
+    for activity in activities:
+        if isinstance(activity, dict):
+            reason = activity.get('NotScaledReasons',[])
+            code = reason[0].get('Code') if reason else None
+            formatted_activities.append({
+                "activity_id" : activity.get('ActivityId',''),
+                "start_time" : activity.get("StartTime",''),
+                "description" : activity.get("Description",''),
+                "status_code" : activity.get("StatusCode",''),
+                "cause" : activity.get("Cause",''),
+                "reason" : code 
+            })
+    events = {
+        "service_events": formatted_events,
+        "scaling_events": formatted_activities
+    }
+    load_balancers = service.get('loadBalancers', [])
+    load_balancer_config = {}
+    if load_balancers and isinstance(load_balancers, list) and len(load_balancers) > 0:
+        lb = load_balancers[0]
+        if isinstance(lb, dict):
+            load_balancer_config = {
+                "type": "NETWORK",
+                "target_group_arn": lb.get('targetGroupArn', ''),
+                "config": lb
+            }
+    auto_scaling_policies = []
+    for policy in scaling_policies:
+        if isinstance(policy, dict):
+            target_tracking_config = policy.get('TargetTrackingScalingPolicyConfiguration', {})
+            target_value = 0
+            if isinstance(target_tracking_config, dict):
+                target_value = target_tracking_config.get('TargetValue', 0)
+            auto_scaling_policies.append({
+                "name": policy.get('PolicyName', ''),
+                "type": policy.get('PolicyType', ''),
+                "target_value": target_value
+            })
+    auto_scaling_config = {
+        "min_capacity": 1,
+        "max_capacity": 10,
+        "status": "ENABLED" if scaling_policies else "DISABLED",
+        "policies": auto_scaling_policies
+    }
+    network_config = {}
+    service_network_config = service.get('networkConfiguration', {})
+    if isinstance(service_network_config, dict):
+        awsvpc_config = service_network_config.get('awsvpcConfiguration', {})
+        if isinstance(awsvpc_config, dict):
+            network_config = awsvpc_config
+    configuration = {
+        "service_definition": {
+            "serviceName": service.get('serviceName', ''),
+            "taskDefinition": service.get('taskDefinition', ''),
+            "desiredCount": service.get('desiredCount', 0),
+            "launchType": service.get('launchType', ''),
+            "platformVersion": service.get('platformVersion', 'LATEST'),
+            "deploymentConfiguration": service.get('deploymentConfiguration', {})
+        },
+        "load_balancer": load_balancer_config,
+        "auto_scaling": auto_scaling_config,
+        "network": {
+            "network_mode": "awsvpc" if network_config else "bridge",
+            "assign_public_ip": network_config.get('assignPublicIp', 'DISABLED') == 'ENABLED' if network_config else False,
+            "subnets": network_config.get('subnets', []) if network_config else [],
+            "security_groups": network_config.get('securityGroups', []) if network_config else []
+        }
+    }
+    return {
+        "service_overview": service_overview,
+        "deployment_info": deployment_info,
+        "current_tasks": current_tasks,
+        "events": events,
+        "configuration": configuration
+    }
+
+def bulk_details_line(cluster_name: str, service_name: str, **fields) -> bytes:
+    return (json.dumps({"cluster_name": cluster_name, "service_name": service_name, **fields}, separators=(",", ":")) + "\n").encode()
 
-def fetch_ecs_data(alias, profile_name):
+def stream_service_details(alias: str, profile_name: str, refs: List[Tuple[str, str]], fresh: bool = False) -> Iterator[bytes]:
+    # One NDJSON line per service, written as soon as that service is complete.
+    # describe_services is batched per cluster, cold history comes from a single
+    # GetMetricData pass and task definitions go through the revision cache.
+    # interactive() is only held around submissions: a generator may resume in
+    # another context, where the context variable could not be reset.
+    pending = []
     try:
-        session = boto3.Session(profile_name=profile_name)
-        ecs_client = session.client('ecs')
-        cloudwatch = session.client('cloudwatch')
-        cluster_arns = []
-        paginator = ecs_client.get_paginator('list_clusters')
-        for page in paginator.paginate():
-            cluster_arns.extend(page.get('clusterArns', []))
+        ecs_client = client_registry.client(profile_name, 'ecs')
+        cloudwatch = client_registry.client(profile_name, 'cloudwatch')
+        application_autoscaling = client_registry.client(profile_name, 'application-autoscaling')
         current_time = datetime.utcnow()
-        five_min_ago = current_time - timedelta(minutes=5)
-        six_hours_ago = current_time - timedelta(hours=6)
-        services_data = []
-        for cluster_arn in cluster_arns:
-            cluster_name = cluster_arn.split('/')[-1]
-            services_response = ecs_client.list_services(cluster=cluster_name)
-            service_arns = services_response.get('serviceArns', [])
-            if not service_arns:
+        by_cluster = {}
+        for cluster_name, service_name in dict.fromkeys(refs):
+            cached = None if fresh else service_details_cache.get((alias, cluster_name, service_name))
+            if cached is not None:
+                yield bulk_details_line(cluster_name, service_name, details=cached)
+            else:
+                by_cluster.setdefault(cluster_name, []).append(service_name)
+        cold = [
+            (cluster_name, service_name, True)
+            for cluster_name, names in by_cluster.items() for service_name in names
+            if not timeseries_store.is_warm((alias, cluster_name, service_name), current_time)
+        ]
+        with interactive():
+            describe_futures = [
+                (cluster_name, names[i:i + DESCRIBE_SERVICES_BATCH], submit_detail(
+                    ecs_client.describe_services, cluster=cluster_name, services=names[i:i + DESCRIBE_SERVICES_BATCH]
+                ))
+                for cluster_name, names in by_cluster.items()
+                for i in range(0, len(names), DESCRIBE_SERVICES_BATCH)
+            ]
+            history_future = submit_detail(fetch_service_metrics, cloudwatch, cold, current_time, timeseries_store.view(alias)) if cold else None
+        cold_keys = {(cluster_name, service_name) for cluster_name, service_name, _ in cold}
+        pending = [future for _, _, future in describe_futures] + ([history_future] if history_future else [])
+        found = {}
+        waiting = {}
+        for cluster_name, names, future in describe_futures:
+            try:
+                services = {service.get('serviceName'): service for service in future.result().get('services', [])}
+            except Exception as e:
+                if is_credential_error(e):
+                    client_registry.refresh(profile_name)
+                for service_name in names:
+                    yield bulk_details_line(cluster_name, service_name, status=500, error=f"Error fetching service details: {e}")
                 continue
-            services_details = ecs_client.describe_services(
-                cluster=cluster_name,
-                services=service_arns
-            )
-            for service in services_details.get('services', []):
-                service_name = service.get('serviceName')
-                running_tasks = service.get('runningCount', 0)
-                current_cpu_values, current_memory_values = get_cloudwatch_metrics(
-                    cloudwatch, 
-                    cluster_name, 
-                    service_name, 
-                    five_min_ago, 
-                    current_time
+            for service_name in names:
+                if service_name not in services:
+                    yield bulk_details_line(cluster_name, service_name, status=404, error=f"Service {service_name} not found in cluster {cluster_name}")
+                    continue
+                timings = {}
+                with interactive():
+                    extras = submit_service_extras(ecs_client, application_autoscaling, cluster_name, service_name, timings)
+                pending.extend(extras)
+                found[(cluster_name, service_name)] = (services[service_name], extras, timings)
+                for extra in extras:
+                    waiting[extra] = (cluster_name, service_name)
+        history = {}
+        if history_future is not None:
+            try:
+                history = history_future.result()
+            except Exception as e:
+                logger.warning(f"CloudWatch history failed for {len(cold)} services in alias '{alias}': {e}")
+        completed = {}
+        for future in as_completed(list(waiting)):
+            key = waiting[future]
+            completed[key] = completed.get(key, 0) + 1
+            service, (tasks_future, scaling_future, policies_future), timings = found[key]
+            if completed[key] < 3:
+                continue
+            cluster_name, service_name = key
+            history_key = (alias, cluster_name, service_name)
+            try:
+                task_details, next_cursor = tasks_future.result()
+                with interactive():
+                    tasks_info, task_definitions = resolve_tasks(ecs_client, service, task_details, current_time, timings)
+                if key in history:
+                    historical_cpu, historical_memory = history[key]["historical_cpu"], history[key]["historical_memory"]
+                elif key in cold_keys:
+                    historical_cpu = historical_memory = None
+                else:
+                    historical_cpu = timeseries_store.values(history_key, "cpu", current_time)
+                    historical_memory = timeseries_store.values(history_key, "memory", current_time)
+                details = build_service_details(
+                    service, tasks_info, next_cursor, task_definitions,
+                    scaling_future.result(), policies_future.result(), historical_cpu, historical_memory, current_time
                 )
-                current_cpu = current_cpu_values[0] if current_cpu_values else 0
-                current_memory = current_memory_values[0] if current_memory_values else 0
-                historical_cpu = []
-                historical_memory = []
-                if running_tasks >= 2:
-                    historical_cpu, historical_memory = get_cloudwatch_metrics(
-                        cloudwatch,
-                        cluster_name,
-                        service_name,
-                        six_hours_ago,
-                        current_time,
-                        period=1800
-                    )
-                    historical_cpu = historical_cpu[-12:] if len(historical_cpu) >= 12 else historical_cpu + [0] * (12 - len(historical_cpu))
-                    historical_memory = historical_memory[-12:] if len(historical_memory) >= 12 else historical_memory + [0] * (12 - len(historical_memory))
-                service_data = {
-                    "account_alias": alias,
-                    "cluster_name": cluster_name,
-                    "service_name": service_name,
-                    "running_tasks": running_tasks,
-                    "current_cpu": current_cpu,
-                    "current_memory": current_memory,
-                    "historical_cpu": historical_cpu,
-                    "historical_memory": historical_memory,
-                    "last_updated": current_time.isoformat()
-                }
-                services_data.append(service_data)
-        return services_data
-    except Exception as e:
-        return []
-    
-def update_all_data():
-    global clusters_data, last_update_time
+                details["timings"] = timings
+            except Exception as e:
+                if is_credential_error(e):
+                    client_registry.refresh(profile_name)
+                yield bulk_details_line(cluster_name, service_name, status=500, error=f"Error fetching service details: {e}")
+                continue
+            if details["service_overview"]["metrics_available"]:
+                service_details_cache.set(history_key, details)
+            yield bulk_details_line(cluster_name, service_name, details=details)
+    finally:
+        for future in pending:
+            future.cancel()
+
+def reload_config_forever():
     while True:
         try:
-            for alias, profile_name in profiles_config.items():
-                services_data = fetch_ecs_data(alias, profile_name)
-                clusters_data[alias] = services_data
-                last_update_time[alias] = datetime.utcnow().isoformat()
-            time.sleep(600)
+            load_config()
         except Exception as e:
-            time.sleep(600)
+            logger.error(f"Failed to reload {CONFIG_FILE}: {e}")
+        time.sleep(CONFIG_RELOAD_INTERVAL)
 
 @app.on_event("startup")
 def startup_event():
     load_config()
-    update_thread = threading.Thread(target=update_all_data, daemon=True)
-    update_thread.start()
+    collector_service.load_snapshots()
+    # With an external collector (python -m collector) the API never takes
+    # the host's collector lock and only serves the snapshots it writes.
+    can_lead = COLLECTOR_MODE != "external"
+    threading.Thread(target=collector_service.coordinate, args=(can_lead,), daemon=True).start()
+    threading.Thread(target=reload_config_forever, daemon=True).start()
 
 @app.get("/health", response_model=HealthResponse)
 def health_check():
     return {"status": "ok"}
 
+@app.get("/metrics")
+def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
 @app.get("/aliases", response_model=List[str])
 def get_aliases(session_data: SessionData = Depends(verify_jwt)):
     return list(profiles_config.keys())
 
 @app.get("/clusters", response_model=List[ClusterService])
-def get_clusters(alias: Optional[str] = None, session_data: SessionData = Depends(verify_jwt)):
+def get_clusters(
+    request: Request,
+    alias: Optional[str] = None,
+    cluster: Optional[str] = None,
+    cluster_prefix: Optional[str] = None,
+    service_prefix: Optional[str] = None,
+    min_cpu: Optional[float] = None,
+    max_cpu: Optional[float] = None,
+    min_memory: Optional[float] = None,
+    max_memory: Optional[float] = None,
+    sort: Optional[str] = None,
+    fields: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    session_data: SessionData = Depends(verify_jwt)
+):
     if alias and alias not in profiles_config:
         raise HTTPException(status_code=404, detail=f"Alias {alias} not found")
-    result = []
-    if alias:
-        result = clusters_data.get(alias, [])
-    else:
-        for alias_data in clusters_data.values():
-            result.extend(alias_data)
-    return result
+    view = cluster_views.get(alias)
+    stale = alias in stale_aliases if alias else bool(stale_aliases)
+    headers = {
+        "ETag": view.etag,
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+        "X-Data-Stale": "true" if stale else "false"
+    }
+    query = ClustersQuery(
+        cluster, cluster_prefix, service_prefix,
+        min_cpu, max_cpu, min_memory, max_memory,
+        sort, fields, limit, cursor
+    )
+    if not query.is_empty():
+        headers["ETag"] = query_etag(view.etag, query)
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        try:
+            result = run_query(view.services, view.index, view.etag, query)
+        except QueryError as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e))
+        headers["X-Total-Count"] = str(result.total)
+        if result.next_cursor:
+            headers["X-Next-Cursor"] = result.next_cursor
+        body = json.dumps(result.items, separators=(",", ":")).encode()
+        return Response(content=body, media_type="application/json", headers=headers)
+    if etag_matches(request.headers.get("if-none-match"), view.etag):
+        return Response(status_code=304, headers=headers)
+    if view.gzip_body is not None and accepts_gzip(request.headers.get("accept-encoding")):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=view.gzip_body, media_type="application/json", headers=headers)
+    return Response(content=view.body, media_type="application/json", headers=headers)
+
+@app.get("/hotspots", response_model=List[Hotspot])
+def get_hotspots(alias: Optional[str] = None, metric: str = "cpu", by: str = "current", limit: int = Query(10, ge=1, le=500), session_data: SessionData = Depends(verify_jwt)):
+    if alias and alias not in profiles_config:
+        raise HTTPException(status_code=404, detail=f"Alias '{alias}' not found")
+    if metric not in HOTSPOT_METRICS:
+        raise HTTPException(status_code=400, detail=f"metric must be one of {', '.join(HOTSPOT_METRICS)}")
+    if by not in HOTSPOT_METHODS:
+        raise HTTPException(status_code=400, detail=f"by must be one of {', '.join(HOTSPOT_METHODS)}")
+    view = cluster_views.get(alias)
+    return top_hotspots((alias or "*", view.etag), view.services, metric, by, limit)
+
+@app.get("/stream")
+async def stream_updates(request: Request, alias: Optional[List[str]] = Query(None), session_data: SessionData = Depends(verify_jwt)):
+    for name in alias or []:
+        if name not in profiles_config:
+            raise HTTPException(status_code=404, detail=f"Alias '{name}' not found")
+    subscriber = live_updates.subscribe(alias)
+
+    def snapshot_events():
+        return [
+            format_event("snapshot", {
+                "alias": name,
+                "last_update_time": last_update_time.get(name),
+                "stale": name in stale_aliases,
+                "services": clusters_data.get(name, [])
+            })
+            for name in (alias or list(clusters_data))
+        ]
+
+    async def events():
+        try:
+            for chunk in snapshot_events():
+                yield chunk
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), timeout=LIVE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if message is RESYNC:
+                    subscriber.resync_pending = False
+                    for chunk in snapshot_events():
+                        yield chunk
+                    continue
+                yield format_event(message["event"], message["data"])
+        finally:
+            live_updates.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.get("/service-details", response_model=ServiceDetailsResponse)
-def get_service_details(service_name: str, cluster_name: str, alias: str, session_data: SessionData = Depends(verify_jwt)):
+def get_service_details(service_name: str, cluster_name: str, alias: str, fresh: bool = False, session_data: SessionData = Depends(verify_jwt)):
     if alias not in profiles_config:
         raise HTTPException(status_code=404, detail=f"Alias '{alias}' not found")
     profile_name = profiles_config[alias]
     try:
-        service_details = fetch_service_details(alias, profile_name, cluster_name, service_name)
+        with interactive():
+            service_details = service_details_cache.get_or_load(
+                (alias, cluster_name, service_name),
+                lambda: fetch_service_details(alias, profile_name, cluster_name, service_name),
+                fresh=fresh
+            )
+        if not service_details["service_overview"]["metrics_available"]:
+            service_details_cache.invalidate((alias, cluster_name, service_name))
         response = JSONResponse(content=service_details)
         response.headers["Access-Control-Allow-Origin"] = "*"
+        response.headers["Server-Timing"] = ", ".join(
+            f"{name};dur={duration}" for name, duration in service_details.get("timings", {}).items()
+        )
         return response
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching service details: {str(e)}")
 
+@app.get("/service-details/tasks", response_model=ServiceTasksResponse)
+def get_service_tasks(
+    service_name: str,
+    cluster_name: str,
+    alias: str,
+    limit: int = Query(100, ge=1, le=SERVICE_TASKS_MAX_PAGE),
+    cursor: Optional[str] = None,
+    session_data: SessionData = Depends(verify_jwt)
+):
+    if alias not in profiles_config:
+        raise HTTPException(status_code=404, detail=f"Alias '{alias}' not found")
+    with interactive():
+        page = fetch_service_tasks(profiles_config[alias], cluster_name, service_name, limit, cursor)
+    response = JSONResponse(content=page)
+    response.headers["Access-Control-Allow-Origin"] = "*"
+    response.headers["Server-Timing"] = ", ".join(f"{name};dur={duration}" for name, duration in page["timings"].items())
+    if page["next_cursor"]:
+        response.headers["X-Next-Cursor"] = page["next_cursor"]
+    return response
+
+@app.post("/service-details/bulk")
+def get_bulk_service_details(body: BulkServiceDetailsRequest, fresh: bool = False, session_data: SessionData = Depends(verify_jwt)):
+    if body.alias not in profiles_config:
+        raise HTTPException(status_code=404, detail=f"Alias '{body.alias}' not found")
+    if len(body.services) > BULK_DETAILS_MAX_SERVICES:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_DETAILS_MAX_SERVICES} services per request")
+    refs = [(ref.cluster_name, ref.service_name) for ref in body.services]
+    return StreamingResponse(
+        stream_service_details(body.alias, profiles_config[body.alias], refs, fresh),
+        media_type="application/x-ndjson",
+        headers={"Access-Control-Allow-Origin": "*", "Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/history")
+def get_history(
+    alias: str,
+    cluster_name: str,
+    service_name: Optional[str] = None,
+    window: str = "24h",
+    end: Optional[datetime] = None,
+    points: int = Query(200, ge=10, le=2000),
+    method: str = "lttb",
+    aggregate: str = "avg",
+    session_data: SessionData = Depends(verify_jwt)
+):
+    if alias not in profiles_config:
+        raise HTTPException(status_code=404, detail=f"Alias '{alias}' not found")
+    if method not in DOWNSAMPLE_METHODS:
+        raise HTTPException(status_code=400, detail=f"method must be one of {', '.join(DOWNSAMPLE_METHODS)}")
+    if aggregate not in ROLLUP_AGGREGATES:
+        raise HTTPException(status_code=400, detail=f"aggregate must be one of {', '.join(ROLLUP_AGGREGATES)}")
+    span = parse_window(window)
+    if span is None or span > RANGE_MAX_WINDOW:
+        raise HTTPException(status_code=400, detail="window must look like 90m, 24h or 30d and be at most 455d")
+    now = datetime.utcnow()
+    if end is not None and end.tzinfo is not None:
+        end = end.astimezone(timezone.utc).replace(tzinfo=None)
+    end_time = min(end or now, now)
+    start_time = max(end_time - span, now - RANGE_MAX_WINDOW)
+    if service_name:
+        services = [(cluster_name, service_name)]
+        weights = [1]
+    else:
+        # Without a service the cluster is rolled up from its collected services.
+        cluster_services = [s for s in clusters_data.get(alias, []) if s["cluster_name"] == cluster_name]
+        if not cluster_services:
+            raise HTTPException(status_code=404, detail=f"Cluster {cluster_name} not found in alias '{alias}'")
+        services = [(cluster_name, s["service_name"]) for s in cluster_services]
+        weights = [max(1, s.get("running_tasks", 0)) for s in cluster_services]
+    period = choose_period(start_time, end_time, now)
+    try:
+        cloudwatch = client_registry.client(profiles_config[alias], 'cloudwatch')
+        with interactive():
+            series = range_store.series(cloudwatch, alias, services, start_time, end_time, period)
+    except Exception as e:
+        if is_credential_error(e):
+            client_registry.refresh(profiles_config[alias])
+        raise HTTPException(status_code=500, detail=f"Error fetching history: {str(e)}")
+    metrics = {}
+    for metric in ("cpu", "memory"):
+        if service_name:
+            raw = series[services[0]][metric]
+        else:
+            raw = rollup([series[key][metric] for key in services], weights, aggregate)
+        metrics[metric] = downsample(raw, points, method)
+    content = {
+        "alias": alias,
+        "cluster_name": cluster_name,
+        "service_name": service_name,
+        "services": len(services),
+        "start": start_time.isoformat(),
+        "end": end_time.isoformat(),
+        "period": period,
+        "method": method,
+        "aggregate": None if service_name else aggregate,
+        "metrics": metrics
+    }
+    response = JSONResponse(content=content)
+    response.headers["Access-Control-Allow-Origin"] = "*"
+    return response
+
+@app.get("/aws-calls")
+def get_aws_calls(session_data: SessionData = Depends(verify_jwt)):
+    return governor.stats()
+
 @app.get("/refresh")
 def trigger_refresh(alias: str):
     if alias not in profiles_config:
         raise HTTPException(status_code=404, detail=f"Alias '{alias}' not found")
     if alias not in refresh_status:
         refresh_status[alias] = {"in_progress": False, "status": "Not started"}
-    if refresh_status[alias]["in_progress"]:
+    if not collector_service.request_refresh(alias):
         content = {"message": f"Refresh already in progress for alias '{alias}'"}
         response = JSONResponse(content=content)
         response.headers["Access-Control-Allow-Origin"] = "*"
         return response
-    threading.Thread(
-        target=refresh_data_for_alias,
-        args=(alias, profiles_config[alias]),
-        daemon=True
-    ).start()
     content = {"message": f"Refresh triggered for alias '{alias}'"}
     response = JSONResponse(content=content)
     response.headers["Access-Control-Allow-Origin"] = "*"
@@ -530,7 +950,13 @@ def get_refresh_status(alias: str):
     if alias not in profiles_config:
         raise HTTPException(status_code=404, detail=f"Alias '{alias}' not found")
     status = refresh_status.get(alias, {"in_progress": False, "status": "Not started"})
-    content = {"alias": alias, **status}
+    content = {
+        "alias": alias,
+        **status,
+        "stale": alias in stale_aliases,
+        "last_update_time": last_update_time.get(alias),
+        "next_refresh_in": collector_service.next_refresh_in(alias)
+    }
     response = JSONResponse(content=content)
     response.headers["Access-Control-Allow-Origin"] = "*"
     return response
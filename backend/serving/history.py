@@ -0,0 +1,74 @@
+import re
+from datetime import timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+ROLLUP_AGGREGATES = ("avg", "max")
+WINDOW_PATTERN = re.compile(r"^(\d+)([mhd])$")
+WINDOW_UNITS = {"m": "minutes", "h": "hours", "d": "days"}
+
+Points = List[Tuple[float, float]]
+
+def parse_window(window: str) -> Optional[timedelta]:
+    match = WINDOW_PATTERN.match(window)
+    if match is None or int(match.group(1)) == 0:
+        return None
+    return timedelta(**{WINDOW_UNITS[match.group(2)]: int(match.group(1))})
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    # Largest-Triangle-Three-Buckets: keeps the first and last point and, per
+    # bucket, the point forming the largest triangle with the previously kept
+    # point and the average of the next bucket.
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x, next_y = x[hi:edges[i + 2]].mean(), y[hi:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs((x[a] - next_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+def minmax(y: np.ndarray, threshold: int) -> np.ndarray:
+    # Keeps the lowest and highest point of each bucket, so spikes survive.
+    n = len(y)
+    if threshold >= n or threshold < 2:
+        return np.arange(n)
+    edges = np.linspace(0, n, threshold // 2 + 1).astype(int)
+    selected = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi > lo:
+            selected.extend(sorted({lo + int(np.argmin(y[lo:hi])), lo + int(np.argmax(y[lo:hi]))}))
+    return np.array(selected, dtype=int)
+
+def downsample(points: Points, budget: int, method: str = "lttb") -> Dict[str, List[float]]:
+    if not points:
+        return {"timestamps": [], "values": []}
+    x = np.fromiter((p[0] for p in points), dtype=float, count=len(points))
+    y = np.fromiter((p[1] for p in points), dtype=float, count=len(points))
+    selected = lttb(x, y, budget) if method == "lttb" else minmax(y, budget)
+    return {
+        "timestamps": [int(t) for t in x[selected]],
+        "values": [round(float(v), 2) for v in y[selected]]
+    }
+
+def rollup(series: Sequence[Points], weights: Sequence[float], aggregate: str = "avg") -> Points:
+    # Combines per-service series on their shared, period-aligned timestamps.
+    # The average is weighted by running tasks, so a large service dominates.
+    combined = {}
+    for points, weight in zip(series, weights):
+        for ts, value in points:
+            total, weight_sum, peak = combined.get(ts, (0.0, 0.0, value))
+            combined[ts] = (total + value * weight, weight_sum + weight, max(peak, value))
+    if aggregate == "max":
+        return [(ts, peak) for ts, (_, _, peak) in sorted(combined.items())]
+    return [(ts, total / weight_sum) for ts, (total, weight_sum, _) in sorted(combined.items()) if weight_sum > 0]
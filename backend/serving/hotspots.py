@@ -0,0 +1,74 @@
+import os
+from typing import Any, Dict, List, Sequence, Tuple
+import numpy as np
+
+from cache import TTLCache
+from collector.cloudwatch import HISTORY_POINTS, HISTORY_PERIOD
+from telemetry import cache_metrics
+
+HOTSPOT_METRICS = ("cpu", "memory")
+HOTSPOT_METHODS = ("current", "trend", "zscore")
+# Services with fewer real history buckets than this get no trend or z-score.
+HOTSPOT_MIN_POINTS = int(os.getenv("HOTSPOT_MIN_POINTS", "4"))
+
+_rankings = TTLCache(maxsize=16, ttl=None)
+cache_metrics.register("hotspot_rankings", _rankings)
+
+def _history_matrix(services: Sequence[Dict[str, Any]], field: str) -> np.ndarray:
+    matrix = np.full((len(services), HISTORY_POINTS), np.nan)
+    for row, service in enumerate(services):
+        values = (service.get(field) or [])[-HISTORY_POINTS:]
+        matrix[row, :len(values)] = values
+    # pad_history fills missing buckets with trailing zeros; they are not
+    # samples, so they must not drag the mean, std or slope down.
+    trailing = np.flip(np.cumprod(np.flip((matrix == 0) | np.isnan(matrix), axis=1), axis=1), axis=1).astype(bool)
+    matrix[trailing] = np.nan
+    return matrix
+
+def _scores(services: Sequence[Dict[str, Any]], metric: str) -> Dict[str, np.ndarray]:
+    current = np.fromiter((s.get(f"current_{metric}") or 0 for s in services), dtype=float, count=len(services))
+    history = _history_matrix(services, f"historical_{metric}")
+    valid = ~np.isnan(history)
+    count = valid.sum(axis=1)
+    x = np.arange(HISTORY_POINTS, dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(valid, history, 0).sum(axis=1) / count
+        deviation = np.where(valid, history - mean[:, None], 0)
+        std = np.sqrt((deviation ** 2).sum(axis=1) / count)
+        dx = np.where(valid, x - (np.where(valid, x, 0).sum(axis=1) / count)[:, None], 0)
+        # Least-squares slope over the real buckets, in percentage points per hour.
+        slope = (dx * deviation).sum(axis=1) / (dx * dx).sum(axis=1) * (3600 / HISTORY_PERIOD)
+        zscore = np.where(std > 0, (current - mean) / std, np.nan)
+    enough = count >= HOTSPOT_MIN_POINTS
+    return {"current": current, "trend": np.where(enough, slope, np.nan), "zscore": np.where(enough, zscore, np.nan)}
+
+def _ranking(view_key: Tuple[str, str], services: Sequence[Dict[str, Any]]) -> Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray]]:
+    def compute():
+        rankings = {}
+        for metric in HOTSPOT_METRICS:
+            for method, scores in _scores(services, metric).items():
+                ordered = np.where(np.isnan(scores), -np.inf, scores)
+                rankings[(metric, method)] = (np.argsort(-ordered, kind="stable"), scores)
+        return rankings
+    return _rankings.get_or_load(view_key, compute)
+
+def top_hotspots(view_key: Tuple[str, str], services: Sequence[Dict[str, Any]], metric: str, method: str, limit: int) -> List[Dict[str, Any]]:
+    order, scores = _ranking(view_key, services)[(metric, method)]
+    result = []
+    for position in order[:limit]:
+        score = scores[position]
+        if np.isnan(score):
+            break
+        service = services[position]
+        result.append({
+            "account_alias": service.get("account_alias"),
+            "cluster_name": service.get("cluster_name"),
+            "service_name": service.get("service_name"),
+            "running_tasks": service.get("running_tasks", 0),
+            "current_cpu": service.get("current_cpu", 0),
+            "current_memory": service.get("current_memory", 0),
+            "metric": metric,
+            "method": method,
+            "score": round(float(score), 4)
+        })
+    return result
@@ -0,0 +1,98 @@
+import os
+import json
+import asyncio
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+LIVE_QUEUE_SIZE = int(os.getenv("LIVE_QUEUE_SIZE", "64"))
+LIVE_KEEPALIVE_SECONDS = float(os.getenv("LIVE_KEEPALIVE_SECONDS", "15"))
+
+RESYNC = {"event": "resync"}
+
+def service_key(service: Dict[str, Any]):
+    return (service["cluster_name"], service["service_name"])
+
+def _comparable(service: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in service.items() if k != "last_updated"}
+
+def diff_services(old: Iterable[Dict[str, Any]], new: Iterable[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    previous = {service_key(s): _comparable(s) for s in old}
+    upserted = []
+    seen = set()
+    for service in new:
+        key = service_key(service)
+        seen.add(key)
+        if previous.get(key) != _comparable(service):
+            upserted.append(service)
+    removed = [
+        {"cluster_name": cluster_name, "service_name": service_name}
+        for cluster_name, service_name in previous
+        if (cluster_name, service_name) not in seen
+    ]
+    return {"upserted": upserted, "removed": removed}
+
+def format_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+class Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop, aliases: Optional[Set[str]], maxsize: int = LIVE_QUEUE_SIZE):
+        self.loop = loop
+        self.aliases = aliases
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.resync_pending = False
+
+    def wants(self, alias: str) -> bool:
+        return self.aliases is None or alias in self.aliases
+
+    def offer(self, message: Dict[str, Any]):
+        # Runs on the event loop. A client that falls behind loses its queued
+        # diffs and gets a fresh snapshot once it drains the resync marker.
+        if self.resync_pending:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+            self.resync_pending = True
+
+class LiveUpdateHub:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Set[Subscriber] = set()
+
+    def subscribe(self, aliases: Optional[Iterable[str]] = None) -> Subscriber:
+        subscriber = Subscriber(asyncio.get_running_loop(), set(aliases) if aliases else None)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, alias: str, event: str, data: Dict[str, Any]):
+        message = {"event": event, "data": data}
+        with self._lock:
+            subscribers = [s for s in self._subscribers if s.wants(alias)]
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.offer, message)
+            except RuntimeError:
+                self.unsubscribe(subscriber)
+
+    def publish_diff(self, alias: str, old: List[Dict[str, Any]], new: List[Dict[str, Any]], updated_at: str):
+        if not self._subscribers:
+            return
+        changes = diff_services(old, new)
+        self.publish(alias, "diff", {"alias": alias, "last_update_time": updated_at, **changes})
+
+    def publish_status(self, alias: str, status: Dict[str, Any]):
+        if self._subscribers:
+            self.publish(alias, "refresh", {"alias": alias, **status})
+
+live_updates = LiveUpdateHub()
@@ -0,0 +1,190 @@
+import json
+import base64
+import hashlib
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+SERVICE_FIELDS = (
+    "account_alias",
+    "cluster_name",
+    "service_name",
+    "running_tasks",
+    "deploying",
+    "current_cpu",
+    "current_memory",
+    "historical_cpu",
+    "historical_memory",
+    "last_updated",
+)
+
+SORT_KEYS = {
+    "cpu": "current_cpu",
+    "memory": "current_memory",
+    "service": "service_name",
+    "cluster": "cluster_name",
+    "tasks": "running_tasks",
+}
+
+MAX_PAGE_SIZE = 5000
+
+class QueryError(ValueError):
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+class SortedIndex(NamedTuple):
+    keys: List[Any]
+    positions: List[int]
+    ranks: List[int]
+
+    def range(self, low: Any = None, high: Any = None) -> List[int]:
+        start = 0 if low is None else bisect_left(self.keys, low)
+        end = len(self.keys) if high is None else bisect_right(self.keys, high)
+        return self.positions[start:end]
+
+    def prefix(self, prefix: str) -> List[int]:
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + "\U0010ffff")
+        return self.positions[start:end]
+
+TEXT_FIELDS = ("service_name", "cluster_name")
+
+def _sorted_index(services: Sequence[Dict[str, Any]], field: str) -> SortedIndex:
+    default = "" if field in TEXT_FIELDS else 0
+    values = [service.get(field) or default for service in services]
+    positions = sorted(range(len(services)), key=values.__getitem__)
+    keys = [values[i] for i in positions]
+    ranks = [0] * len(services)
+    for rank, position in enumerate(positions):
+        ranks[position] = rank
+    return SortedIndex(keys, positions, ranks)
+
+class ServiceIndex:
+    def __init__(self, services: Sequence[Dict[str, Any]]):
+        self.size = len(services)
+        self.sorted = {name: _sorted_index(services, field) for name, field in SORT_KEYS.items()}
+        self.by_cluster: Dict[str, List[int]] = {}
+        for position, service in enumerate(services):
+            self.by_cluster.setdefault(service.get("cluster_name"), []).append(position)
+
+class ClustersQuery(NamedTuple):
+    cluster: Optional[str] = None
+    cluster_prefix: Optional[str] = None
+    service_prefix: Optional[str] = None
+    min_cpu: Optional[float] = None
+    max_cpu: Optional[float] = None
+    min_memory: Optional[float] = None
+    max_memory: Optional[float] = None
+    sort: Optional[str] = None
+    fields: Optional[str] = None
+    limit: Optional[int] = None
+    cursor: Optional[str] = None
+
+    def is_empty(self) -> bool:
+        return all(value is None for value in self)
+
+class QueryResult(NamedTuple):
+    items: List[Dict[str, Any]]
+    total: int
+    next_cursor: Optional[str]
+
+def encode_cursor(etag: str, offset: int) -> str:
+    raw = json.dumps({"e": etag, "o": offset}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, etag: str) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        offset = int(data["o"])
+    except Exception:
+        raise QueryError("Invalid cursor")
+    if data.get("e") != etag:
+        raise QueryError("Cursor refers to an older snapshot; restart pagination", status_code=410)
+    return offset
+
+def query_etag(etag: str, query: ClustersQuery) -> str:
+    digest = hashlib.blake2b(f"{etag}|{tuple(query)}".encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+def _candidates(index: ServiceIndex, query: ClustersQuery) -> Tuple[Optional[List[int]], str]:
+    # Pick the narrowest index-backed range; the remaining predicates are
+    # checked per candidate.
+    ranges = []
+    if query.cluster is not None:
+        ranges.append((index.by_cluster.get(query.cluster, []), "cluster"))
+    elif query.cluster_prefix:
+        ranges.append((index.sorted["cluster"].prefix(query.cluster_prefix), "cluster"))
+    if query.service_prefix:
+        ranges.append((index.sorted["service"].prefix(query.service_prefix), "service"))
+    if query.min_cpu is not None or query.max_cpu is not None:
+        ranges.append((index.sorted["cpu"].range(query.min_cpu, query.max_cpu), "cpu"))
+    if query.min_memory is not None or query.max_memory is not None:
+        ranges.append((index.sorted["memory"].range(query.min_memory, query.max_memory), "memory"))
+    if not ranges:
+        return None, ""
+    return min(ranges, key=lambda r: len(r[0]))
+
+def _matches(service: Dict[str, Any], query: ClustersQuery) -> bool:
+    cluster_name = service.get("cluster_name") or ""
+    if query.cluster is not None and cluster_name != query.cluster:
+        return False
+    if query.cluster_prefix and not cluster_name.startswith(query.cluster_prefix):
+        return False
+    if query.service_prefix and not (service.get("service_name") or "").startswith(query.service_prefix):
+        return False
+    cpu = service.get("current_cpu") or 0
+    memory = service.get("current_memory") or 0
+    if query.min_cpu is not None and cpu < query.min_cpu:
+        return False
+    if query.max_cpu is not None and cpu > query.max_cpu:
+        return False
+    if query.min_memory is not None and memory < query.min_memory:
+        return False
+    if query.max_memory is not None and memory > query.max_memory:
+        return False
+    return True
+
+def _projection(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    if not fields:
+        return None
+    names = tuple(f.strip() for f in fields.split(",") if f.strip())
+    unknown = [f for f in names if f not in SERVICE_FIELDS]
+    if unknown:
+        raise QueryError(f"Unknown fields: {', '.join(unknown)}")
+    return names
+
+def run_query(services: Sequence[Dict[str, Any]], index: ServiceIndex, etag: str, query: ClustersQuery) -> QueryResult:
+    projection = _projection(query.fields)
+    descending = bool(query.sort) and query.sort.startswith("-")
+    sort_name = query.sort.lstrip("-") if query.sort else None
+    if sort_name is not None and sort_name not in SORT_KEYS:
+        raise QueryError(f"Unknown sort key '{sort_name}'; expected one of {', '.join(SORT_KEYS)}")
+    limit = query.limit if query.limit is not None else MAX_PAGE_SIZE
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise QueryError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    offset = decode_cursor(query.cursor, etag) if query.cursor else 0
+
+    candidates, ordered_by = _candidates(index, query)
+    if candidates is None:
+        if sort_name is not None:
+            positions = list(index.sorted[sort_name].positions)
+            ordered_by = sort_name
+        else:
+            positions = list(range(index.size))
+    else:
+        positions = [p for p in candidates if _matches(services[p], query)]
+    if sort_name is not None and ordered_by != sort_name:
+        positions.sort(key=index.sorted[sort_name].ranks.__getitem__)
+    elif sort_name is None and candidates is not None:
+        positions.sort()
+    if descending:
+        positions.reverse()
+
+    page = positions[offset:offset + limit]
+    items = [services[p] for p in page]
+    if projection is not None:
+        items = [{f: item.get(f) for f in projection} for item in items]
+    next_offset = offset + limit
+    next_cursor = encode_cursor(etag, next_offset) if next_offset < len(positions) else None
+    return QueryResult(items, len(positions), next_cursor)
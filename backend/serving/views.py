@@ -0,0 +1,95 @@
+import os
+import gzip
+import json
+import hashlib
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from .query import ServiceIndex
+
+CLUSTERS_GZIP = os.getenv("CLUSTERS_GZIP", "true").lower() in ("1", "true", "yes")
+CLUSTERS_GZIP_MIN_BYTES = int(os.getenv("CLUSTERS_GZIP_MIN_BYTES", "1024"))
+
+ALL_ALIASES = "*"
+
+class ClustersView(NamedTuple):
+    version: int
+    etag: str
+    updated_at: Optional[str]
+    services: Tuple[Dict[str, Any], ...]
+    body: bytes
+    gzip_body: Optional[bytes]
+    index: ServiceIndex
+
+def _encode(services: Tuple[Dict[str, Any], ...]) -> bytes:
+    return json.dumps(services, separators=(",", ":")).encode()
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def _compress(body: bytes) -> Optional[bytes]:
+    if not CLUSTERS_GZIP or len(body) < CLUSTERS_GZIP_MIN_BYTES:
+        return None
+    return gzip.compress(body, compresslevel=6)
+
+def _build(version: int, services: Tuple[Dict[str, Any], ...], body: bytes, updated_at: Optional[str]) -> ClustersView:
+    return ClustersView(
+        version=version,
+        etag=_etag(body),
+        updated_at=updated_at,
+        services=services,
+        body=body,
+        gzip_body=_compress(body),
+        index=ServiceIndex(services)
+    )
+
+EMPTY_VIEW = _build(0, (), b"[]", None)
+
+class ClustersViewPublisher:
+    # Views are immutable and the dict holding them is replaced wholesale,
+    # so readers never observe a partially published alias.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = 0
+        self._views: Dict[str, ClustersView] = {}
+
+    def publish(self, alias: str, services: List[Dict[str, Any]], updated_at: Optional[str]):
+        frozen = tuple(services)
+        body = _encode(frozen)
+        with self._lock:
+            self._version += 1
+            views = dict(self._views)
+            views[alias] = _build(self._version, frozen, body, updated_at)
+            views[ALL_ALIASES] = self._combine(views)
+            self._views = views
+
+    def remove(self, alias: str):
+        with self._lock:
+            if alias not in self._views:
+                return
+            self._version += 1
+            views = dict(self._views)
+            del views[alias]
+            views[ALL_ALIASES] = self._combine(views)
+            self._views = views
+
+    def _combine(self, views: Dict[str, ClustersView]) -> ClustersView:
+        parts = [view for name, view in sorted(views.items()) if name != ALL_ALIASES]
+        services = tuple(s for view in parts for s in view.services)
+        body = b"[" + b",".join(view.body[1:-1] for view in parts if view.services) + b"]"
+        updated = [view.updated_at for view in parts if view.updated_at]
+        return _build(self._version, services, body, max(updated) if updated else None)
+
+    def get(self, alias: Optional[str] = None) -> ClustersView:
+        return self._views.get(alias or ALL_ALIASES, EMPTY_VIEW)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    return bool(accept_encoding) and "gzip" in accept_encoding.lower()
+
+cluster_views = ClustersViewPublisher()
@@ -0,0 +1,122 @@
+import os
+import time
+import threading
+from typing import Dict
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from cache import TTLCache
+
+# With several workers, each one only sees the metrics it recorded itself. When
+# PROMETHEUS_MULTIPROC_DIR is set, prometheus_client writes them to files in that
+# directory and /metrics adds up every worker's, whichever worker is scraped.
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+REFRESH_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 900, 1200, 1800, 3600)
+AWS_LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+REFRESH_DURATION = Histogram(
+    "heartbeat_refresh_duration_seconds",
+    "Wall time of a full collection for one alias",
+    ["alias"],
+    buckets=REFRESH_BUCKETS
+)
+REFRESHES = Counter("heartbeat_refreshes_total", "Completed collections per alias", ["alias", "result"])
+# Per alias only: a cluster label would mean a series per cluster. Slow
+# clusters are logged by the collector instead.
+CLUSTER_DISCOVERY_DURATION = Histogram(
+    "heartbeat_cluster_discovery_duration_seconds",
+    "Time spent listing and describing the services of one cluster",
+    ["alias"],
+    buckets=REFRESH_BUCKETS
+)
+COLLECTION_ERRORS = Counter("heartbeat_collection_errors_total", "Collection failures per alias and stage", ["alias", "stage"])
+# Only the collecting worker sets these; livemax ignores workers that have exited.
+SERVICES_COLLECTED = Gauge(
+    "heartbeat_services_collected",
+    "Services returned by the last collection",
+    ["alias"],
+    multiprocess_mode="livemax"
+)
+SERVICES_WITHOUT_METRICS = Gauge(
+    "heartbeat_services_without_metrics",
+    "Services whose CloudWatch metrics could not be fetched in the last collection",
+    ["alias"],
+    multiprocess_mode="livemax"
+)
+
+AWS_CALLS = Counter("heartbeat_aws_calls_total", "AWS API requests sent", ["profile", "api"])
+AWS_THROTTLES = Counter("heartbeat_aws_throttles_total", "AWS API requests rejected with a throttling error", ["profile", "api"])
+AWS_RETRIES = Counter("heartbeat_aws_retries_total", "AWS API requests retried", ["profile", "api"])
+AWS_ERRORS = Counter("heartbeat_aws_errors_total", "AWS API requests that failed for good", ["profile", "api"])
+AWS_CALL_LATENCY = Histogram(
+    "heartbeat_aws_call_duration_seconds",
+    "Latency of a single AWS API attempt, excluding rate-limit waits",
+    ["api"],
+    buckets=AWS_LATENCY_BUCKETS
+)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "heartbeat_http_request_duration_seconds",
+    "API request latency per endpoint",
+    ["method", "path", "status"]
+)
+
+class CacheCollector:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._caches: Dict[str, TTLCache] = {}
+
+    def register(self, name: str, cache: TTLCache):
+        with self._lock:
+            self._caches[name] = cache
+
+    def collect(self):
+        hits = CounterMetricFamily("heartbeat_cache_hits", "Cache lookups served from memory", labels=["cache"])
+        misses = CounterMetricFamily("heartbeat_cache_misses", "Cache lookups that had to load", labels=["cache"])
+        entries = GaugeMetricFamily("heartbeat_cache_entries", "Entries currently cached", labels=["cache"])
+        with self._lock:
+            caches = list(self._caches.items())
+        for name, cache in caches:
+            hits.add_metric([name], cache.hits)
+            misses.add_metric([name], cache.misses)
+            entries.add_metric([name], len(cache))
+        yield hits
+        yield misses
+        yield entries
+
+class DataAgeCollector:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._updated: Dict[str, float] = {}
+
+    def mark(self, alias: str, timestamp: float):
+        with self._lock:
+            self._updated[alias] = timestamp
+
+    def forget(self, alias: str):
+        with self._lock:
+            self._updated.pop(alias, None)
+
+    def collect(self):
+        age = GaugeMetricFamily("heartbeat_data_age_seconds", "Seconds since the served data of an alias was collected", labels=["alias"])
+        now = time.time()
+        with self._lock:
+            for alias, timestamp in self._updated.items():
+                age.add_metric([alias], max(0.0, now - timestamp))
+        yield age
+
+cache_metrics = CacheCollector()
+data_age = DataAgeCollector()
+REGISTRY.register(cache_metrics)
+REGISTRY.register(data_age)
+
+def render_metrics():
+    if not MULTIPROCESS:
+        return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    # Cache and data-age figures live in memory and describe the worker that answered.
+    registry.register(cache_metrics)
+    registry.register(data_age)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
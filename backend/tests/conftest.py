@@ -0,0 +1,41 @@
+import os
+import tempfile
+
+# Modules read their settings at import time, so keep snapshots and shared
+# state out of the working directory before anything is imported.
+os.environ.setdefault("SNAPSHOT_DIR", tempfile.mkdtemp(prefix="heartbeat-tests-"))
+
+import pytest
+
+from bench.fake_aws import FakeAWS, SyntheticFleet
+from collector.clients import client_registry
+from collector.coordination import SharedState
+from collector.governor import governor
+from collector.service import CollectorService
+from collector.snapshot import SnapshotStore
+from collector.timeseries import TimeSeriesStore
+
+@pytest.fixture
+def fleet():
+    return SyntheticFleet(1, 2, 25)
+
+@pytest.fixture
+def fake_aws(fleet):
+    fake = FakeAWS(fleet)
+    session_factory = client_registry.session_factory
+    client_registry.session_factory = fake.session
+    governor.reset()
+    yield fake
+    client_registry.retain([])
+    client_registry.session_factory = session_factory
+    governor.reset()
+
+@pytest.fixture
+def collector(fake_aws, fleet, tmp_path):
+    service = CollectorService(
+        store=SnapshotStore(str(tmp_path / "snapshots")),
+        history=TimeSeriesStore(),
+        shared=SharedState(str(tmp_path / "shared"))
+    )
+    service.configure({alias: fleet.profile(alias) for alias in fleet.aliases}, {})
+    return service
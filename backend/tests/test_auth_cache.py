@@ -0,0 +1,72 @@
+import os
+import time
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from auth import cache
+from auth.models import UserResponse
+from auth.revocations import RevocationStore
+
+SECRET = "test-secret-with-enough-bytes-for-hs256"
+
+def token(**claims):
+    return jwt.encode({"sub": "alice", "exp": int(time.time()) + 600, **claims}, SECRET, algorithm="HS256")
+
+@pytest.fixture
+def verifier(monkeypatch, tmp_path):
+    calls = []
+
+    def verify(t):
+        calls.append(t)
+        return jwt.decode(t, SECRET, algorithms=["HS256"])
+
+    monkeypatch.setattr(cache, "token_verifiers", {"test": verify})
+    monkeypatch.setattr(cache, "revocation_store", RevocationStore(str(tmp_path / "revoked")))
+    cache.token_cache.clear()
+    yield calls
+    cache.token_cache.clear()
+
+def test_verified_tokens_are_cached(verifier):
+    t = token()
+    assert cache.verify_token_cached("test", t)["sub"] == "alice"
+    assert cache.verify_token_cached("test", t)["sub"] == "alice"
+    assert len(verifier) == 1
+
+def test_revoked_token_is_rejected_even_when_cached(verifier, tmp_path):
+    t = token()
+    cache.verify_token_cached("test", t)
+    # Another worker revokes it: only the shared directory changes.
+    RevocationStore(str(tmp_path / "revoked")).revoke(cache.token_digest(t), jwt.decode(t, SECRET, algorithms=["HS256"])["exp"])
+    with pytest.raises(HTTPException) as error:
+        cache.verify_token_cached("test", t)
+    assert error.value.status_code == 401
+
+def test_logout_revokes_and_invalidates(verifier):
+    t = token()
+    cache.verify_token_cached("test", t)
+    cache.revoke_token(t)
+    assert cache.token_cache.get(("test", cache.token_digest(t))) is None
+    with pytest.raises(HTTPException):
+        cache.verify_token_cached("test", t)
+
+def test_unverifiable_tokens_are_not_recorded(verifier, tmp_path):
+    cache.revoke_token("not-a-token")
+    cache.revoke_token(jwt.encode({"sub": "mallory"}, "some-other-secret-of-enough-length", algorithm="HS256"))
+    assert not os.path.exists(tmp_path / "revoked")
+
+def test_prune_drops_expired_buckets(tmp_path):
+    store = RevocationStore(str(tmp_path))
+    store.revoke("old", time.time() - 7200)
+    store.revoke("live", time.time() + 600)
+    assert not store.is_revoked("old", time.time() - 7200)
+    assert store.is_revoked("live", time.time() + 600)
+    assert len(os.listdir(tmp_path)) == 1
+
+def test_user_cache_invalidation():
+    user = UserResponse(id="1", username="bob", email="bob@example.com", role="user")
+    cache.cache_user(user)
+    assert cache.get_cached_user("bob") == user
+    cache.invalidate_user("bob")
+    assert cache.get_cached_user("bob") is None
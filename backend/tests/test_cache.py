@@ -0,0 +1,72 @@
+import threading
+import time
+
+import pytest
+
+from cache import TTLCache
+
+def test_get_or_load_runs_one_loader_for_concurrent_callers():
+    cache = TTLCache(maxsize=8, ttl=60)
+    calls = []
+    release = threading.Event()
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("key", loader))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == ["value"] * 8
+    assert len(calls) == 1
+    assert cache.get("key") == "value"
+
+def test_get_or_load_does_not_cache_failures():
+    cache = TTLCache(maxsize=8, ttl=60)
+
+    def failing():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load("key", failing)
+    assert cache.get_or_load("key", lambda: 1) == 1
+
+def test_get_or_load_fresh_bypasses_cached_value():
+    cache = TTLCache(maxsize=8, ttl=60)
+    cache.set("key", "old")
+    assert cache.get_or_load("key", lambda: "new") == "old"
+    assert cache.get_or_load("key", lambda: "new", fresh=True) == "new"
+    assert cache.get("key") == "new"
+
+def test_evicts_least_recently_used_entry():
+    cache = TTLCache(maxsize=2, ttl=None)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+def test_entries_expire_after_their_ttl():
+    cache = TTLCache(maxsize=8, ttl=0.05)
+    cache.set("default", 1)
+    cache.set("longer", 2, ttl=60)
+    time.sleep(0.1)
+    assert cache.get("default") is None
+    assert cache.get("longer") == 2
+    assert cache.items() == [("longer", 2)]
+
+def test_counts_hits_and_misses():
+    cache = TTLCache(maxsize=8, ttl=60)
+    cache.get("missing")
+    cache.get_or_load("key", lambda: 1)
+    cache.get("key")
+    assert (cache.hits, cache.misses) == (1, 2)
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+from collector.clients import client_registry
+from collector.cloudwatch import (
+    CURRENT_MAX_AGE, HISTORY_PERIOD, HISTORY_POINTS, HISTORY_WINDOW,
+    _split_by_start, align_time, build_queries, fetch_service_metrics, get_metric_data
+)
+from collector.timeseries import TimeSeriesStore
+
+class RecordingCloudWatch:
+    def __init__(self, pages=1):
+        self.pages = pages
+        self.requests = []
+
+    def get_metric_data(self, **kwargs):
+        self.requests.append(kwargs)
+        page = int(kwargs.get("NextToken") or 0)
+        response = {"MetricDataResults": [
+            {"Id": q["Id"], "Timestamps": [datetime(2026, 1, 1, 0, self.pages - page)], "Values": [float(page)]}
+            for q in kwargs["MetricDataQueries"]
+        ]}
+        if page + 1 < self.pages:
+            response["NextToken"] = str(page + 1)
+        return response
+
+def test_build_queries_only_adds_history_when_asked():
+    queries, index = build_queries([("c", "busy", True), ("c", "idle", False)])
+    assert [q["Id"] for q in queries] == [
+        "s0_cpu_now", "s0_cpu_hist", "s0_memory_now", "s0_memory_hist", "s1_cpu_now", "s1_memory_now"
+    ]
+    assert index["s0_cpu_hist"] == (("c", "busy"), "cpu", "historical")
+    assert index["s1_memory_now"] == (("c", "idle"), "memory", "current")
+    assert {q["MetricStat"]["Period"] for q in queries if q["Id"].endswith("_hist")} == {HISTORY_PERIOD}
+
+def test_get_metric_data_chunks_queries_and_follows_next_token():
+    queries, _ = build_queries(("c", f"s{i}", True) for i in range(300))
+    cloudwatch = RecordingCloudWatch(pages=2)
+    series = get_metric_data(cloudwatch, queries, datetime(2026, 1, 1), datetime(2026, 1, 1, 1))
+    assert [len(r["MetricDataQueries"]) for r in cloudwatch.requests] == [500, 500, 500, 500, 200, 200]
+    assert len(series) == 1200
+    # Pages are merged and sorted by timestamp.
+    assert [value for _, value in series["s0_cpu_now"]] == [1.0, 0.0]
+
+def test_split_by_start_backfills_cold_services_only():
+    end = datetime(2026, 1, 1, 12, 7)
+    history = TimeSeriesStore().view("alias")
+    for metric in ("cpu", "memory"):
+        history.record(("c", "warm"), metric, [(end - timedelta(hours=1), 1.0)])
+    groups = _split_by_start([("c", "cold", True), ("c", "warm", True), ("c", "small", False)], end, history)
+    assert groups == {
+        align_time(end - HISTORY_WINDOW, HISTORY_PERIOD): [("c", "cold", True)],
+        align_time(end - timedelta(hours=1), HISTORY_PERIOD): [("c", "warm", True), ("c", "small", False)],
+    }
+    assert _split_by_start([("c", "small", False)], end, history) == {
+        align_time(end - CURRENT_MAX_AGE, HISTORY_PERIOD): [("c", "small", False)]
+    }
+
+def test_fetch_service_metrics_against_fake_cloudwatch(fake_aws, fleet):
+    profile = fleet.profile(fleet.aliases[0])
+    cloudwatch = client_registry.client(profile, "cloudwatch")
+    services = [("cluster-0000", f"service-{i:04d}", i % 2 == 0) for i in range(10)]
+    metrics = fetch_service_metrics(cloudwatch, services, datetime.utcnow())
+    assert fake_aws.calls["cloudwatch.GetMetricData"] == 2
+    for cluster_name, service_name, include_history in services:
+        result = metrics[(cluster_name, service_name)]
+        # The fake only reports datapoints for services with running tasks.
+        if fleet.running_tasks(profile, cluster_name, service_name):
+            assert 0 < result["current_cpu"] <= 100
+        else:
+            assert result["current_cpu"] == 0
+        assert len(result["historical_cpu"]) == (HISTORY_POINTS if include_history else 0)
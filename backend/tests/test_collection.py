@@ -0,0 +1,75 @@
+from collections import Counter
+
+from telemetry import data_age
+
+def service_keys(services):
+    return Counter((s["cluster_name"], s["service_name"]) for s in services)
+
+def fail_describe_services(fake_aws, cluster_name, after_batches):
+    describe = fake_aws._handlers["ecs.DescribeServices"]
+    calls = Counter()
+
+    def handler(profile_name, params):
+        cluster = params["cluster"].split("/")[-1]
+        calls[cluster] += 1
+        if cluster == cluster_name and calls[cluster] > after_batches:
+            raise ValueError("simulated failure")
+        return describe(profile_name, params)
+
+    fake_aws._handlers["ecs.DescribeServices"] = handler
+
+def test_collects_every_service(collector, fleet):
+    alias = fleet.aliases[0]
+    collector.refresh(alias, fleet.profile(alias))
+    assert collector.refresh_status[alias]["status"] == "Refresh completed"
+    keys = service_keys(collector.services[alias])
+    assert len(keys) == 50 and max(keys.values()) == 1
+
+def test_cluster_failing_mid_discovery_keeps_each_service_once(collector, fake_aws, fleet):
+    alias = fleet.aliases[0]
+    collector.refresh(alias, fleet.profile(alias))
+    before = collector.services[alias]
+    fail_describe_services(fake_aws, "cluster-0000", after_batches=1)
+    collector.refresh(alias, fleet.profile(alias))
+    after = collector.services[alias]
+    assert service_keys(after) == service_keys(before)
+
+def test_failed_alias_keeps_previous_services_and_snapshot(collector, fake_aws, fleet):
+    alias = fleet.aliases[0]
+    collector.refresh(alias, fleet.profile(alias))
+    before = collector.services[alias]
+    version = collector.store.version(alias)
+    fail_describe_services(fake_aws, "cluster-0000", after_batches=0)
+    fail_describe_services(fake_aws, "cluster-0001", after_batches=0)
+    collector.refresh(alias, fleet.profile(alias))
+    assert collector.refresh_status[alias]["status"].startswith("Refresh failed")
+    assert collector.services[alias] is before
+    assert collector.store.version(alias) == version
+
+def test_removed_alias_is_dropped_everywhere(collector, fleet):
+    alias = fleet.aliases[0]
+    collector.refresh(alias, fleet.profile(alias))
+    removed = []
+    collector.remove_listeners.append(lambda name, previous: removed.append((name, len(previous))))
+    services, statuses = collector.services, collector.refresh_status
+    collector.configure({}, {})
+    assert removed == [(alias, 50)]
+    assert collector.services is services and alias not in services
+    assert collector.refresh_status is statuses and alias not in statuses
+    assert collector.history.export(alias) == {}
+    assert alias not in [s.samples[0].labels["alias"] for s in data_age.collect() if s.samples]
+
+
+def test_alias_removed_mid_refresh_is_not_republished(collector, fleet, monkeypatch):
+    alias = fleet.aliases[0]
+    collector.configure({alias: fleet.profile(alias)}, {})
+    fetch = collector.fetch
+
+    def fetch_then_remove(*args):
+        services = fetch(*args)
+        collector.configure({}, {})
+        return services
+
+    monkeypatch.setattr(collector, "fetch", fetch_then_remove)
+    collector.refresh(alias, fleet.profile(alias))
+    assert alias not in collector.services and alias not in collector.refresh_status
@@ -0,0 +1,50 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+
+from bench.fake_aws import SyntheticFleet
+from collector.clients import client_registry
+from collector.discovery import (
+    DESCRIBE_SERVICES_BATCH, MetricsPipeline, describe_tasks, iter_cluster_names, iter_service_batches, list_task_arns
+)
+
+@pytest.fixture
+def fleet():
+    return SyntheticFleet(1, 150, 250)
+
+@pytest.fixture
+def ecs(fake_aws, fleet):
+    return client_registry.client(fleet.profile(fleet.aliases[0]), "ecs")
+
+def test_lists_every_cluster_across_pages(ecs, fake_aws, fleet):
+    assert list(iter_cluster_names(ecs)) == fleet.clusters()
+    assert fake_aws.calls["ecs.ListClusters"] == 2
+
+def test_describes_services_in_batches_of_ten(ecs, fake_aws, fleet):
+    batches = list(iter_service_batches(ecs, "cluster-0000"))
+    assert [len(batch) for batch in batches] == [DESCRIBE_SERVICES_BATCH] * 25
+    assert [s["serviceName"] for batch in batches for s in batch] == fleet.services()
+    assert fake_aws.calls["ecs.ListServices"] == 3
+    assert fake_aws.calls["ecs.DescribeServices"] == 25
+
+def test_pipeline_collects_metrics_for_streamed_batches(ecs, fake_aws, fleet):
+    cloudwatch = client_registry.client(fleet.profile(fleet.aliases[0]), "cloudwatch")
+    with ThreadPoolExecutor(4) as pool:
+        pipeline = MetricsPipeline(cloudwatch, pool, datetime.utcnow())
+        for batch in iter_service_batches(ecs, "cluster-0000"):
+            pipeline.add("cluster-0000", batch)
+        collected = pipeline.collect()
+    assert [service_name for _, service_name, _, _, _ in collected] == fleet.services()
+    assert all(metrics is not None for _, _, _, _, metrics in collected)
+    # Metrics requests start while discovery is still streaming batches in.
+    assert fake_aws.calls["cloudwatch.GetMetricData"] >= 2
+
+def test_task_paging_resumes_from_the_cursor(ecs, fleet):
+    profile = fleet.profile(fleet.aliases[0])
+    service_name = next(s for s in fleet.services() if fleet.running_tasks(profile, "cluster-0000", s) >= 3)
+    first, cursor = list_task_arns(ecs, "cluster-0000", service_name, limit=2)
+    rest, end = list_task_arns(ecs, "cluster-0000", service_name, limit=100, cursor=cursor)
+    assert len(first) == 2 and cursor is not None and end is None
+    assert len(first) + len(rest) == fleet.running_tasks(profile, "cluster-0000", service_name)
+    assert len(describe_tasks(ecs, "cluster-0000", first + rest)) == len(first) + len(rest)
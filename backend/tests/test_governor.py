@@ -0,0 +1,77 @@
+import threading
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+from collector import governor as governor_module
+from collector.clients import client_registry
+from collector.governor import RequestGovernor, TokenBucket, governor, interactive, request_priority
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(governor_module, "AWS_BACKOFF_BASE", 0.001)
+
+def ecs_client(fleet):
+    return client_registry.client(fleet.profile(fleet.aliases[0]), "ecs")
+
+def test_retries_throttled_calls_until_they_succeed(fake_aws, fleet, monkeypatch):
+    attempts = []
+
+    def throttle_twice(profile_name, api):
+        attempts.append(api)
+        return len(attempts) <= 2
+
+    monkeypatch.setattr(fake_aws, "_should_throttle", throttle_twice)
+    ecs_client(fleet).list_clusters()
+    stats = governor.stats()[fleet.profile(fleet.aliases[0])]["ecs.ListClusters"]
+    assert (stats["calls"], stats["throttles"], stats["retries"], stats["errors"]) == (3, 2, 2, 0)
+    assert stats["rate_limit"] < governor_module.API_RATES["ecs"]
+
+def test_gives_up_after_max_attempts(fake_aws, fleet):
+    fake_aws.throttle_rate = 1.0
+    with pytest.raises(ClientError):
+        ecs_client(fleet).list_clusters()
+    stats = governor.stats()[fleet.profile(fleet.aliases[0])]["ecs.ListClusters"]
+    assert stats["calls"] == governor.max_attempts
+    assert stats["retries"] == governor.max_attempts - 1
+    assert stats["errors"] == 1
+
+def test_client_errors_are_not_retried(fake_aws, fleet):
+    def invalid(profile_name, params):
+        raise ValueError("bad request")
+
+    fake_aws._handlers["ecs.ListClusters"] = invalid
+    with pytest.raises(ClientError):
+        ecs_client(fleet).list_clusters()
+    stats = governor.stats()[fleet.profile(fleet.aliases[0])]["ecs.ListClusters"]
+    assert (stats["calls"], stats["retries"], stats["errors"]) == (1, 0, 1)
+
+def test_interactive_callers_take_tokens_before_background_callers():
+    bucket = TokenBucket(rate=10, burst=1)
+    bucket.acquire()
+    finished = []
+    background = threading.Thread(target=lambda: (bucket.acquire(), finished.append("background")))
+    foreground = threading.Thread(target=lambda: (bucket.acquire(interactive=True), finished.append("interactive")))
+    background.start()
+    time.sleep(0.02)
+    foreground.start()
+    background.join(2)
+    foreground.join(2)
+    assert finished == ["interactive", "background"]
+
+def test_throttles_halve_the_rate_and_successes_recover_it():
+    bucket = TokenBucket(rate=10, burst=10)
+    bucket.on_throttle()
+    bucket.on_throttle()
+    assert bucket.rate == 2.5
+    for _ in range(20):
+        bucket.on_success()
+    assert bucket.rate == 10
+
+def test_interactive_context_sets_priority():
+    assert request_priority.get() == governor_module.BACKGROUND
+    with interactive():
+        assert request_priority.get() == governor_module.INTERACTIVE
+    assert request_priority.get() == governor_module.BACKGROUND
+    assert RequestGovernor()._rate_for("application-auto-scaling.DescribeScalingPolicies") == 5
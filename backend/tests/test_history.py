@@ -0,0 +1,30 @@
+import numpy as np
+
+from serving.history import downsample, lttb, minmax
+
+def test_lttb_keeps_endpoints_and_the_spike():
+    x = np.arange(100, dtype=float)
+    y = np.zeros(100)
+    y[37] = 100
+    selected = lttb(x, y, 10)
+    assert len(selected) == 10
+    assert selected[0] == 0 and selected[-1] == 99
+    assert 37 in selected
+    assert list(selected) == sorted(selected)
+
+def test_lttb_returns_everything_below_the_threshold():
+    x = np.arange(5, dtype=float)
+    assert list(lttb(x, x, 10)) == [0, 1, 2, 3, 4]
+
+def test_minmax_keeps_each_bucket_extremes():
+    y = np.array([5, 1, 9, 5, 5, 0, 7, 5], dtype=float)
+    selected = minmax(y, 4)
+    assert list(selected) == [1, 2, 5, 6]
+
+def test_downsample_respects_the_budget():
+    points = [(float(ts), float(ts % 7)) for ts in range(1000)]
+    for method in ("lttb", "minmax"):
+        result = downsample(points, 50, method)
+        assert len(result["timestamps"]) == len(result["values"]) <= 50
+        assert result["timestamps"] == sorted(result["timestamps"])
+    assert downsample([], 50) == {"timestamps": [], "values": []}
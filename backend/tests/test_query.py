@@ -0,0 +1,62 @@
+import pytest
+
+from serving.query import ClustersQuery, QueryError, ServiceIndex, run_query
+
+SERVICES = [
+    {"cluster_name": "web", "service_name": "api", "current_cpu": 70, "current_memory": 40, "running_tasks": 4},
+    {"cluster_name": "web", "service_name": "frontend", "current_cpu": 20, "current_memory": 60, "running_tasks": 2},
+    {"cluster_name": "jobs", "service_name": "worker", "current_cpu": 90, "current_memory": 80, "running_tasks": 8},
+    {"cluster_name": "jobs", "service_name": "api-sync", "current_cpu": 10, "current_memory": 10, "running_tasks": 1},
+]
+INDEX = ServiceIndex(SERVICES)
+
+def names(result):
+    return [item["service_name"] for item in result.items]
+
+def test_empty_query_returns_everything_in_order():
+    result = run_query(SERVICES, INDEX, "etag", ClustersQuery())
+    assert names(result) == ["api", "frontend", "worker", "api-sync"]
+    assert result.total == 4
+    assert result.next_cursor is None
+
+def test_filters_combine():
+    result = run_query(SERVICES, INDEX, "etag", ClustersQuery(cluster="web", min_cpu=50))
+    assert names(result) == ["api"]
+    result = run_query(SERVICES, INDEX, "etag", ClustersQuery(service_prefix="api", max_memory=50, sort="-cpu"))
+    assert names(result) == ["api", "api-sync"]
+
+def test_sorts_descending():
+    result = run_query(SERVICES, INDEX, "etag", ClustersQuery(sort="-tasks"))
+    assert names(result) == ["worker", "api", "frontend", "api-sync"]
+
+def test_pages_with_cursor():
+    first = run_query(SERVICES, INDEX, "etag", ClustersQuery(sort="cpu", limit=3))
+    assert names(first) == ["api-sync", "frontend", "api"]
+    second = run_query(SERVICES, INDEX, "etag", ClustersQuery(sort="cpu", limit=3, cursor=first.next_cursor))
+    assert names(second) == ["worker"]
+    assert second.next_cursor is None
+
+def test_cursor_from_another_snapshot_is_rejected():
+    first = run_query(SERVICES, INDEX, "etag", ClustersQuery(limit=1))
+    with pytest.raises(QueryError) as error:
+        run_query(SERVICES, INDEX, "newer", ClustersQuery(limit=1, cursor=first.next_cursor))
+    assert error.value.status_code == 410
+
+def test_projects_fields():
+    result = run_query(SERVICES, INDEX, "etag", ClustersQuery(cluster="jobs", fields="service_name,current_cpu"))
+    assert result.items == [{"service_name": "worker", "current_cpu": 90}, {"service_name": "api-sync", "current_cpu": 10}]
+
+@pytest.mark.parametrize("query", [
+    ClustersQuery(sort="latency"),
+    ClustersQuery(fields="secret"),
+    ClustersQuery(limit=0),
+    ClustersQuery(cursor="not-a-cursor"),
+])
+def test_invalid_queries(query):
+    with pytest.raises(QueryError):
+        run_query(SERVICES, INDEX, "etag", query)
+
+def test_projects_the_deploying_flag():
+    services = [dict(SERVICES[0], deploying=True)]
+    result = run_query(services, ServiceIndex(services), "etag", ClustersQuery(fields="service_name,deploying"))
+    assert result.items == [{"service_name": "api", "deploying": True}]
@@ -0,0 +1,68 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from collector import scheduler as scheduler_module
+from collector.scheduler import AliasSchedule, RefreshScheduler
+
+def test_first_refreshes_are_spread_out():
+    now = time.monotonic()
+    schedules = [AliasSchedule({"interval": 600}) for _ in range(50)]
+    delays = [s.next_due - now for s in schedules]
+    assert all(0 <= d <= scheduler_module.REFRESH_JITTER * 600 + 1 for d in delays)
+    assert len({round(d, 3) for d in delays}) > 1
+
+def test_adapt_speeds_up_backs_off_and_resets():
+    schedule = AliasSchedule({"interval": 600, "min_interval": 120, "max_interval": 1800})
+    schedule.adapt("hot")
+    assert schedule.interval == 300
+    schedule.adapt("changing")
+    schedule.adapt("changing")
+    assert schedule.interval == 120
+    # Backing off starts from the base interval, not the sped-up one.
+    schedule.adapt("idle")
+    assert schedule.interval == 900
+    for _ in range(5):
+        schedule.adapt("idle")
+    assert schedule.interval == 1800
+    schedule.adapt(None)
+    assert schedule.interval == 600
+
+def test_update_clamps_the_current_interval():
+    schedule = AliasSchedule({"interval": 600})
+    schedule.adapt("idle")
+    schedule.update({"interval": 600, "max_interval": 700})
+    assert schedule.interval == 700
+
+def test_trigger_runs_a_refresh_and_adapts_from_recorded_activity():
+    refreshed = threading.Event()
+    calls = []
+
+    def refresh(alias, profile_name):
+        calls.append((alias, profile_name))
+        scheduler.record_activity(alias, "hot")
+        refreshed.set()
+
+    with ThreadPoolExecutor(2) as pool:
+        scheduler = RefreshScheduler(pool, refresh)
+        scheduler.configure({"dev": "dev-profile"}, {"dev": {"interval": 3600, "min_interval": 60}})
+        scheduler._schedules["dev"].next_due = time.monotonic() + 3600
+        threading.Thread(target=scheduler.run_forever, daemon=True).start()
+        assert not scheduler.trigger("unknown")
+        assert scheduler.trigger("dev")
+        assert refreshed.wait(2)
+        deadline = time.monotonic() + 2
+        while scheduler.is_running("dev") and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert calls == [("dev", "dev-profile")]
+        assert scheduler._schedules["dev"].interval == 1800
+        assert 1800 * 0.8 < scheduler.next_refresh_in("dev") <= 1800 * 1.2
+
+def test_trigger_is_rejected_while_running():
+    scheduler = RefreshScheduler(None, lambda alias, profile_name: None)
+    scheduler.configure({"dev": "dev-profile"}, {})
+    scheduler._schedules["dev"].running = True
+    assert not scheduler.trigger("dev")
+    assert scheduler.next_refresh_in("dev") is None
+    scheduler.configure({}, {})
+    assert scheduler.next_refresh_in("dev") is None
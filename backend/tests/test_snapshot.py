@@ -0,0 +1,51 @@
+import gzip
+import os
+
+from collector.coordination import SharedState
+from collector.service import CollectorService
+from collector.snapshot import SnapshotStore, write_atomic
+from collector.timeseries import TimeSeriesStore
+
+SERVICES = [{"cluster_name": "c", "service_name": "s", "running_tasks": 2, "current_cpu": 12.5}]
+HISTORY = {"c": {"s": {"cpu": [[1000.0, 10.0], [2800.0, 12.5]], "memory": [[1000.0, 40.0]]}}}
+
+def test_round_trip(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    assert store.load("dev") is None and store.version("dev") is None
+    store.save("dev", SERVICES, "2026-01-01T00:00:00", HISTORY)
+    snapshot = store.load("dev")
+    assert snapshot["services"] == SERVICES
+    assert snapshot["last_update_time"] == "2026-01-01T00:00:00"
+    assert snapshot["history"] == HISTORY
+
+def test_version_changes_on_every_save(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    store.save("dev", SERVICES, "2026-01-01T00:00:00")
+    first = store.version("dev")
+    store.save("dev", SERVICES, "2026-01-01T00:10:00")
+    assert store.version("dev") != first
+
+def test_ignores_corrupt_foreign_and_old_snapshots(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    write_atomic(store.path("dev"), b"not gzip")
+    assert store.load("dev") is None
+    store.save("prod", SERVICES, "2026-01-01T00:00:00")
+    os.replace(store.path("prod"), store.path("dev"))
+    assert store.load("dev") is None
+    write_atomic(store.path("dev"), gzip.compress(b'{"format": 0, "alias": "dev"}'))
+    assert store.load("dev") is None
+
+def test_atomic_write_leaves_no_temporary_files(tmp_path):
+    write_atomic(str(tmp_path / "a" / "file"), b"data")
+    assert os.listdir(tmp_path / "a") == ["file"]
+
+def test_collector_restores_services_and_history(tmp_path):
+    store = SnapshotStore(str(tmp_path / "snapshots"))
+    store.save("dev", SERVICES, "2026-01-01T00:00:00", HISTORY)
+    service = CollectorService(store=store, history=TimeSeriesStore(), shared=SharedState(str(tmp_path / "shared")))
+    service.configure({"dev": "dev-profile", "prod": "prod-profile"}, {})
+    service.load_snapshots()
+    assert service.services == {"dev": SERVICES}
+    assert service.last_update_time["dev"] == "2026-01-01T00:00:00"
+    assert service.stale == {"dev"}
+    assert service.history.export("dev") == {"c": {"s": {"cpu": [(1000.0, 10.0), (2800.0, 12.5)], "memory": [(1000.0, 40.0)]}}}
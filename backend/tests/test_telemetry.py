@@ -0,0 +1,37 @@
+import os
+import subprocess
+import sys
+
+from collector import service as service_module
+from telemetry import CLUSTER_DISCOVERY_DURATION, REGISTRY
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_discovery_duration_is_labelled_by_alias_only(collector, fleet):
+    alias = fleet.aliases[0]
+    collector.refresh(alias, fleet.profile(alias))
+    assert CLUSTER_DISCOVERY_DURATION._labelnames == ("alias",)
+    assert REGISTRY.get_sample_value("heartbeat_cluster_discovery_duration_seconds_count", {"alias": alias}) >= fleet.cluster_count
+
+def test_slow_clusters_are_logged_slowest_first(monkeypatch, caplog):
+    monkeypatch.setattr(service_module, "SLOW_CLUSTER_SECONDS", 10)
+    monkeypatch.setattr(service_module, "SLOW_CLUSTER_LOG_LIMIT", 2)
+    service_module.log_slow_clusters("prod", {"a": 12.0, "b": 3.0, "c": 40.0, "d": 25.0})
+    assert [r.getMessage() for r in caplog.records] == [
+        "Slow service discovery in alias 'prod' (3 clusters over 10s): c 40.0s, d 25.0s"
+    ]
+
+def test_multiprocess_metrics_include_other_workers(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    leader = (
+        "from telemetry import REFRESHES, SERVICES_COLLECTED\n"
+        "REFRESHES.labels('prod', 'success').inc()\n"
+        "SERVICES_COLLECTED.labels('prod').set(7)\n"
+    )
+    follower = "from telemetry import render_metrics\nprint(render_metrics()[0].decode())\n"
+    subprocess.run([sys.executable, "-c", leader], env=env, cwd=BACKEND_DIR, check=True)
+    output = subprocess.run(
+        [sys.executable, "-c", follower], env=env, cwd=BACKEND_DIR, check=True, capture_output=True, text=True
+    ).stdout
+    assert 'heartbeat_refreshes_total{alias="prod",result="success"} 1.0' in output
+    assert "heartbeat_cache_hits" in output
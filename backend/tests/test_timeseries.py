@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+from collector.timeseries import RingBuffer, TimeSeriesStore
+
+def test_keeps_the_most_recent_points_once_full():
+    buffer = RingBuffer(3)
+    for ts in range(5):
+        buffer.append(float(ts), ts * 10.0)
+    assert buffer.items() == [(2.0, 20.0), (3.0, 30.0), (4.0, 40.0)]
+    assert buffer.last_timestamp() == 4.0
+
+def test_ignores_older_points_and_overwrites_the_same_timestamp():
+    buffer = RingBuffer(4)
+    buffer.append(10.0, 1.0)
+    buffer.append(20.0, 2.0)
+    buffer.append(15.0, 9.0)
+    buffer.append(20.0, 3.0)
+    assert buffer.items() == [(10.0, 1.0), (20.0, 3.0)]
+
+def test_since_returns_values_from_the_given_timestamp():
+    buffer = RingBuffer(3)
+    for ts in range(1, 6):
+        buffer.append(float(ts), float(ts))
+    assert buffer.since(4.0) == [4.0, 5.0]
+    assert buffer.since(0.0) == [3.0, 4.0, 5.0]
+
+def test_empty_buffer():
+    buffer = RingBuffer(2)
+    assert buffer.last_timestamp() is None
+    assert buffer.items() == []
+    assert buffer.since(0.0) == []
+
+def test_store_resumes_from_the_oldest_last_bucket():
+    store = TimeSeriesStore(capacity=48)
+    end = datetime(2026, 1, 1, 12)
+    key = ("alias", "cluster", "service")
+    assert store.start_for(key, end) is None
+    store.record(key, "cpu", [(end - timedelta(hours=2), 10.0), (end - timedelta(hours=1), 20.0)])
+    # Memory has no buckets yet, so the service still needs a full backfill.
+    assert store.start_for(key, end) is None
+    store.record(key, "memory", [(end - timedelta(hours=2), 30.0)])
+    assert store.start_for(key, end) == end - timedelta(hours=2)
+    assert store.values(key, "cpu", end) == [10.0, 20.0]
+
+def test_store_export_restore_and_retain():
+    store = TimeSeriesStore(capacity=48)
+    end = datetime(2026, 1, 1, 12)
+    for service in ("a", "b"):
+        store.record(("alias", "cluster", service), "cpu", [(end, 1.0)])
+    exported = store.export("alias")
+    assert sorted(exported["cluster"]) == ["a", "b"]
+
+    restored = TimeSeriesStore(capacity=48)
+    restored.restore("alias", exported)
+    assert restored.export("alias") == exported
+    restored.retain("alias", [("cluster", "a")])
+    assert sorted(restored.export("alias")["cluster"]) == ["a"]
@@ -1,4 +1,4 @@
-import type { ClusterService, ServiceDetails } from "./types"
+import type { ClusterService, ServiceDetails, ServiceTasksPage } from "./types"
 import { generateMockClusterData } from "./mock-data"
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000"
@@ -67,6 +67,19 @@ export async function fetchServiceDetails(serviceName: string, clusterName: stri
   }
 }
 
+export async function fetchServiceTasks(serviceName: string, clusterName: string, alias: string, cursor: string): Promise<ServiceTasksPage> {
+  const response = await fetch(
+    `${API_BASE_URL}/service-details/tasks?service_name=${encodeURIComponent(serviceName)}&cluster_name=${encodeURIComponent(clusterName)}&alias=${encodeURIComponent(alias)}&cursor=${encodeURIComponent(cursor)}`,
+    {
+      credentials: "include",
+    }
+  )
+  if (!response.ok) {
+    throw new Error("Failed to fetch service tasks")
+  }
+  return await response.json()
+}
+
 export async function triggerRefresh(alias: string): Promise<boolean> {
   try {
     const response = await fetch(`${API_BASE_URL}/refresh?alias=${encodeURIComponent(alias)}`, {
@@ -118,6 +131,7 @@ function generateMockServiceDetails(serviceName: string): ServiceDetails {
       launch_type: "FARGATE", 
       historical_cpu: [10, 20, 30, 40, 50, 60],
       historical_memory: [20, 30, 40, 50, 60, 70],
+      metrics_available: true,
     },
     deployment_info: {
       current_deployment: {
@@ -10,8 +10,8 @@ import {
   Activity,
   Server,
 } from "lucide-react";
-import type { ClusterService, ServiceDetails } from "../types";
-import { fetchServiceDetails } from "../api";
+import type { ClusterService, ServiceDetails, ServiceTask } from "../types";
+import { fetchServiceDetails, fetchServiceTasks } from "../api";
 import CodeBlock from "./CodeBlock";
 import MetricsChart from "./MetricsChart";
 
@@ -215,7 +215,7 @@ function TabContent({
     case "deployment":
       return <DeploymentInfo details={details} />;
     case "tasks":
-      return <TaskDetails details={details} />;
+      return <TaskDetails service={service} details={details} />;
     case "events":
       return <EventsAndLogs details={details} />;
     case "config":
@@ -291,18 +291,24 @@ function ServiceOverview({
             Historical Data (Last 6 Hours)
           </h4>
           <div className="bg-white/70 dark:bg-gray-800/70 p-3 rounded-md shadow-sm backdrop-blur-sm">
-            <div className="grid grid-cols-1 gap-4">
-              <MetricChart
-                title="CPU Utilization"
-                data={overview.historical_cpu}
-                color="#3b82f6"
-              />
-              <MetricChart
-                title="Memory Utilization"
-                data={overview.historical_memory}
-                color="#ef4444"
-              />
-            </div>
+            {overview.metrics_available === false ? (
+              <p className="text-sm text-gray-500 dark:text-gray-400">
+                CloudWatch metrics are unavailable right now.
+              </p>
+            ) : (
+              <div className="grid grid-cols-1 gap-4">
+                <MetricChart
+                  title="CPU Utilization"
+                  data={overview.historical_cpu}
+                  color="#3b82f6"
+                />
+                <MetricChart
+                  title="Memory Utilization"
+                  data={overview.historical_memory}
+                  color="#ef4444"
+                />
+              </div>
+            )}
           </div>
         </div>
       </Section>
@@ -413,8 +419,50 @@ function DeploymentInfo({ details }: { details: ServiceDetails }) {
 }
 
 // Tasks Tab Component
-function TaskDetails({ details }: { details: ServiceDetails }) {
-  const { running_count, desired_count, tasks } = details.current_tasks;
+function TaskDetails({
+  service,
+  details,
+}: {
+  service: ClusterService;
+  details: ServiceDetails;
+}) {
+  const { running_count, desired_count } = details.current_tasks;
+  const [tasks, setTasks] = useState<ServiceTask[]>(details.current_tasks.tasks);
+  const [taskDefinitions, setTaskDefinitions] = useState<Record<string, any>>(
+    details.current_tasks.task_definitions || {}
+  );
+  const [nextCursor, setNextCursor] = useState(details.current_tasks.next_cursor);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [loadError, setLoadError] = useState<string | null>(null);
+
+  useEffect(() => {
+    setTasks(details.current_tasks.tasks);
+    setTaskDefinitions(details.current_tasks.task_definitions || {});
+    setNextCursor(details.current_tasks.next_cursor);
+    setLoadError(null);
+  }, [details]);
+
+  const loadMoreTasks = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    setLoadError(null);
+    try {
+      const page = await fetchServiceTasks(
+        service.service_name,
+        service.cluster_name,
+        service.account_alias,
+        nextCursor
+      );
+      setTasks((current) => [...current, ...page.tasks]);
+      setTaskDefinitions((current) => ({ ...current, ...page.task_definitions }));
+      setNextCursor(page.next_cursor);
+    } catch (err) {
+      console.error("Error fetching service tasks:", err);
+      setLoadError("Failed to load more tasks. Please try again.");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
   return (
     <div className="space-y-6">
@@ -427,12 +475,32 @@ function TaskDetails({ details }: { details: ServiceDetails }) {
         {tasks.length > 0 ? (
           <div className="space-y-4">
             {tasks.map((task, index) => (
-              <TaskCard key={index} task={task} />
+              <TaskCard
+                key={task.task_id || index}
+                task={task}
+                taskDefinition={
+                  (task.task_definition_arn && taskDefinitions[task.task_definition_arn]) ||
+                  task.task_definition
+                }
+              />
             ))}
           </div>
         ) : (
           <EmptyState icon={Server} message="No running tasks found" />
         )}
+
+        {loadError && <p className="mt-4 text-sm text-red-500">{loadError}</p>}
+        {nextCursor && (
+          <div className="mt-4 flex justify-center">
+            <button
+              className="px-4 py-2 bg-blue-500 text-white rounded-md hover:bg-blue-600 transition-colors disabled:opacity-50"
+              onClick={loadMoreTasks}
+              disabled={loadingMore}
+            >
+              {loadingMore ? "Loading..." : `Load more tasks (${tasks.length} of ${running_count})`}
+            </button>
+          </div>
+        )}
       </Section>
     </div>
   );
@@ -1073,7 +1141,7 @@ function InfoItem({
   );
 }
 
-function TaskCard({ task }: { task: any }) {
+function TaskCard({ task, taskDefinition }: { task: any; taskDefinition: any }) {
   return (
     <div className="bg-white dark:bg-gray-800 rounded-lg p-4 border border-gray-200 dark:border-gray-700">
       <div className="flex items-center justify-between mb-4">
@@ -1094,7 +1162,7 @@ function TaskCard({ task }: { task: any }) {
         label="Task Definition"
         value={
           <CodeBlock
-            code={JSON.stringify(task.task_definition, null, 2)}
+            code={JSON.stringify(taskDefinition, null, 2)}
             language="json"
           />
         }
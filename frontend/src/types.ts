@@ -3,6 +3,7 @@ export interface ClusterService {
   cluster_name: string
   service_name: string
   running_tasks: number
+  deploying?: boolean
   pending_tasks: number 
   current_cpu: number
   current_memory: number
@@ -18,6 +19,9 @@ export interface ServiceDetails {
     task_definition: string
     desired_count: number
     launch_type: string
+    historical_cpu: number[]
+    historical_memory: number[]
+    metrics_available: boolean
   }
   deployment_info: {
     current_deployment: {
@@ -41,14 +45,19 @@ export interface ServiceDetails {
   current_tasks: {
     running_count: number
     desired_count: number
+    pending_count?: number
+    task_definitions?: Record<string, any>
     tasks: Array<{
       task_id: string
       health_status: string
+      last_status?: string
       started_at: string
       container_instance: string
       availability_zone: string
+      task_definition_arn?: string
       task_definition: any
     }>
+    next_cursor?: string | null
   }
   events: {
     service_events: Array<{
@@ -90,3 +99,11 @@ export interface ServiceDetails {
     }
   }
 }
+
+export type ServiceTask = ServiceDetails["current_tasks"]["tasks"][number]
+
+export interface ServiceTasksPage {
+  tasks: ServiceTask[]
+  task_definitions: Record<string, any>
+  next_cursor?: string | null
+}